@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -13,7 +13,11 @@ class AccountConfig(AppConfig):
         from account.signals import (
             post_save_user_created_receiver,
             pre_save_email_activation,
+            pre_save_user_claims_receiver,
+            post_delete_user_receiver,
         )
 
         post_save.connect(post_save_user_created_receiver, sender=User)
         pre_save.connect(pre_save_email_activation, sender=EmailInvitation)
+        pre_save.connect(pre_save_user_claims_receiver, sender=User)
+        post_delete.connect(post_delete_user_receiver, sender=User)
@@ -11,8 +11,12 @@ from django.template.loader import render_to_string
 from django.utils import timezone
 from django.apps import apps
 
-from mailing.tasks.send_invitation_email_task import send_invitation_email
-from mailing.tasks.send_confirmation_email_task import send_confirmation_email
+from mailing.services.dispatcher import MailDispatcher
+from mailing.services.mailing import param
+from mailing.tasks.send_invitation_email_task import build_invitation_email
+from mailing.tasks.send_confirmation_email_task import (
+    build_confirmation_email,
+)
 
 
 DEFAULT_ACTIVATION_DAYS = getattr(settings, "DEFAULT_ACTIVATION_DAYS", 7)
@@ -139,10 +143,13 @@ class EmailInvitation(models.Model):
                 key_path = "account/verify/?key={}".format(self.key)
                 verification_path = f"{base_url}{key_path}"
 
-                context = {
+                # per recipient values are params, the confirmations
+                # of a batch share one content
+                params = {
                     "verification_path": verification_path,
                     "first_name": first_name,
                 }
+                context = {name: param(name) for name in params}
                 html_template = render_to_string(
                     "auth/email_verification.html", context=context
                 )
@@ -150,12 +157,15 @@ class EmailInvitation(models.Model):
                 mail_sender = {"email": from_email, "name": "Support"}
                 mail_recipient = [{"email": self.email}]
 
-                return send_confirmation_email.delay(
-                    sender=mail_sender,
-                    content=html_template,
-                    first_name=first_name,
-                    last_name=last_name,
-                    recipient_email=mail_recipient,
+                return MailDispatcher.queue(
+                    build_confirmation_email(
+                        sender=mail_sender,
+                        content=html_template,
+                        first_name=first_name,
+                        last_name=last_name,
+                        recipient_email=mail_recipient,
+                        params=params,
+                    )
                 )
         return False
 
@@ -178,9 +188,14 @@ class EmailInvitation(models.Model):
                 setup_path = f"{base_url}{key_path}"
                 client_login_link = f"{base_url}"
 
-                context = {
+                # per recipient values are params, the invitations of a
+                # bulk import share one content
+                params = {
                     "setup_path": setup_path,
                     "first_name": first_name,
+                }
+                context = {
+                    **{name: param(name) for name in params},
                     "organisation_name": organisation_name,
                     "organisation_short_name": organisation_short_name,
                     "client_login_link": client_login_link,
@@ -192,11 +207,14 @@ class EmailInvitation(models.Model):
                 mail_sender = {"email": from_email, "name": "Support"}
                 mail_recipient = [{"email": self.email}]
 
-                return send_invitation_email.delay(
-                    sender=mail_sender,
-                    content=html_template,
-                    first_name=first_name,
-                    last_name=last_name,
-                    recipient_email=mail_recipient,
+                return MailDispatcher.queue(
+                    build_invitation_email(
+                        sender=mail_sender,
+                        content=html_template,
+                        first_name=first_name,
+                        last_name=last_name,
+                        recipient_email=mail_recipient,
+                        params=params,
+                    )
                 )
         return False
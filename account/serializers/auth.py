@@ -11,7 +11,13 @@ from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from account.models import EmailInvitation, Role
-from core.utils import CustomValidation, get_client_ip, gen_token, update_login
+from core.utils import (
+    CustomValidation,
+    get_client_ip,
+    gen_token,
+    set_claims,
+    update_login,
+)
 from core.utils.check_org_name_and_set_schema import (
     check_organization_name_and_set_appropriate_schema,
 )
@@ -227,6 +233,23 @@ class CustomTokenRefreshSerializer(serializers.Serializer):
         except TokenError as e:
             raise AuthenticationFailed(str(e))
 
+        # the claims are read again, the access token may have been revoked
+        # because they changed
+        user = (
+            User.objects.select_related("user_role")
+            .filter(
+                **{
+                    api_settings.USER_ID_FIELD: refresh[
+                        api_settings.USER_ID_CLAIM
+                    ]
+                }
+            )
+            .first()
+        )
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User is inactive or does not exist")
+        set_claims(refresh, user)
+
         data = {"access": str(refresh.access_token)}
 
         if api_settings.ROTATE_REFRESH_TOKENS:
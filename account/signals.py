@@ -2,6 +2,21 @@ from typing import Dict
 
 from account.models import User, EmailInvitation,Role
 from core.utils import key_generator,helper_function
+from core.utils.authentication import (
+    get_changed_claims,
+    revoke_tokens_on_commit,
+)
+from core.utils.bulk_delete import get_delete_cleanup
+
+# fields of the user signed into the token claims, see core.utils.authentication
+CLAIM_FIELDS = (
+    "email",
+    "user_id",
+    "user_role_id",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
 
 
 def post_save_user_created_receiver(sender,
@@ -51,3 +66,18 @@ def pre_save_email_activation(sender,
     if not instance.activated and not instance.forced_expired:
         if not instance.key:
             instance.key = key_generator(instance)
+
+
+def pre_save_user_claims_receiver(sender, instance: User, **kwargs: Dict):
+    """Revoke the tokens of a user when their claims change"""
+    if get_changed_claims(instance, CLAIM_FIELDS, kwargs.get("update_fields")):
+        revoke_tokens_on_commit(instance.pk)
+
+
+def post_delete_user_receiver(sender, instance: User, **kwargs: Dict):
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        cleanup.revoke_tokens(instance.pk)
+        return
+
+    revoke_tokens_on_commit(instance.pk)
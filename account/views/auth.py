@@ -40,8 +40,9 @@ from account.serializers import (
 )
 from core.utils import response_data, get_client_ip, tzware_datetime
 from core.utils.check_org_name_and_set_schema import check_organization_name_and_set_appropriate_schema
+from mailing.services.dispatcher import MailDispatcher
 from mailing.tasks.send_forgot_password_email_task import (
-    send_password_reset_email,
+    build_password_reset_email,
 )
 from tracking.models import PasswordResetTracking
 from account.models.roles import Role
@@ -369,11 +370,13 @@ class RequestPasswordResetEmailView(GenericAPIView):
             mail_sender = {"email": from_email, "name": "Support"}
             mail_recipient = [{"email": user.email}]
 
-            send_password_reset_email.delay(
-                sender=mail_sender,
-                content=html_template,
-                first_name=user.first_name,
-                recipient_email=mail_recipient,
+            MailDispatcher.queue(
+                build_password_reset_email(
+                    sender=mail_sender,
+                    content=html_template,
+                    first_name=user.first_name,
+                    recipient_email=mail_recipient,
+                )
             )
         data = response_data(200, "reset password email sent successfully", [])
         return Response(data, status=status.HTTP_200_OK)
@@ -26,6 +26,7 @@ from core.utils.permissions import (
 )
 from core.utils.custom_parser import NestedMultipartParser
 from core.utils.tenant_management import delete_client
+from mailing.services.dispatcher import MailDispatcher
 
 
 User = get_user_model()
@@ -294,5 +295,6 @@ class ResendActivationMailView(generics.GenericAPIView):
         email_activation_objs = EmailInvitation.objects.filter(user__in=users)
         email_activation_objs.update(timestamp=timezone.now())
 
-        for email_activation_obj in email_activation_objs:
-            email_activation_obj.send_invitation()
+        with MailDispatcher.batch():
+            for email_activation_obj in email_activation_objs:
+                email_activation_obj.send_invitation()
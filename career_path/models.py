@@ -1,12 +1,12 @@
 import uuid
-from django.core.cache import cache
 from django.db import models
+from core.utils.change_versions import invalidate
 
 
 class CareerPathManager(models.Manager):
     def bulk_create(self, objs, **kwargs):
         result = super().bulk_create(objs, **kwargs)
-        cache.delete("career_path_queryset")
+        invalidate("career_path_queryset")
         return result
 
 
@@ -1,5 +1,4 @@
-from django.core.cache import cache
-
+from core.utils.change_versions import invalidate
 from career_path.models import CareerPath
 
 
@@ -7,9 +6,9 @@ def post_career_path_save_receiver(
     sender, instance: CareerPath, created, **kwargs
 ):
     """Signal for career path post save"""
-    cache.delete("career_path_queryset")  # clear career path queryset cache
+    invalidate("career_path_queryset")  # clear career path queryset cache
 
 
 def post_career_path_delete_receiver(sender, instance: CareerPath, **kwargs):
     """Signal for career path post delete"""
-    cache.delete("career_path_queryset")
+    invalidate("career_path_queryset")
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from client.models import Client, Domain
+from client.models import Client, Domain, TenantJob, TenantJobResult
 
 admin.site.register(Client)
 admin.site.register(Domain)
+admin.site.register(TenantJob)
+admin.site.register(TenantJobResult)
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save, post_delete
 
 
 class ClientConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'client'
+
+    def ready(self):
+        from client.models import Client, Domain
+        from core.utils.tenant_registry import invalidate_receiver
+
+        for sender in (Client, Domain):
+            post_save.connect(invalidate_receiver, sender=sender)
+            post_delete.connect(invalidate_receiver, sender=sender)
@@ -1,7 +1,9 @@
 from datetime import date
 from email.policy import default
+from django.conf import settings
 from django.db import models
 from django_tenants.models import TenantMixin, DomainMixin
+from django_tenants.utils import schema_exists
 from django_tenants_celery_beat.models import TenantTimezoneMixin
 from multiselectfield import MultiSelectField
 from django_tenants_celery_beat.models import PeriodicTaskTenantLinkMixin
@@ -101,6 +103,29 @@ class Client(TenantTimezoneMixin, TenantMixin):
 
         super(Client, self).save(*args, **kwargs)
 
+    def create_schema(
+        self, check_if_exists=False, sync_schema=True, verbosity=1
+    ):
+        """
+        Copies the schema from the tenant pool or template when provisioning
+        from the template is enabled, instead of running every migration
+        """
+        from core.utils.tenant_provisioning import provision_schema
+
+        if (
+            sync_schema
+            and settings.TENANT_PROVISION_FROM_TEMPLATE
+            and not (check_if_exists and schema_exists(self.schema_name))
+            and provision_schema(self.schema_name)
+        ):
+            return True
+
+        return super(Client, self).create_schema(
+            check_if_exists=check_if_exists,
+            sync_schema=sync_schema,
+            verbosity=verbosity,
+        )
+
     def is_work_day(self, selected_date: date) -> bool:
         """Checks if weekday is a in work days"""
         if str(selected_date.weekday()) in self.work_days:
@@ -121,4 +146,72 @@ class Domain(DomainMixin):
 
 
 class PeriodicTaskTenantLink(PeriodicTaskTenantLinkMixin):
-    pass
\ No newline at end of file
+    pass
+
+
+class TenantJob(models.Model):
+    """A run of a callable or management command across tenants"""
+
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (RUNNING, "running"),
+        (SUCCEEDED, "succeeded"),
+        (FAILED, "failed"),
+    )
+
+    target = models.CharField(max_length=255)
+    is_command = models.BooleanField(default=False)
+    arguments = models.JSONField(default=list, blank=True)
+    status = models.CharField(
+        max_length=255, choices=STATUS_CHOICES, default=RUNNING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.target} #{self.pk}"
+
+
+class TenantJobResult(models.Model):
+    """Progress and outcome of a tenant job for one tenant"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (PENDING, "pending"),
+        (RUNNING, "running"),
+        (SUCCEEDED, "succeeded"),
+        (FAILED, "failed"),
+    )
+
+    job = models.ForeignKey(
+        TenantJob, on_delete=models.CASCADE, related_name="results"
+    )
+    schema_name = models.CharField(max_length=63)
+    status = models.CharField(
+        max_length=255,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        db_index=True,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    seconds = models.FloatField(blank=True, null=True)
+    output = models.TextField(blank=True, default="")
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["schema_name"]
+        unique_together = ("job", "schema_name")
+
+    def __str__(self):
+        return f"{self.job} {self.schema_name}"
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+
+from e_metric_api.celery import app
+from core.utils.tenant_provisioning import fill_pool
+
+
+FILL_POOL_LOCK = "tenant_pool_fill_lock"
+
+
+@app.task()
+def bulk_fill_tenant_pool():
+    """
+    Tops the pool of warm tenant schemas up after a signup claimed one
+    """
+    # signups in quick succession queue several fills, one is enough
+    if not cache.add(FILL_POOL_LOCK, True, timeout=10 * 60):
+        return "tenant pool is already being filled"
+    try:
+        cloned = fill_pool()
+    finally:
+        cache.delete(FILL_POOL_LOCK)
+
+    return f"{cloned} schemas added to the tenant pool"
+
+
+@app.task()
+def bulk_run_tenant_job(result_id: int):
+    """
+    Runs a cross tenant job for one tenant, see core.utils.tenant_jobs
+    """
+    from core.utils.tenant_jobs import run_for_tenant
+
+    return run_for_tenant(result_id)
+
+
+@app.task()
+def bulk_finish_tenant_job(job_id: int):
+    """Marks a cross tenant job finished once every tenant ran"""
+    from client.models import TenantJob
+    from core.utils.tenant_jobs import finish_job
+
+    job = finish_job(TenantJob.objects.get(pk=job_id))
+    return f"tenant job {job} {job.status}"
+
+
+@app.task()
+def bulk_purge_expired_tokens():
+    """
+    Purges the expired tokens of the public schema, then of every tenant
+    as a tenant job, see core.utils.token_purge
+    """
+    from core.utils.tenant_jobs import create_job, run_job_with_celery
+    from core.utils.token_purge import purge_expired_tokens
+
+    public = purge_expired_tokens()
+    job = create_job("core.utils.token_purge.purge_tenant_tokens")
+    run_job_with_celery(job)
+    return f"public schema tokens purged {public}, tenant job {job}"
+
+
+@app.task()
+def relay_outbox():
+    """
+    Sends the celery tasks published by committed transactions of the
+    tenants, see core.utils.outbox
+    """
+    from core.utils.outbox import relay
+
+    summary = relay()
+    return f"outbox messages sent {summary}"
+
+
+@app.task()
+def bulk_sweep_outbox():
+    """
+    Sends the celery tasks left in the outbox of every tenant, see
+    core.utils.outbox
+    """
+    from core.utils.outbox import relay
+
+    summary = relay(sweep=True)
+    return f"outbox messages swept {summary}"
+
+
+@app.task()
+def bulk_expand_recurring_tasks():
+    """
+    Moves the horizon of the background expansions of recurring tasks
+    forward for every tenant as a tenant job, see core.utils.task_expansion
+    """
+    from core.utils.tenant_jobs import create_job, run_job_with_celery
+
+    job = create_job("core.utils.task_expansion.expand_tenant_tasks")
+    run_job_with_celery(job)
+    return f"task expansion tenant job {job}"
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from core.utils.request_metrics import instrument_serializers
+
+        if settings.REQUEST_METRICS_ENABLED:
+            instrument_serializers()
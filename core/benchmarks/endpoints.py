@@ -0,0 +1,349 @@
+"""
+Endpoint benchmarks with query count and latency budgets.
+
+A tenant is seeded with a synthetic organisation, every hot endpoint is
+requested ``BENCHMARK_ITERATIONS`` times with a cold cache and the query
+count and p95 latency are compared to the budgets committed in
+``budgets.json``. The module is not picked up by the default test
+discovery, run it against a throwaway PostgreSQL with
+
+    python manage.py test core.benchmarks.endpoints
+
+Environment variables
+    BENCHMARK_SIZE            seed size, small, medium (default) or large
+    BENCHMARK_ITERATIONS      measured requests per endpoint, default 5
+    BENCHMARK_LATENCY_FACTOR  multiplies the latency budgets, for slower
+                              machines, default 1
+    BENCHMARK_UPDATE_BUDGETS  set to 1 to write the measured values to
+                              budgets.json instead of asserting them
+
+budgets.json is only written by a run with ``BENCHMARK_UPDATE_BUDGETS=1``,
+never by hand. An endpoint without a budget fails until it is measured.
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from datetime import time as datetime_time, timedelta
+from pathlib import Path
+from typing import Dict
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.utils import (
+    get_subfolder_prefix,
+    get_tenant_domain_model,
+    get_tenant_model,
+)
+
+from core.utils.generate_token import gen_token
+from core.utils.tenant_seed import TenantSeeder
+
+
+BUDGETS_PATH = Path(__file__).resolve().parent / "budgets.json"
+
+SIZE = os.environ.get("BENCHMARK_SIZE", "medium")
+ITERATIONS = int(os.environ.get("BENCHMARK_ITERATIONS", 5))
+LATENCY_FACTOR = float(os.environ.get("BENCHMARK_LATENCY_FACTOR", 1))
+UPDATE_BUDGETS = os.environ.get("BENCHMARK_UPDATE_BUDGETS") == "1"
+
+# latency budgets are written with this much room above the measured p95
+LATENCY_HEADROOM = 2
+
+# the views cache querysets in redis, the benchmark only needs postgres
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "KEY_FUNCTION": "django_tenants.cache.make_key",
+        "REVERSE_KEY_FUNCTION": "django_tenants.cache.reverse_key",
+    }
+}
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting queries, unlike the debug cursor it
+    has no upper limit on the number of recorded queries
+    """
+
+    def __init__(self):
+        self.count = 0
+        # the report pool runs the queries of a request on several threads
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class EndpointBenchmark(TenantTestCase):
+    results: Dict[str, Dict] = {}
+
+    @classmethod
+    def get_test_schema_name(cls):
+        return "benchmark"
+
+    @classmethod
+    def get_test_tenant_domain(cls):
+        # subfolder routing looks tenants up by their domain
+        return "benchmark"
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.company_name = "benchmark"
+        tenant.owner_email = "admin@benchmark.test"
+        tenant.work_start_time = datetime_time(hour=8)
+        tenant.work_stop_time = datetime_time(hour=17)
+        tenant.work_break_start_time = datetime_time(hour=12)
+        tenant.work_break_stop_time = datetime_time(hour=13)
+        tenant.employee_limit = 100000
+
+    @classmethod
+    def setUpClass(cls):
+        # TenantTestCase does not apply class level override_settings
+        cls.settings_override = override_settings(
+            CACHES=BENCHMARK_CACHES, REQUEST_METRICS_ENABLED=False
+        )
+        cls.settings_override.enable()
+        super().setUpClass()
+
+        cls.seeder = TenantSeeder(cls.tenant, size=SIZE, seed=0)
+        started_at = time.perf_counter()
+        counts = cls.seeder.seed()
+        elapsed = time.perf_counter() - started_at
+        sys.stderr.write(f"\nseeded {SIZE} tenant in {elapsed:.1f}s: {counts}\n")
+        cls.authorization = (
+            f"Bearer {gen_token(cls.seeder.admin).access_token}"
+        )
+        cls.budgets = json.loads(BUDGETS_PATH.read_text()).get(SIZE, {})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.report()
+        if UPDATE_BUDGETS:
+            cls.write_budgets()
+        # the seeded rows are dropped with the schema instead of being
+        # collected one by one by the tenant delete
+        connection.set_schema_to_public()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA "{cls.tenant.schema_name}" CASCADE')
+            cursor.execute(
+                f"DELETE FROM {get_tenant_domain_model()._meta.db_table} "
+                "WHERE tenant_id = %s",
+                [cls.tenant.pk],
+            )
+            cursor.execute(
+                f"DELETE FROM {get_tenant_model()._meta.db_table} "
+                "WHERE id = %s",
+                [cls.tenant.pk],
+            )
+        cls.remove_allowed_test_domain()
+        cls.settings_override.disable()
+
+    @classmethod
+    def report(cls):
+        sys.stderr.write(
+            f"\n{'endpoint':<32}{'queries':>9}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'max ms':>10}\n"
+        )
+        for name, result in sorted(cls.results.items()):
+            sys.stderr.write(
+                f"{name:<32}{result['queries']:>9}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['max_ms']:>10.1f}\n"
+            )
+
+    @classmethod
+    def write_budgets(cls):
+        """
+        Writes the budgets of the endpoints measured in this run, the
+        others are kept, so that a change re-measures only the endpoints it
+        touches, e.g ``EndpointBenchmark.test_task_list``
+        """
+        budgets = json.loads(BUDGETS_PATH.read_text())
+        measured = {
+            name: {
+                "queries": result["queries"],
+                "p95_ms": math.ceil(result["p95_ms"] * LATENCY_HEADROOM),
+            }
+            for name, result in cls.results.items()
+        }
+        budgets[SIZE] = dict(
+            sorted({**budgets.get(SIZE, {}), **measured}.items())
+        )
+        BUDGETS_PATH.write_text(json.dumps(budgets, indent=4) + "\n")
+
+    def tenant_url(self, path: str) -> str:
+        return f"/{get_subfolder_prefix()}/{self.tenant.schema_name}/{path}"
+
+    def assert_within_budget(self, name: str, path: str, params=None):
+        """
+        Requests the endpoint once to warm up, then measures it with a
+        cold cache and compares the worst query count and the p95 latency
+        with the committed budget
+        """
+        url = self.tenant_url(path)
+        response = self.client.get(
+            url, params, HTTP_AUTHORIZATION=self.authorization
+        )
+        self.assertEqual(
+            response.status_code, 200, response.content.decode()[:500]
+        )
+
+        timings, queries = [], []
+        for _ in range(ITERATIONS):
+            cache.clear()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started_at = time.perf_counter()
+                response = self.client.get(
+                    url, params, HTTP_AUTHORIZATION=self.authorization
+                )
+                timings.append((time.perf_counter() - started_at) * 1000)
+            self.assertEqual(response.status_code, 200)
+            queries.append(counter.count)
+
+        result = {
+            "queries": max(queries),
+            "p50_ms": percentile(timings, 0.5),
+            "p95_ms": percentile(timings, 0.95),
+            "max_ms": max(timings),
+        }
+        self.results[name] = result
+        if UPDATE_BUDGETS:
+            return
+
+        budget = self.budgets.get(name)
+        if budget is None:
+            self.fail(
+                f"No {SIZE} budget for {name}, run the benchmark with "
+                "BENCHMARK_UPDATE_BUDGETS=1 and commit budgets.json"
+            )
+        self.assertLessEqual(
+            result["queries"],
+            budget["queries"],
+            f"{name} ran {result['queries']} queries, "
+            f"the budget is {budget['queries']}",
+        )
+        self.assertLessEqual(
+            result["p95_ms"],
+            budget["p95_ms"] * LATENCY_FACTOR,
+            f"{name} p95 latency is {result['p95_ms']:.1f}ms, "
+            f"the budget is {budget['p95_ms'] * LATENCY_FACTOR:.1f}ms",
+        )
+
+    # shortcuts to the seeded rows the endpoints are requested for
+    @property
+    def unit(self):
+        return self.seeder.units[0]
+
+    @property
+    def owner(self):
+        # first employee of the unit after its team lead
+        return self.seeder.employees[len(self.seeder.units)].user
+
+    @property
+    def date_range(self):
+        return {
+            "date_after": self.seeder.today - timedelta(days=30),
+            "date_before": self.seeder.today,
+        }
+
+    def test_employee_list(self):
+        self.assert_within_budget("employee_list", "employee/")
+
+    def test_employee_list_search(self):
+        self.assert_within_budget(
+            "employee_list_search", "employee/", {"search": "okafor"}
+        )
+
+    def test_task_list(self):
+        self.assert_within_budget("task_list", "task/")
+
+    def test_task_report_user(self):
+        self.assert_within_budget(
+            "task_report_user", f"task/report/user/{self.owner.user_id}/"
+        )
+
+    def test_task_report_user_dashboard(self):
+        self.assert_within_budget(
+            "task_report_user_dashboard",
+            f"task/report/user/{self.owner.user_id}/",
+            {"dashboard_report": "True"},
+        )
+
+    def test_task_report_team(self):
+        self.assert_within_budget(
+            "task_report_team", f"task/report/team/{self.unit.uuid}/"
+        )
+
+    def test_initiative_report_team(self):
+        self.assert_within_budget(
+            "initiative_report_team",
+            f"task/report/team-initiative/{self.unit.uuid}/",
+        )
+
+    def test_task_report_initiative(self):
+        initiative = self.seeder.initiatives[0]
+        self.assert_within_budget(
+            "task_report_initiative",
+            f"task/report/initiative/{initiative.initiative_id}/",
+        )
+
+    def test_task_report_objective(self):
+        objective = self.seeder.objectives[0]
+        self.assert_within_budget(
+            "task_report_objective",
+            f"task/report/objective/{objective.objective_id}/",
+        )
+
+    def test_objective_report(self):
+        self.assert_within_budget("objective_report", "task/report/objective/")
+
+    def test_user_calendar(self):
+        self.assert_within_budget(
+            "user_calendar",
+            f"calendar/user/{self.owner.user_id}/",
+            self.date_range,
+        )
+
+    def test_team_calendar(self):
+        self.assert_within_budget(
+            "team_calendar",
+            f"calendar/team/{self.unit.uuid}/",
+            self.date_range,
+        )
+
+    def test_user_calendar_dashboard(self):
+        self.assert_within_budget(
+            "user_calendar_dashboard",
+            f"calendar/user/{self.owner.user_id}/dashboard/",
+            self.date_range,
+        )
+
+    def test_team_calendar_dashboard(self):
+        self.assert_within_budget(
+            "team_calendar_dashboard",
+            f"calendar/team/{self.unit.uuid}/dashboard/",
+            self.date_range,
+        )
+
+    def test_payroll_templates(self):
+        self.assert_within_budget("payroll_templates", "payroll/create/")
+
+    def test_payroll_list(self):
+        self.assert_within_budget(
+            "payroll_list",
+            "payroll/monthly_generate/",
+            {"generated_for": self.seeder.payroll_month},
+        )
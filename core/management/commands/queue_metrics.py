@@ -0,0 +1,22 @@
+"""
+command for the application to print celery queue latency metrics
+"""
+from django.core.management import BaseCommand
+
+from core.utils.queue_metrics import get_queue_metrics
+
+
+class Command(BaseCommand):
+    """
+    Django command to print the depth, wait and run time of every queue
+    """
+
+    def handle(self, *args, **options):
+        for queue, metrics in get_queue_metrics().items():
+            self.stdout.write(
+                f"{queue}: depth={metrics['depth']} "
+                f"started={metrics['started']} "
+                f"failed={metrics['failed']} "
+                f"avg_wait={metrics['wait_seconds_avg']:.3f}s "
+                f"max_wait={metrics['wait_seconds_max']:.3f}s"
+            )
@@ -0,0 +1,57 @@
+"""
+command for the application to print request metrics and sampled profiles
+"""
+from django.core.management import BaseCommand
+
+from core.utils.request_metrics import (
+    get_request_metrics,
+    get_request_profiles,
+)
+
+
+class Command(BaseCommand):
+    """
+    Django command to print the slowest endpoints per tenant and the most
+    recent sampled cProfile reports
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=20,
+            help="number of endpoints to print, slowest first",
+        )
+        parser.add_argument(
+            "--profiles",
+            type=int,
+            default=0,
+            help="number of sampled profiles to print",
+        )
+
+    def handle(self, *args, **options):
+        metrics = sorted(
+            get_request_metrics(),
+            key=lambda entry: entry.get("latency_seconds_total", 0),
+            reverse=True,
+        )
+        for entry in metrics[: options["top"]]:
+            requests = entry.get("requests", 0) or 1
+            self.stdout.write(
+                f"{entry['schema']} {entry['method']} {entry['view']}: "
+                f"requests={int(entry.get('requests', 0))} "
+                f"avg={entry.get('latency_seconds_total', 0) / requests:.3f}s "
+                f"queries={entry.get('queries_total', 0) / requests:.1f} "
+                f"db={entry.get('db_seconds_total', 0) / requests:.3f}s "
+                f"serializer="
+                f"{entry.get('serializer_seconds_total', 0) / requests:.3f}s "
+                f"cache_hits={int(entry.get('cache_hits', 0))} "
+                f"cache_misses={int(entry.get('cache_misses', 0))}"
+            )
+
+        for profile in get_request_profiles()[: options["profiles"]]:
+            self.stdout.write(
+                f"\n{profile['schema']} {profile['method']} {profile['path']} "
+                f"({profile['view']}) {profile['latency_ms']}ms"
+            )
+            self.stdout.write(profile["stats"])
@@ -0,0 +1,131 @@
+"""
+command for the application to run a job against every tenant
+"""
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from client.models import TenantJob
+from core.utils.tenant_jobs import (
+    create_job,
+    get_job_summary,
+    reset_unfinished,
+    run_job,
+    run_job_with_celery,
+)
+
+
+class Command(BaseCommand):
+    """
+    Django command to run a callable or a management command in every
+    tenant schema, e.g
+
+        python manage.py run_tenant_job app.module.backfill --workers 4
+        python manage.py run_tenant_job bulk_create_roles --command
+        python manage.py run_tenant_job --resume 12
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "target",
+            nargs="?",
+            help="dotted path of a callable taking the tenant, "
+            "or a management command name with --command",
+        )
+        parser.add_argument(
+            "arguments",
+            nargs="*",
+            help="arguments passed on to the callable or command",
+        )
+        parser.add_argument("--command", action="store_true")
+        parser.add_argument(
+            "--schemas", help="comma separated schemas to run for"
+        )
+        parser.add_argument(
+            "--exclude", help="comma separated schemas to skip"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=settings.TENANT_JOB_WORKERS
+        )
+        parser.add_argument(
+            "--celery",
+            action="store_true",
+            help="queue the tenants on the bulk workers instead",
+        )
+        parser.add_argument(
+            "--resume",
+            type=int,
+            metavar="JOB_ID",
+            help="run the tenants of a job that did not succeed again",
+        )
+        parser.add_argument(
+            "--report",
+            type=int,
+            metavar="JOB_ID",
+            help="print the summary of a job",
+        )
+
+    def handle(self, *args, **options):
+        if options["report"]:
+            self.write_summary(self.get_job(options["report"]))
+            return
+
+        if options["resume"]:
+            job = self.get_job(options["resume"])
+            count = reset_unfinished(job)
+            self.stdout.write(f"Resuming job {job.pk} for {count} tenants")
+        elif options["target"]:
+            job = create_job(
+                options["target"],
+                options["arguments"],
+                is_command=options["command"],
+                schemas=self.split(options["schemas"]),
+                exclude=self.split(options["exclude"]),
+            )
+            self.stdout.write(
+                f"Created job {job.pk} for {job.results.count()} tenants"
+            )
+        else:
+            raise CommandError("A target, --resume or --report is required")
+
+        if options["celery"]:
+            run_job_with_celery(job)
+            self.stdout.write(
+                f"Queued, follow it with --report {job.pk}"
+            )
+            return
+
+        run_job(job, workers=options["workers"], on_progress=self.progress)
+        self.write_summary(job)
+
+    @staticmethod
+    def get_job(job_id: int) -> TenantJob:
+        try:
+            return TenantJob.objects.get(pk=job_id)
+        except TenantJob.DoesNotExist:
+            raise CommandError(f"Job {job_id} does not exist")
+
+    @staticmethod
+    def split(value):
+        return [item for item in (value or "").split(",") if item]
+
+    def progress(self, outcome, done, total):
+        self.stdout.write(
+            f"[{done}/{total}] {outcome['schema_name']} {outcome['status']} "
+            f"in {outcome['seconds']:.2f}s"
+        )
+
+    def write_summary(self, job: TenantJob):
+        summary = get_job_summary(job)
+        counts = " ".join(
+            f"{status}={count}" for status, count in summary["counts"].items()
+        )
+        self.stdout.write(
+            f"Job {summary['job']} {summary['target']}: {summary['status']} "
+            f"for {summary['tenants']} tenants, {counts}, "
+            f"{summary['seconds_total']:.1f}s of work, "
+            f"slowest tenant {summary['seconds_max']:.1f}s"
+        )
+        for schema_name, seconds in summary["slowest"]:
+            self.stdout.write(f"  {schema_name}: {seconds:.2f}s")
+        for schema_name, error in summary["failed"]:
+            self.stdout.write(self.style.ERROR(f"  {schema_name}: {error}"))
@@ -0,0 +1,45 @@
+"""
+command for the application to start a celery worker for a queue profile
+"""
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from e_metric_api.celery import app
+
+
+class Command(BaseCommand):
+    """
+    Django command to start a celery worker tuned for a workload, the
+    profiles are defined in CELERY_WORKER_PROFILES
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "profile", type=str, choices=list(settings.CELERY_WORKER_PROFILES)
+        )
+        parser.add_argument("--loglevel", type=str, default="INFO")
+
+    def handle(self, *args, **options):
+        profile = settings.CELERY_WORKER_PROFILES.get(options["profile"])
+        if profile is None:
+            raise CommandError(f"Unknown worker profile {options['profile']}")
+
+        argv = [
+            "worker",
+            f"--loglevel={options['loglevel']}",
+            f"--hostname={options['profile']}@%h",
+            f"--queues={','.join(profile['queues'])}",
+            f"--pool={profile['pool']}",
+            f"--concurrency={profile['concurrency']}",
+            f"--prefetch-multiplier={profile['prefetch_multiplier']}",
+        ]
+        if profile.get("max_tasks_per_child"):
+            argv.append(
+                f"--max-tasks-per-child={profile['max_tasks_per_child']}"
+            )
+        if profile["prefetch_multiplier"] == 1:
+            # do not reserve tasks behind a long running one
+            argv.append("-Ofair")
+
+        self.stdout.write(f"Starting celery {' '.join(argv)}")
+        app.worker_main(argv)
@@ -0,0 +1,106 @@
+"""
+command for the application to fill a tenant with synthetic data
+"""
+from datetime import date, time
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from client.models import Client, Domain
+from core.utils.tenant_seed import (
+    DEFAULT_PASSWORD,
+    DEFAULT_TODAY,
+    SIZES,
+    TenantSeeder,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Django command to seed a tenant with a synthetic organisation for load
+    testing, the same seed always produces the same rows
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", type=str)
+        parser.add_argument(
+            "--size", choices=sorted(SIZES), default="small"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--password",
+            type=str,
+            default=DEFAULT_PASSWORD,
+            help="password of every seeded account",
+        )
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            default=DEFAULT_TODAY,
+            help="day the seeded dates are laid out around, YYYY-MM-DD",
+        )
+        parser.add_argument(
+            "--create",
+            action="store_true",
+            help="create the client if it does not exist",
+        )
+
+    def handle(self, *args, **options):
+        name = options["name"].lower()
+        size = SIZES[options["size"]]
+
+        client = Client.objects.filter(schema_name=name).first()
+        if client is None:
+            if not options["create"]:
+                raise CommandError(
+                    f"Client {name} does not exist, pass --create to create it"
+                )
+            self.stdout.write(f"Creating client {name}")
+            client = Client.objects.create(
+                company_name=name,
+                owner_email=f"admin@{name}.test",
+                owner_first_name="admin",
+                owner_last_name=name,
+                work_start_time=time(hour=8),
+                work_stop_time=time(hour=17),
+                work_break_start_time=time(hour=12),
+                work_break_stop_time=time(hour=13),
+                schema_name=name,
+            )
+            Domain.objects.create(domain=name, tenant=client, is_primary=True)
+
+        if client.employee_limit <= size["employees"]:
+            client.employee_limit = size["employees"] + 1
+            client.save(update_fields=["employee_limit"])
+
+        connection.set_tenant(client)
+        if User.objects.filter(email=f"admin@{name}.test").exists():
+            connection.set_schema_to_public()
+            raise CommandError(f"Client {name} has already been seeded")
+
+        self.stdout.write(
+            f"Seeding {name} with a {options['size']} organisation"
+        )
+        started_at = perf_counter()
+        seeder = TenantSeeder(
+            client,
+            size=options["size"],
+            seed=options["seed"],
+            password=options["password"],
+            today=options["today"],
+        )
+        counts = seeder.seed()
+        connection.set_schema_to_public()
+
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(
+            f"Seeded {sum(counts.values())} rows in "
+            f"{perf_counter() - started_at:.1f}s, "
+            f"sign in as {seeder.admin.email}"
+        )
+
@@ -0,0 +1,47 @@
+"""
+command for the application to prepare the tenant template and pool
+"""
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core.utils.tenant_provisioning import (
+    build_template,
+    drain_pool,
+    fill_pool,
+    get_pool_schemas,
+)
+
+
+class Command(BaseCommand):
+    """
+    Django command to migrate the tenant template schema and fill the pool
+    of warm tenant schemas, run it after every deploy
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=settings.TENANT_POOL_SIZE,
+            help="number of warm schemas to keep",
+        )
+        parser.add_argument(
+            "--drain",
+            action="store_true",
+            help="drop every warm schema instead of filling the pool",
+        )
+
+    def handle(self, *args, **options):
+        if options["drain"]:
+            self.stdout.write(f"Dropped {drain_pool()} pooled schemas")
+            return
+
+        self.stdout.write(
+            f"Migrating tenant template {settings.TENANT_TEMPLATE_SCHEMA}"
+        )
+        build_template()
+        cloned = fill_pool(options["size"])
+        self.stdout.write(
+            f"Cloned {cloned} schemas, "
+            f"{len(get_pool_schemas())} schemas in the pool"
+        )
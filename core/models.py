@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 
@@ -16,3 +17,25 @@ class BaseModel(models.Model):
 
     def __str__(self):
         return f"{self.name}"
+
+
+class OutboxEvent(models.Model):
+    """
+    A celery task published by a transaction, sent to the broker by the
+    relay once the transaction committed, see core.utils.outbox
+    """
+
+    task = models.CharField(max_length=255)
+    args = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    # the last argument is a delta, summed with the events of the same
+    # task and leading arguments before sending
+    collapsible = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.task} {self.args}"
@@ -1,3 +1,146 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from core.utils import outbox, report_pool, request_metrics
+
+
+def get_backend():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return threading.current_thread().name, cursor.fetchone()[0]
+
+
+@override_settings(REPORT_POOL_SIZE=3)
+class ReportPoolTests(TransactionTestCase):
+    """
+    The pool runs calls inline inside a transaction, these tests run
+    outside one so that the workers are used
+    """
+
+    def tearDown(self):
+        report_pool.shutdown()
+
+    def test_calls_run_concurrently_on_workers(self):
+        # passes only when the three calls are waiting at the same time
+        barrier = threading.Barrier(3, timeout=10)
+
+        def call():
+            barrier.wait()
+            return get_backend()
+
+        results = report_pool.run_concurrently(
+            {key: call for key in ("a", "b", "c")}
+        )
+
+        self.assertEqual(set(results), {"a", "b", "c"})
+        threads = {thread for thread, _ in results.values()}
+        self.assertTrue(all(name.startswith("report") for name in threads))
+        self.assertEqual(len({pid for _, pid in results.values()}), 3)
+
+    def test_calls_run_inline_inside_a_transaction(self):
+        with transaction.atomic():
+            results = report_pool.run_concurrently(
+                {key: get_backend for key in range(3)}
+            )
+
+        self.assertEqual(
+            {thread for thread, _ in results.values()},
+            {threading.current_thread().name},
+        )
+
+    def test_worker_queries_are_counted_for_the_request(self):
+        metrics = request_metrics.RequestMetrics()
+        token = request_metrics._current.set(metrics)
+        try:
+            with connection.execute_wrapper(request_metrics.count_query):
+                report_pool.run_concurrently(
+                    {key: get_backend for key in range(3)}
+                )
+        finally:
+            request_metrics._current.reset(token)
+
+        # the workers also set the search path of their connections
+        self.assertGreaterEqual(metrics.queries, 3)
+
+    def test_first_exception_is_raised_once_every_call_is_done(self):
+        finished = []
+
+        def fail():
+            raise ValueError("report failed")
+
+        def succeed():
+            finished.append(get_backend())
+
+        with self.assertRaisesMessage(ValueError, "report failed"):
+            report_pool.run_concurrently({"fail": fail, "succeed": succeed})
+        self.assertEqual(len(finished), 1)
+
+
+class RequestMetricsKeyTests(SimpleTestCase):
+    def test_namespaced_view_names_keep_their_colons(self):
+        key = request_metrics.METRICS_KEY.format(
+            schema="acme", view="employee:employee-list", method="GET"
+        )
+
+        self.assertEqual(
+            request_metrics.parse_metrics_key(key),
+            ("acme", "employee:employee-list", "GET"),
+        )
+
+    def test_plain_view_names(self):
+        key = request_metrics.METRICS_KEY.format(
+            schema="acme", view="task-list", method="POST"
+        )
+
+        self.assertEqual(
+            request_metrics.parse_metrics_key(key),
+            ("acme", "task-list", "POST"),
+        )
+
+
+@override_settings(
+    REQUEST_PROFILE_TOKEN="secret", REQUEST_PROFILE_SAMPLE_RATE=0
+)
+class ProfileTokenTests(SimpleTestCase):
+    def should_profile(self, **headers):
+        request = RequestFactory().get("/", **headers)
+        return request_metrics.RequestMetricsMiddleware.should_profile(request)
+
+    def test_matching_token_profiles(self):
+        self.assertTrue(self.should_profile(HTTP_X_PROFILE_TOKEN="secret"))
+
+    def test_other_or_missing_token_does_not_profile(self):
+        self.assertFalse(self.should_profile(HTTP_X_PROFILE_TOKEN="secre"))
+        self.assertFalse(self.should_profile())
+
+
+class OutboxMarkTests(TestCase):
+    def test_one_mark_per_commit(self):
+        with mock.patch.object(outbox, "mark_pending") as mark_pending:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    outbox.mark_pending_on_commit()
+            self.assertEqual(mark_pending.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox.mark_pending_on_commit()
+            self.assertEqual(mark_pending.call_count, 2)
+
+    def test_rolled_back_transaction_does_not_hide_the_next_mark(self):
+        with mock.patch.object(outbox, "mark_pending") as mark_pending:
+            # the hooks of a rolled back transaction never run
+            with self.captureOnCommitCallbacks(execute=False):
+                outbox.mark_pending_on_commit()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                outbox.mark_pending_on_commit()
+            mark_pending.assert_called_once_with(connection.schema_name)
@@ -10,7 +10,7 @@ from core.utils.custom_date_time import (
     convert_to_another_timezone
 )
 from core.utils.custom_pagination import CustomPagination
-from core.utils.generate_token import gen_token, update_login
+from core.utils.generate_token import gen_token, set_claims, update_login
 from core.utils.modify_filename import modify_filename
 from core.utils.base_upload import Upload
 from core.utils.custom_parser import NestedMultipartParser
@@ -0,0 +1,156 @@
+"""
+JWT authentication without a database hit per request. ``gen_token`` signs
+the role, staff flags and employee organisation levels of the user into the
+token, the request user is rebuilt from those claims with every other field
+deferred, so ``request.user.user_role.role`` and ``request.user.employee``
+cost no query. Other fields still load on first access.
+
+Claims go stale when the user or employee rows they were read from change,
+the signals call ``revoke_tokens`` which records the time in the cache. Access
+tokens with claims read before that time are refused until the client gets a
+new one from the refresh endpoint, which reads the claims again. Tokens
+without claims or signed in another schema are authenticated from the
+database as before.
+"""
+import time
+import uuid
+from typing import Dict, Iterable, Optional
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, router, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+REVOKED_KEY_PREFIX = "tokens_revoked:"
+
+
+def revoke_tokens(*user_pks):
+    """Refuses the access tokens of the users issued until now"""
+    revoked_at = time.time()
+    cache.set_many(
+        {f"{REVOKED_KEY_PREFIX}{user_pk}": revoked_at for user_pk in user_pks},
+        # older tokens have expired by then
+        timeout=int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    )
+
+
+def revoke_tokens_on_commit(*user_pks):
+    user_pks = {user_pk for user_pk in user_pks if user_pk is not None}
+    if user_pks:
+        transaction.on_commit(lambda: revoke_tokens(*user_pks))
+
+
+def is_revoked(validated_token) -> bool:
+    revoked_at = cache.get(
+        f"{REVOKED_KEY_PREFIX}{validated_token[api_settings.USER_ID_CLAIM]}"
+    )
+    return revoked_at is not None and validated_token["claims_at"] < revoked_at
+
+
+def get_changed_claims(
+    instance, fields: Iterable[str], update_fields=None
+) -> Optional[Dict]:
+    """
+    The stored values of ``fields`` when saving ``instance`` changes one of
+    them, else None. Saves limited to other fields, like the ``last_login``
+    update on login, are skipped without a query.
+    """
+    if instance._state.adding or instance.pk is None:
+        return None
+    if update_fields is not None and not {
+        instance._meta.get_field(field).name for field in fields
+    } & set(update_fields):
+        return None
+
+    stored = (
+        type(instance)
+        ._base_manager.filter(pk=instance.pk)
+        .values(*fields)
+        .first()
+    )
+    if stored is None:
+        return None
+    if all(stored[field] == getattr(instance, field) for field in fields):
+        return None
+    return stored
+
+
+def build_instance(model, db: str, values: Dict):
+    """``model`` with ``values`` loaded and every other field deferred"""
+    field_names = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname in values
+    ]
+    return model.from_db(
+        db, field_names, [values[name] for name in field_names]
+    )
+
+
+def get_principal(validated_token) -> User:
+    """The request user rebuilt from the claims of ``validated_token``"""
+    db = router.db_for_read(User)
+    user = build_instance(
+        User,
+        db,
+        {
+            api_settings.USER_ID_FIELD: validated_token[
+                api_settings.USER_ID_CLAIM
+            ],
+            "email": validated_token["email"],
+            "user_id": uuid.UUID(validated_token["uuid"]),
+            "user_role_id": validated_token["user_role_id"],
+            # deactivating a user revokes their tokens
+            "is_active": True,
+            "is_staff": validated_token["is_staff"],
+            "is_superuser": validated_token["is_superuser"],
+        },
+    )
+
+    role = None
+    if validated_token["user_role_id"] is not None:
+        Role = User._meta.get_field("user_role").related_model
+        role = build_instance(
+            Role,
+            db,
+            {
+                "id": validated_token["user_role_id"],
+                "role": validated_token["user_role"],
+            },
+        )
+    User._meta.get_field("user_role").set_cached_value(user, role)
+
+    Employee = apps.get_model("employee", "Employee")
+    employee_user_field = Employee._meta.get_field("user")
+    employee = None
+    claims = validated_token["employee"]
+    if claims is not None:
+        employee = build_instance(
+            Employee,
+            db,
+            {**claims, "uuid": uuid.UUID(claims["uuid"]), "user_id": user.pk},
+        )
+        employee_user_field.set_cached_value(employee, user)
+    # None makes request.user.employee raise DoesNotExist as it would
+    employee_user_field.remote_field.set_cached_value(user, employee)
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` building the request user from token claims"""
+
+    def get_user(self, validated_token):
+        if (
+            "claims_at" not in validated_token
+            or validated_token.get("schema") != connection.schema_name
+        ):
+            return super().get_user(validated_token)
+
+        if is_revoked(validated_token):
+            raise InvalidToken("Token has been revoked, refresh it")
+        return get_principal(validated_token)
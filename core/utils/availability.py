@@ -0,0 +1,130 @@
+"""
+Free/busy availability. The busy calendar events of a user, or of every
+member of a team, over a window are loaded with one query and merged into
+sorted disjoint intervals, an overlap check is then a binary search instead
+of a query. Free slots are found walking the work hours of the tenant
+around its break and holidays, jumping over busy intervals.
+
+Intervals are half open, an event ending at 10:00 leaves 10:00 free.
+"""
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.utils.process_durations import get_localized_time
+from emetric_calendar.models import UserScheduledEventCalendar
+
+
+Interval = Tuple[datetime, datetime]
+
+
+class BusyIntervals:
+    """Busy intervals merged into sorted, disjoint intervals"""
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Interval]:
+        return zip(self.starts, self.ends)
+
+    def overlap_end(
+        self, start: datetime, end: datetime
+    ) -> Optional[datetime]:
+        """
+        The end of the last busy interval overlapping ``start`` to ``end``,
+        None when the interval is free
+        """
+        # the last busy interval starting before the end
+        index = bisect_left(self.starts, end) - 1
+        if index >= 0 and self.ends[index] > start:
+            return self.ends[index]
+        return None
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        return self.overlap_end(start, end) is None
+
+
+def load_busy_intervals(
+    start: datetime, end: datetime, **filters
+) -> BusyIntervals:
+    """
+    The busy intervals of the calendar events selected with ``filters``
+    overlapping ``start`` to ``end``, e.g ``user=user``
+    """
+    return BusyIntervals(
+        UserScheduledEventCalendar.objects.filter(
+            start_time__lt=end, end_time__gt=start, is_free=False, **filters
+        ).values_list("start_time", "end_time")
+    )
+
+
+def get_window(date_after: date, date_before: date, tenant) -> Interval:
+    """The localized start and end of the days ``date_after`` to
+    ``date_before``"""
+    return (
+        get_localized_time(date_after, time.min, tenant.timezone),
+        get_localized_time(
+            date_before + timedelta(days=1), time.min, tenant.timezone
+        ),
+    )
+
+
+def iter_work_periods(
+    date_after: date, date_before: date, tenant, holidays: Set[date]
+) -> Iterator[Interval]:
+    """The localized work periods of the tenant between the dates, before
+    and after its break, holidays skipped"""
+    current = date_after
+    while current <= date_before:
+        if tenant.is_work_day(current) and current not in holidays:
+            for period_start, period_stop in (
+                (tenant.work_start_time, tenant.work_break_start_time),
+                (tenant.work_break_stop_time, tenant.work_stop_time),
+            ):
+                if period_start < period_stop:
+                    yield (
+                        get_localized_time(
+                            current, period_start, tenant.timezone
+                        ),
+                        get_localized_time(
+                            current, period_stop, tenant.timezone
+                        ),
+                    )
+        current += timedelta(days=1)
+
+
+def find_free_slots(
+    busy: BusyIntervals,
+    duration: timedelta,
+    periods: Iterable[Interval],
+    count: int,
+    not_before: datetime = None,
+) -> List[Interval]:
+    """The first ``count`` free slots of ``duration`` within ``periods``"""
+    slots = []
+    for period_start, period_end in periods:
+        cursor = period_start
+        if not_before is not None and cursor < not_before:
+            cursor = not_before
+
+        while cursor + duration <= period_end:
+            blocked_until = busy.overlap_end(cursor, cursor + duration)
+            if blocked_until is not None:
+                cursor = blocked_until
+                continue
+
+            slots.append((cursor, cursor + duration))
+            if len(slots) == count:
+                return slots
+            cursor += duration
+    return slots
@@ -0,0 +1,142 @@
+"""
+Set based deletes. ``bulk_delete`` deletes a queryset in one transaction
+through Django's collector, which deletes the rows and their cascades a
+model at a time. The delete receivers still run for every row, but inside
+a bulk delete they hand their clean up to the running ``DeleteCleanup``
+instead of sending queries:
+
+* periodic tasks are deleted with one queryset delete
+* target point adjustments are summed per upline and published to the
+  outbox, uplines deleted in the same transaction are skipped
+* rows the receivers delete in turn, like the user of an employee, are
+  deleted together per model
+* each cached queryset is invalidated once, revoked tokens are set at once
+
+Deletes go through ``QuerySet.delete`` only, the receivers of django
+celery beat keep telling beat about removed schedules.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Optional
+
+from django.db import transaction
+from django_celery_beat.models import PeriodicTask
+
+from core.utils.authentication import revoke_tokens_on_commit
+from core.utils.change_versions import invalidate
+from core.utils.outbox import publish_many
+
+
+# celery task updating the target point of an upline, per upline model
+TARGET_POINT_TASKS = {
+    "strategy_deck.Initiative": "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
+    "strategy_deck.Objective": "strategy_deck.tasks.objective.update_upline_objective_target_point",
+    "strategy_deck.Perspective": "strategy_deck.tasks.perspective.update_connected_perspective_target_point",
+}
+
+_cleanup = ContextVar("delete_cleanup", default=None)
+
+
+def delete_periodic_tasks(names):
+    """
+    Deletes the periodic tasks named ``names`` together, their tenant links
+    cascade. Beat is told by the delete receiver of ``PeriodicTask``.
+    """
+    PeriodicTask.objects.filter(name__in=names).delete()
+
+
+class DeleteCleanup:
+    """Clean up collected from the delete receivers of a bulk delete"""
+
+    def __init__(self):
+        self.periodic_task_names = set()
+        self.queryset_names = set()
+        self.revoked_user_pks = set()
+        # model -> primary keys
+        self.pending_deletes = defaultdict(set)
+        # (upline model, uuid field) -> {uuid: target point}
+        self.target_points = defaultdict(lambda: defaultdict(Decimal))
+
+    def delete_periodic_tasks(self, *names: str):
+        self.periodic_task_names.update(names)
+
+    def invalidate(self, *names: str):
+        self.queryset_names.update(names)
+
+    def revoke_tokens(self, *user_pks):
+        self.revoked_user_pks.update(user_pks)
+
+    def delete_later(self, model, *pks):
+        """Deletes the ``model`` rows ``pks`` after the current delete"""
+        self.pending_deletes[model].update(
+            pk for pk in pks if pk is not None
+        )
+
+    def adjust_target_point(self, model, field: str, value, target_point):
+        """
+        Adds ``target_point`` to the upline ``model`` row whose ``field``
+        is ``value``, uplines deleted in the meantime are skipped
+        """
+        if value is not None:
+            self.target_points[(model, field)][value] += Decimal(target_point)
+
+    def run(self):
+        # receivers of these deletes report to this clean up as well
+        while self.pending_deletes:
+            model, pks = self.pending_deletes.popitem()
+            model._base_manager.filter(pk__in=pks).delete()
+
+        if self.periodic_task_names:
+            delete_periodic_tasks(self.periodic_task_names)
+        if self.queryset_names:
+            invalidate(*self.queryset_names)
+        revoke_tokens_on_commit(*self.revoked_user_pks)
+
+        for (model, field), points in self.target_points.items():
+            pks = dict(
+                model.objects.filter(**{f"{field}__in": points}).values_list(
+                    field, "pk"
+                )
+            )
+            publish_many(
+                TARGET_POINT_TASKS[model._meta.label],
+                (
+                    (pks[value], point)
+                    for value, point in points.items()
+                    if value in pks and point
+                ),
+                collapsible=True,
+            )
+
+
+def get_delete_cleanup() -> Optional[DeleteCleanup]:
+    """The clean up of the running bulk delete, None outside of one"""
+    return _cleanup.get()
+
+
+@contextmanager
+def delete_cleanup():
+    """Collects the clean up of the rows deleted inside, runs it at the end"""
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        # nested in a running bulk delete, which cleans up at its end
+        yield cleanup
+        return
+
+    cleanup = DeleteCleanup()
+    token = _cleanup.set(cleanup)
+    try:
+        with transaction.atomic():
+            yield cleanup
+            cleanup.run()
+    finally:
+        _cleanup.reset(token)
+
+
+def bulk_delete(queryset) -> int:
+    """Deletes ``queryset`` with the clean up of its rows batched"""
+    with delete_cleanup():
+        deleted, _ = queryset.delete()
+    return deleted
@@ -0,0 +1,51 @@
+from django.core.exceptions import ValidationError
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """Looks up every slug of the list with one query"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        slug_field = queryset.model._meta.get_field(child.slug_field)
+        try:
+            # the same slug written differently, e.g. uuids, looks up once
+            slugs = [str(slug_field.to_python(slug)) for slug in data]
+        except (TypeError, ValueError, ValidationError):
+            child.fail("invalid")
+
+        found = {
+            str(getattr(obj, child.slug_field)): obj
+            for obj in queryset.filter(**{f"{child.slug_field}__in": slugs})
+        }
+        for slug, value in zip(slugs, data):
+            if slug not in found:
+                child.fail(
+                    "does_not_exist",
+                    slug_name=child.slug_field,
+                    value=smart_str(value),
+                )
+        return [found[slug] for slug in slugs]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """
+    ``SlugRelatedField`` which, with ``many=True``, validates the whole list
+    with one query instead of one query per item
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
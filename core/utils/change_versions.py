@@ -0,0 +1,128 @@
+"""
+Per tenant change versions. The signals that drop a cached queryset, e.g
+``task_queryset``, call ``invalidate`` which also moves the version of the
+queryset forward. List and report views declare the querysets their
+response is built from and answer conditional GETs with ``304 Not
+Modified`` from the versions alone, without querying the tables.
+
+The cache keys are prefixed with the tenant schema by the cache key
+function, so every tenant has its own versions.
+"""
+import hashlib
+import time
+from functools import wraps
+from typing import Dict, Iterable, Tuple
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils import timezone
+from django.utils.http import http_date, quote_etag
+
+
+VERSION_KEY_PREFIX = "change_version:"
+
+
+def invalidate(*names: str):
+    """
+    Drops the cached querysets and moves their change versions forward
+    once the transaction commits. A version moved before the commit would
+    let a concurrent request store the old rows under the new ETag.
+    """
+    cache.delete_many(names)
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many(
+            {f"{VERSION_KEY_PREFIX}{name}": version for name in names},
+            timeout=None,
+        )
+
+    transaction.on_commit(bump)
+
+
+def get_versions(names: Iterable[str]) -> Dict[str, int]:
+    """
+    Current versions of ``names``, versions missing from the cache start
+    now so that nothing cached by clients before is taken as current
+    """
+    keys = {f"{VERSION_KEY_PREFIX}{name}": name for name in names}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_validators(request, names: Iterable[str]) -> Tuple[str, int]:
+    """
+    The ETag and last modification timestamp of the response to
+    ``request``, the ETag differs per tenant, user and query string
+    """
+    versions = get_versions(names)
+    user = getattr(request, "user", None)
+    signature = "|".join(
+        [
+            connection.schema_name,
+            str(getattr(user, "pk", None)),
+            request.get_full_path(),
+            timezone.localdate().isoformat(),
+            *(f"{name}={versions[name]}" for name in sorted(versions)),
+        ]
+    )
+    etag = quote_etag(hashlib.md5(signature.encode()).hexdigest())
+    return etag, max(versions.values(), default=0) // 10 ** 9
+
+
+def get_not_modified_response(request, etag: str, last_modified: int):
+    """``304 Not Modified`` when the client copy is current, else None"""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag: str, last_modified: int):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # responses depend on the authenticated user
+    patch_vary_headers(response, ("Authorization",))
+
+
+def conditional_response(
+    request, names: Iterable[str], get_response, *args, **kwargs
+):
+    if request.method not in ("GET", "HEAD") or not names:
+        return get_response(request, *args, **kwargs)
+
+    etag, last_modified = get_validators(request, names)
+    response = get_not_modified_response(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    response = get_response(request, *args, **kwargs)
+    if response.status_code == 200:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def conditional_get(*names: str):
+    """
+    Conditional GET on the change versions of the cached querysets
+    ``names``. Place it below ``api_view`` and ``permission_classes`` on
+    function views so that the request is authenticated first, class views
+    use ``method_decorator(conditional_get(...), name="get")``
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return conditional_response(request, names, view, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
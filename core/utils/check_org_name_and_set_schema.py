@@ -5,7 +5,7 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework import serializers
 from account.models.roles import Role
 
-from client.models import Client
+from core.utils.tenant_registry import get_tenant_by_schema
 
 
 User = get_user_model()
@@ -14,11 +14,8 @@ User = get_user_model()
 def check_organization_name_and_set_appropriate_schema(
     organisation_short_name, user_email
 ):
-    tenant_exist_qs = Client.objects.filter(
-        schema_name=organisation_short_name
-    )
-    tenant = tenant_exist_qs.first()
-    if not tenant_exist_qs.exists():
+    tenant = get_tenant_by_schema(organisation_short_name)
+    if tenant is None:
         raise serializers.ValidationError(
             {
                 "organisation_short_name": "Organisation short name does not exist"
@@ -1,21 +1,281 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+from functools import reduce
 from math import ceil
+from operator import and_, or_
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
 from rest_framework import status, pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from core.utils import response_data
 from e_metric_api.settings import REST_FRAMEWORK
 
 
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds DjangoJSONEncoder drops, positions are exact"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
 class CustomPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination, or keyset pagination when the request sends a
+    ``cursor`` query parameter (empty for the first page). Keyset pages
+    filter on the last row of the previous page instead of an OFFSET, so
+    deep pages cost the same as the first one. Views set
+    ``cursor_ordering`` to a unique ordering, e.g ("-updated_at", "id"),
+    otherwise the queryset ordering with the primary key appended is used.
+    Relations in the ordering are ordered by their key column. Lists, like
+    the report rows, are always paginated by page number.
+
+    In cursor mode the ``count`` query parameter picks how the total is
+    computed, ``exact``, ``estimate`` from the query planner, ``cached``
+    for an exact count kept for ``PAGINATION_COUNT_CACHE_TIMEOUT`` seconds
+    or ``none``.
+    """
+
     page_size = REST_FRAMEWORK.get("PAGE_SIZE")
     page_size_query_param = "page_size"
     # max_page_size = 50
     page_query_param = "page"
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    count_modes = ("exact", "estimate", "cached", "none")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.is_cursor = self.cursor_query_param in request.query_params and (
+            isinstance(queryset, QuerySet)
+        )
+        if not self.is_cursor:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_cursor_ordering(queryset, request, view)
+        position, reverse = self.decode_cursor(request)
+        ordering = (
+            [self.flip(field) for field in self.ordering]
+            if reverse
+            else self.ordering
+        )
+
+        page_queryset = queryset.order_by(*ordering)
+        if position is not None:
+            page_queryset = page_queryset.filter(
+                self.after_position(ordering, position)
+            )
+        rows = list(page_queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # moving backwards, the page that was left is always ahead
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        self.count, self.count_mode = self.get_count(queryset, request)
+        return rows
 
     def get_paginated_response(self, data):
+        if not self.is_cursor:
+            data = response_data(200, "All data", data)
+            data["count"] = self.page.paginator.count
+            data["next"] = self.get_next_link()
+            data["previous"] = self.get_previous_link()
+            data["page_count"] = ceil(data["count"] / self.page_size)
+            return Response(data, status=status.HTTP_200_OK)
+
         data = response_data(200, "All data", data)
-        data["count"] = self.page.paginator.count
-        data["next"] = self.get_next_link()
-        data["previous"] = self.get_previous_link()
-        data["page_count"] = ceil(data["count"] / self.page_size)
+        data["count"] = self.count
+        data["count_mode"] = self.count_mode
+        data["next"] = self.get_cursor_link(self.last_row, self.has_next)
+        data["previous"] = self.get_cursor_link(
+            self.first_row, self.has_previous, reverse=True
+        )
+        data["page_count"] = (
+            ceil(self.count / self.page_size)
+            if self.count is not None
+            else None
+        )
         return Response(data, status=status.HTTP_200_OK)
+
+    def get_cursor_ordering(self, queryset, request, view) -> List[str]:
+        ordering = getattr(view, "cursor_ordering", None)
+        requested = view is not None and any(
+            getattr(backend, "ordering_param", None) in request.query_params
+            for backend in getattr(view, "filter_backends", ())
+        )
+        if not ordering or requested:
+            ordering = [
+                field
+                for field in (
+                    queryset.query.order_by or queryset.model._meta.ordering
+                )
+                if isinstance(field, str)
+            ]
+        ordering = [
+            self.resolve_relation(queryset.model, field) for field in ordering
+        ]
+        if not {"pk", "-pk", "id", "-id"} & set(ordering):
+            ordering.append("pk")
+        return ordering
+
+    @staticmethod
+    def resolve_relation(model, field: str) -> str:
+        """
+        ``field`` ending on a relation as its key column, e.g "user" as
+        "user_id". SQL would order by the Meta ordering of the related model
+        while the cursor holds its key, so rows would be skipped or repeated.
+        """
+        prefix = "-" if field.startswith("-") else ""
+        names = field.lstrip("-").split("__")
+        for index, name in enumerate(names):
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # pk, annotations and transforms are left as they are
+                break
+            if not model_field.is_relation:
+                break
+            if index == len(names) - 1:
+                if model_field.concrete:
+                    names[index] = model_field.attname
+                break
+            model = model_field.related_model
+        return prefix + "__".join(names)
+
+    @staticmethod
+    def flip(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def after_position(ordering: List[str], position: List) -> Q:
+        """
+        Rows strictly after ``position`` in the ordering, PostgreSQL sorts
+        nulls last in ascending and first in descending order
+        """
+
+        def after(field: str, value) -> Optional[Q]:
+            name = field.lstrip("-")
+            if field.startswith("-"):
+                if value is None:
+                    return Q(**{f"{name}__isnull": False})
+                return Q(**{f"{name}__lt": value})
+            if value is None:
+                return None
+            return Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+
+        def equal(field: str, value) -> Q:
+            name = field.lstrip("-")
+            if value is None:
+                return Q(**{f"{name}__isnull": True})
+            return Q(**{name: value})
+
+        conditions = []
+        for index, (field, value) in enumerate(zip(ordering, position)):
+            condition = after(field, value)
+            if condition is None:
+                continue
+            conditions.append(
+                reduce(
+                    and_,
+                    [
+                        equal(previous_field, previous_value)
+                        for previous_field, previous_value in zip(
+                            ordering[:index], position[:index]
+                        )
+                    ],
+                    condition,
+                )
+            )
+        # nothing comes after the last possible position
+        return reduce(or_, conditions) if conditions else Q(pk__in=[])
+
+    def get_position(self, row) -> List:
+        position = []
+        for field in self.ordering:
+            value = row
+            for attribute in field.lstrip("-").split("__"):
+                value = getattr(value, attribute, None)
+                if value is None:
+                    break
+            if isinstance(value, Model):
+                value = value.pk
+            position.append(value)
+        return position
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        payload = json.dumps(
+            {"p": self.get_position(row), "r": reverse}, cls=CursorEncoder
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request) -> Tuple[Optional[List], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound("Invalid cursor")
+        return position, reverse
+
+    def get_cursor_link(self, row, exists: bool, reverse: bool = False):
+        if not exists or row is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(row, reverse)
+        )
+
+    def get_count(self, queryset, request) -> Tuple[Optional[int], str]:
+        mode = request.query_params.get(
+            self.count_query_param, settings.PAGINATION_COUNT_MODE
+        )
+        if mode not in self.count_modes:
+            mode = settings.PAGINATION_COUNT_MODE
+
+        if mode == "none":
+            return None, mode
+        if mode == "exact":
+            return queryset.count(), mode
+        sql, params = queryset.order_by().query.sql_with_params()
+        if mode == "estimate":
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            return int(plan[0]["Plan"]["Plan Rows"]), mode
+
+        key = "pagination_count:" + hashlib.md5(
+            f"{sql}{params}".encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count, mode
@@ -1,9 +1,108 @@
+import sys
+from types import ModuleType
+
 from django.conf import settings
+from django.db import connection
+from django.urls import URLResolver, set_urlconf, clear_url_caches
+from django.utils.module_loading import import_string
 from django_tenants.middleware import TenantSubfolderMiddleware
-from django_tenants.utils import has_multi_type_tenants, get_public_schema_name
+from django_tenants.urlresolvers import (
+    TenantPrefixPattern,
+    get_subfolder_urlconf,
+)
+from django_tenants.utils import (
+    has_multi_type_tenants,
+    get_public_schema_name,
+    get_subfolder_prefix,
+)
+
+from core.utils.tenant_registry import (
+    get_tenant_by_schema,
+    get_tenant_by_subfolder,
+)
+
+
+class TenantSubfolderPattern(TenantPrefixPattern):
+    """
+    Prefix of the subfolder the middleware resolved the tenant from, the
+    django-tenants pattern looks the domain up again on every match
+    """
+
+    @property
+    def tenant_prefix(self):
+        subfolder = getattr(connection.tenant, "domain_subfolder", None)
+        if not subfolder:
+            return "/"
+        return "{}/{}/".format(get_subfolder_prefix(), subfolder)
+
+
+class SubfolderURLConfModule(ModuleType):
+    """``ROOT_URLCONF`` with its patterns under the tenant subfolder"""
+
+    def __getattr__(self, attr):
+        imported = import_string("{}.{}".format(settings.ROOT_URLCONF, attr))
+        if attr == "urlpatterns":
+            return [URLResolver(TenantSubfolderPattern(), list(imported))]
+        return imported
+
+
+def get_tenant_urlconf(tenant) -> str:
+    if has_multi_type_tenants():
+        return get_subfolder_urlconf(tenant)
+    dynamic_path = settings.ROOT_URLCONF + "_subfolder_prefixed"
+    if not sys.modules.get(dynamic_path):
+        sys.modules[dynamic_path] = SubfolderURLConfModule(dynamic_path)
+    return dynamic_path
 
 
 class CustomTenantSubFolderMiddleware(TenantSubfolderMiddleware):
+    def process_request(self, request):
+        """
+        Sets the tenant of the url subfolder, ``TenantSubfolderMiddleware``
+        with the tenant resolved from the tenant registry instead of a query
+        :param request:
+        :return:
+        """
+        if hasattr(request, "tenant"):
+            return
+
+        connection.set_schema_to_public()
+
+        urlconf = None
+        hostname = self.hostname_from_request(request)
+        subfolder_prefix_path = "/{}/".format(get_subfolder_prefix())
+
+        # We are in the public tenant
+        if not request.path.startswith(subfolder_prefix_path):
+            tenant = get_tenant_by_schema(get_public_schema_name())
+            if tenant is None:
+                raise self.TENANT_NOT_FOUND_EXCEPTION(
+                    "Unable to find public tenant"
+                )
+
+            self.setup_url_routing(request, force_public=True)
+
+        # We are in a specific tenant
+        else:
+            path_chunks = request.path[len(subfolder_prefix_path) :].split("/")
+            tenant_subfolder = path_chunks[0]
+            tenant = get_tenant_by_subfolder(tenant_subfolder)
+            if tenant is None:
+                return self.no_tenant_found(request, hostname)
+
+            tenant.domain_subfolder = tenant_subfolder
+            urlconf = get_tenant_urlconf(tenant)
+
+        tenant.domain_url = hostname
+        request.tenant = tenant
+
+        connection.set_tenant(request.tenant)
+        clear_url_caches()
+
+        if urlconf:
+            request.urlconf = urlconf
+            set_urlconf(urlconf)
+
     @staticmethod
     def setup_url_routing(request, force_public=False):
         """
@@ -1,15 +1,61 @@
+import time
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.db import connection
 from rest_framework_simplejwt.tokens import RefreshToken
 
 User = get_user_model()
 
+# the employee row and organisation levels of the user, read by
+# core.utils.authentication to build the request user without queries
+EMPLOYEE_CLAIM_FIELDS = (
+    "id",
+    "uuid",
+    "corporate_level_id",
+    "division_id",
+    "group_id",
+    "department_id",
+    "unit_id",
+)
+
+
+def get_employee_claims(user: User):
+    Employee = apps.get_model("employee", "Employee")
+    employee = (
+        Employee.objects.filter(user=user)
+        .values(*EMPLOYEE_CLAIM_FIELDS)
+        .first()
+    )
+    if employee is None:
+        return None
+    employee["uuid"] = str(employee["uuid"])
+    return employee
+
+
+def set_claims(token, user: User):
+    """
+    Sets the claims of ``user`` on ``token``, the access tokens made from
+    it carry the claims over
+    """
+    token["email"] = user.email
+    token["uuid"] = str(user.user_id)
+    token["user_role"] = user.user_role.role if user.user_role else None
+    token["user_role_id"] = user.user_role_id
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["schema"] = connection.schema_name
+    token["employee"] = get_employee_claims(user)
+    # tokens with claims read before the user was last revoked are refused
+    token["claims_at"] = time.time()
+
+    return token
+
 
 def gen_token(user: User):
     token = RefreshToken.for_user(user)
     # Add custom claims
-    token["email"] = user.email
-    token["uuid"] = str(user.user_id)
-    token["user_role"] = user.user_role.role
+    set_claims(token, user)
 
     return token
 
@@ -0,0 +1,262 @@
+"""
+Holiday changes. The tasks starting on a batch of new holidays are loaded
+with one query, along with the number of their calendar events, then a
+policy is applied to them set based:
+
+* ``drop`` deletes them with ``bulk_delete``
+* ``shift`` moves the pending ones to the next work day at the same time,
+  with one update per new date, start time and duration. A task whose owner
+  is not free then, or which already started, is flagged instead
+* ``flag`` leaves them on the holiday for review
+
+What happened is recorded on a ``HolidayChange``.
+"""
+from collections import defaultdict
+from itertools import chain
+from datetime import date, timedelta
+from typing import Dict, Iterable, Set
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Value, When
+from django_celery_beat.models import (
+    ClockedSchedule,
+    PeriodicTask,
+    PeriodicTasks,
+)
+
+from core.utils.availability import BusyIntervals
+from core.utils.bulk_delete import bulk_delete
+from core.utils.change_versions import invalidate
+from core.utils.process_durations import (
+    get_localized_time,
+    process_end_date_time,
+)
+from emetric_calendar.models import (
+    Holiday,
+    HolidayChange,
+    UserScheduledEventCalendar,
+)
+from tasks.models import Task
+
+
+def get_next_work_day(current: date, holidays: Set[date], tenant) -> date:
+    """The first work day after ``current`` that is not a holiday"""
+    # a tenant without work days keeps the date
+    for days in range(1, 366):
+        next_day = current + timedelta(days=days)
+        if tenant.is_work_day(next_day) and next_day not in holidays:
+            return next_day
+    return current
+
+
+def load_busy_intervals_by_user(
+    user_ids: Iterable, start, end, excluded_dates: Iterable[date]
+) -> Dict[object, BusyIntervals]:
+    """
+    The busy intervals of the users ``user_ids`` between ``start`` and
+    ``end``, the events of tasks starting on ``excluded_dates`` left out
+    """
+    intervals = defaultdict(list)
+    for user_id, start_time, end_time in (
+        UserScheduledEventCalendar.objects.filter(
+            user_id__in=user_ids,
+            start_time__lt=end,
+            end_time__gt=start,
+            is_free=False,
+        )
+        .exclude(task__start_date__in=excluded_dates)
+        .values_list("user_id", "start_time", "end_time")
+    ):
+        intervals[user_id].append((start_time, end_time))
+    return defaultdict(
+        BusyIntervals,
+        {
+            user_id: BusyIntervals(user_intervals)
+            for user_id, user_intervals in intervals.items()
+        },
+    )
+
+
+def update_moved_tasks(groups: dict, moves: dict):
+    """
+    Moves the tasks of ``groups``, keyed by new date, start time and
+    duration, to their new start and end, ``moves``, with one statement per
+    table
+    """
+    task_pks = {
+        key: [task["id"] for task in group] for key, group in groups.items()
+    }
+    task_ids = {
+        key: [task["task_id"] for task in group]
+        for key, group in groups.items()
+    }
+
+    Task.objects.filter(pk__in=chain(*task_pks.values())).update(
+        start_date=Case(
+            *(
+                When(pk__in=pks, then=Value(key[0]))
+                for key, pks in task_pks.items()
+            )
+        )
+    )
+    UserScheduledEventCalendar.objects.filter(
+        task_id__in=chain(*task_ids.values())
+    ).update(
+        **{
+            field: Case(
+                *(
+                    When(task_id__in=ids, then=Value(moves[key][index]))
+                    for key, ids in task_ids.items()
+                )
+            )
+            for index, field in enumerate(("start_time", "end_time"))
+        }
+    )
+
+    # a clocked schedule per time, as get_or_create would
+    clocked_times = {time for move in moves.values() for time in move}
+    clocked = dict(
+        ClockedSchedule.objects.filter(
+            clocked_time__in=clocked_times
+        ).values_list("clocked_time", "pk")
+    )
+    clocked.update(
+        (schedule.clocked_time, schedule.pk)
+        for schedule in ClockedSchedule.objects.bulk_create(
+            ClockedSchedule(clocked_time=time)
+            for time in clocked_times - clocked.keys()
+        )
+    )
+
+    names = {
+        f"{task_id} {suffix}": clocked[moves[key][index]]
+        for key, ids in task_ids.items()
+        for task_id in ids
+        for index, suffix in enumerate(("active", "over_due"))
+    }
+    if PeriodicTask.objects.filter(name__in=names).update(
+        clocked_id=Case(
+            *(When(name=name, then=Value(pk)) for name, pk in names.items())
+        )
+    ):
+        # updates skip the signal telling beat about schedule changes
+        PeriodicTasks.update_changed()
+
+
+def shift_tasks(change: HolidayChange, tasks: list, tenant):
+    """Moves ``tasks`` to the next work day, flags those that cannot move"""
+    holidays = set(change.dates) | set(
+        Holiday.objects.filter(date__gt=change.dates[0]).values_list(
+            "date", flat=True
+        )
+    )
+    next_days = {
+        current: get_next_work_day(current, holidays, tenant)
+        for current in change.dates
+    }
+
+    movable = [
+        task
+        for task in tasks
+        if task["task_status"] == Task.PENDING
+        and task["start_time"] is not None
+        and next_days[task["start_date"]] != task["start_date"]
+    ]
+    if not movable:
+        change.flagged = [task["task_id"] for task in tasks]
+        return
+
+    # new start and end per new date, start time and duration
+    moves = {}
+    for task in movable:
+        key = (
+            next_days[task["start_date"]],
+            task["start_time"],
+            task["duration"],
+        )
+        if key not in moves:
+            moves[key] = (
+                get_localized_time(*key[:2], tenant.timezone),
+                process_end_date_time(*key, tenant),
+            )
+        task["move"] = key
+
+    busy = load_busy_intervals_by_user(
+        {task["owner_id"] for task in movable},
+        min(start for start, _ in moves.values()),
+        max(end for _, end in moves.values()),
+        change.dates,
+    )
+
+    groups = defaultdict(list)
+    for task in movable:
+        start, end = moves[task["move"]]
+        owner_busy = busy[task["owner_id"]]
+        if not owner_busy.is_free(start, end):
+            continue
+        # the shifted tasks of the owner must not overlap either
+        busy[task["owner_id"]] = BusyIntervals(
+            list(owner_busy) + [(start, end)]
+        )
+        groups[task["move"]].append(task)
+
+    if groups:
+        update_moved_tasks(groups, moves)
+
+    shifted = {
+        task["task_id"] for group in groups.values() for task in group
+    }
+    change.shifted_count = len(shifted)
+    change.flagged = [
+        task["task_id"] for task in tasks if task["task_id"] not in shifted
+    ]
+
+
+def apply_holidays(
+    dates: Iterable[date], policy: str = None
+) -> HolidayChange:
+    """
+    Applies ``policy``, ``HOLIDAY_TASK_POLICY`` by default, to the tasks
+    starting on the holidays ``dates``
+    """
+    tenant = connection.tenant
+    change = HolidayChange(
+        policy=policy or settings.HOLIDAY_TASK_POLICY,
+        dates=sorted(set(dates)),
+    )
+    if not change.dates:
+        return change
+
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.filter(start_date__in=change.dates)
+            .annotate(event_count=Count("userscheduledeventcalendar"))
+            .values(
+                "id",
+                "task_id",
+                "start_date",
+                "start_time",
+                "duration",
+                "task_status",
+                "event_count",
+                owner_id=F("upline_initiative__owner_id"),
+            )
+        )
+        change.task_count = len(tasks)
+        change.event_count = sum(task["event_count"] for task in tasks)
+
+        if tasks and change.policy == HolidayChange.DROP:
+            bulk_delete(
+                Task.objects.filter(pk__in=[task["id"] for task in tasks])
+            )
+            change.dropped_count = len(tasks)
+        elif tasks and change.policy == HolidayChange.SHIFT:
+            shift_tasks(change, tasks, tenant)
+        else:
+            change.flagged = [task["task_id"] for task in tasks]
+
+        change.save()
+        if change.shifted_count:
+            invalidate("task_queryset")
+    return change
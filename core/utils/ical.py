@@ -0,0 +1,171 @@
+"""
+iCalendar feeds of the user and team calendars. Calendar clients poll the
+feed url without credentials, the url carries a signed token naming the
+calendar and the user it was issued to. Tokens expire after
+``ICAL_TOKEN_MAX_AGE`` seconds and are revoked when the password of the
+user changes. Every poll checks the user is still active and can still see
+the calendar before answering.
+
+A feed is streamed over the calendar events with a server side cursor, a
+chunk of events at a time. Its ETag comes from the change versions of the
+querysets it is built from, see core.utils.change_versions, a poll while
+nothing changed is answered ``304 Not Modified`` from the versions alone.
+Feeds up to ``ICAL_CACHE_MAX_BYTES`` are cached under their ETag for
+clients that do not send conditional requests.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+
+
+TOKEN_SALT = "emetric_calendar.feed"
+CACHE_KEY_PREFIX = "ical_feed:"
+
+USER_FEED = "user"
+TEAM_FEED = "team"
+
+
+def make_feed_token(user, kind: str, calendar_id) -> str:
+    """Token of the ``kind`` feed of ``calendar_id`` issued to ``user``"""
+    return signing.dumps(
+        {
+            "schema": connection.schema_name,
+            "user": user.pk,
+            "kind": kind,
+            "id": str(calendar_id),
+            "auth": user.get_session_auth_hash(),
+        },
+        salt=TOKEN_SALT,
+        compress=True,
+    )
+
+
+def read_feed_token(token: str) -> dict:
+    """
+    The feed named by ``token``, raises ``signing.BadSignature`` when it
+    expired or was not issued for the current tenant
+    """
+    feed = signing.loads(
+        token, salt=TOKEN_SALT, max_age=settings.ICAL_TOKEN_MAX_AGE
+    )
+    if feed.get("schema") != connection.schema_name:
+        raise signing.BadSignature("feed token of another tenant")
+    return feed
+
+
+def is_feed_user(feed: dict, user) -> bool:
+    """Whether ``user`` is the active user ``feed`` was issued to"""
+    return (
+        user is not None
+        and user.is_active
+        and user.pk == feed["user"]
+        # a password change revokes the tokens issued before
+        and constant_time_compare(
+            feed.get("auth", ""), user.get_session_auth_hash()
+        )
+    )
+
+
+def escape_text(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def fold(line: str) -> str:
+    """Folds a content line to 75 octets per line"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return f"{line}\r\n"
+
+    lines, current, size = [], "", 0
+    for character in line:
+        width = len(character.encode())
+        # continuation lines start with a space
+        if size + width > (75 if not lines else 74):
+            lines.append(current)
+            current, size = "", 0
+        current += character
+        size += width
+    lines.append(current)
+    return "\r\n ".join(lines) + "\r\n"
+
+
+def iter_feed(
+    name: str,
+    events: Iterable[Tuple[object, str, datetime, datetime]],
+    stamp: datetime,
+    schema_name: str,
+) -> Iterator[str]:
+    """
+    The iCalendar ``name`` of ``events``, (task id, name, start time, end
+    time) rows, a chunk of events per item
+    """
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//eMetric//Calendar//EN\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n" + fold(f"X-WR-CALNAME:{escape_text(name)}")
+    )
+
+    dtstamp = format_datetime(stamp)
+    chunk = []
+    for task_id, event_name, start_time, end_time in events:
+        chunk.append(
+            "BEGIN:VEVENT\r\n"
+            f"UID:{task_id}@{schema_name}\r\n"
+            f"DTSTAMP:{dtstamp}\r\n"
+            f"DTSTART:{format_datetime(start_time)}\r\n"
+            f"DTEND:{format_datetime(end_time)}\r\n"
+            + fold(f"SUMMARY:{escape_text(event_name)}")
+            + "END:VEVENT\r\n"
+        )
+        if len(chunk) == settings.ICAL_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+    yield "END:VCALENDAR\r\n"
+
+
+def get_cached_feed(etag: str):
+    return cache.get(f"{CACHE_KEY_PREFIX}{etag}")
+
+
+def cache_feed(etag: str, parts: Iterable[str]) -> Iterator[str]:
+    """
+    Passes the ``parts`` of a feed through, the feed is cached under
+    ``etag`` once streamed when it is small enough
+    """
+    cached, size = [], 0
+    for part in parts:
+        if cached is not None:
+            size += len(part)
+            if size > settings.ICAL_CACHE_MAX_BYTES:
+                cached = None
+            else:
+                cached.append(part)
+        yield part
+
+    if cached is not None:
+        cache.set(
+            f"{CACHE_KEY_PREFIX}{etag}",
+            "".join(cached),
+            timeout=settings.ICAL_CACHE_TIMEOUT,
+        )
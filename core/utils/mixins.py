@@ -18,6 +18,7 @@ from rest_framework.response import Response
 from tablib import Dataset
 from django.http import HttpResponse
 from core.utils.exception import ExportError, ImportError
+from core.utils.replicas import read_replica
 
 
 TODAY = datetime.now()
@@ -47,9 +48,10 @@ class ExportMixin:
         filename = self.export_filename
         eformat = request.query_params.get("eformat", "xlsx")
 
-        queryset = self.filter_queryset(self.get_queryset())
+        with read_replica(request.user):
+            queryset = self.filter_queryset(self.get_queryset())
 
-        dataset = self.get_resource_class().export(queryset)
+            dataset = self.get_resource_class().export(queryset)
 
         if not hasattr(dataset, eformat):
             raise ExportError(
@@ -0,0 +1,180 @@
+"""
+Transactional outbox for the celery tasks sent from signals. ``publish``
+writes the task into the ``OutboxEvent`` table of the tenant in the
+transaction of the request, so nothing is sent for a transaction that rolls
+back and the request does not wait on the broker.
+
+Committing transactions mark their schema pending in the cache,
+``client.tasks.relay_outbox`` runs every ``OUTBOX_RELAY_INTERVAL`` seconds
+on the status queue and sends the events of the pending schemas in batches.
+Events of a batch marked collapsible, like target point deltas, are summed
+per task and leading arguments into one message.
+``client.tasks.bulk_sweep_outbox`` sweeps every schema on the bulk queue to
+pick up the events whose mark was lost.
+
+Events are deleted in the transaction that sent them, an event is sent at
+least once.
+"""
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Iterable, List, Tuple
+
+from celery import current_app
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django_tenants.utils import (
+    get_public_schema_name,
+    get_tenant_model,
+    schema_context,
+)
+
+from core.models import OutboxEvent
+
+
+PENDING_KEY_PREFIX = "outbox_pending:"
+
+
+def mark_pending(schema_name: str):
+    with schema_context(get_public_schema_name()):
+        cache.set(f"{PENDING_KEY_PREFIX}{schema_name}", True, timeout=None)
+
+
+# schemas marked by the commit hooks of the thread since its last publish
+_marked = threading.local()
+
+
+def mark_pending_on_commit():
+    """
+    Marks the schema pending once the transaction commits. Every publish
+    registers a hook, the first hook of a commit sets the mark and the
+    others of the same commit skip it. Hooks only run after every publish
+    of their transaction, so clearing the memo on publish scopes it to
+    one commit, and a rolled back transaction leaves nothing behind.
+    """
+    schema_name = connection.schema_name
+    marked = getattr(_marked, "schemas", None)
+    if marked is None:
+        marked = _marked.schemas = set()
+    marked.discard(schema_name)
+
+    def mark():
+        if schema_name in marked:
+            return
+        mark_pending(schema_name)
+        marked.add(schema_name)
+
+    transaction.on_commit(mark)
+
+
+def publish(task: str, args: Iterable = (), collapsible: bool = False):
+    """Sends ``task`` with ``args`` once the current transaction commits"""
+    publish_many(task, [args], collapsible=collapsible)
+
+
+def publish_many(task: str, args_list: Iterable, collapsible: bool = False):
+    """``publish`` of ``task`` for every arguments of ``args_list``"""
+    events = [
+        OutboxEvent(task=task, args=list(args), collapsible=collapsible)
+        for args in args_list
+    ]
+    if not events:
+        return
+    OutboxEvent.objects.bulk_create(events)
+    mark_pending_on_commit()
+
+
+def collapse(events: Iterable[OutboxEvent]) -> List[Tuple[str, list]]:
+    """
+    The messages to send for ``events`` in order, collapsible events are
+    summed into the message of the first of them
+    """
+    messages = OrderedDict()
+    for event in events:
+        if not event.collapsible:
+            messages[event.pk] = (event.task, event.args)
+            continue
+
+        key = (event.task, repr(event.args[:-1]))
+        if key in messages:
+            task, args = messages[key]
+            args[-1] += Decimal(event.args[-1])
+        else:
+            messages[key] = (
+                event.task,
+                [*event.args[:-1], Decimal(event.args[-1])],
+            )
+
+    return [
+        (task, args)
+        for key, (task, args) in messages.items()
+        # deltas cancelling out are not sent
+        if not (isinstance(key, tuple) and args[-1] == 0)
+    ]
+
+
+def relay_events(batch_size: int = None) -> int:
+    """
+    Sends the events of the current schema in batches, returns the number of
+    messages sent
+    """
+    batch_size = batch_size or settings.OUTBOX_RELAY_BATCH_SIZE
+    sent = 0
+    while True:
+        with transaction.atomic():
+            # concurrent relays skip the events being sent
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .order_by("pk")[:batch_size]
+            )
+            if not events:
+                return sent
+
+            for task, args in collapse(events):
+                current_app.send_task(task, args)
+                sent += 1
+            OutboxEvent.objects.filter(
+                pk__in=[event.pk for event in events]
+            ).delete()
+
+
+def get_pending_schemas(sweep: bool = False) -> List[str]:
+    """
+    The tenant schemas with events to relay, every tenant schema with
+    ``sweep``. The marks are removed, events committed from now on mark
+    their schema again.
+    """
+    public_schema_name = get_public_schema_name()
+    schema_names = list(
+        get_tenant_model()
+        .objects.exclude(schema_name=public_schema_name)
+        .values_list("schema_name", flat=True)
+    )
+    with schema_context(public_schema_name):
+        keys = {
+            f"{PENDING_KEY_PREFIX}{schema_name}": schema_name
+            for schema_name in schema_names
+        }
+        pending = cache.get_many(keys)
+        if pending:
+            cache.delete_many(pending)
+    if sweep:
+        return schema_names
+    return [keys[key] for key in pending]
+
+
+def relay(sweep: bool = False) -> dict:
+    """Relays the events of the pending schemas, returns the sent counts"""
+    summary = {}
+    for schema_name in get_pending_schemas(sweep):
+        try:
+            with schema_context(schema_name):
+                sent = relay_events()
+        except Exception:
+            # the events are left, the next run sends them
+            mark_pending(schema_name)
+            raise
+        if sent:
+            summary[schema_name] = sent
+    return summary
@@ -7,6 +7,17 @@ from core.utils.response_data import response_data
 from employee.models import Employee
 
 
+def get_user_employee(user):
+    """
+    The employee of ``user``, None when there is none. Request users built
+    from token claims have it loaded, see core.utils.authentication
+    """
+    try:
+        return user.employee
+    except Employee.DoesNotExist:
+        return None
+
+
 class BasePermissionMixin(BasePermission):
     """
     Base permission blueprints for users
@@ -381,12 +392,12 @@ class IsTaskAssignorOrAdminOrReadOnly(permissions.BasePermission):
             return True
 
         if obj.upline_initiative.assignor == None:
-            user_employee_queryset = Employee.objects.filter(user=request.user)
-            if user_employee_queryset.exists():
+            user_employee = get_user_employee(request.user)
+            if user_employee is not None:
                 # allows corporate team lead
                 if (
                     request.user.user_role.role == Role.TEAM_LEAD
-                    and user_employee_queryset.first().corporate_level != None
+                    and user_employee.corporate_level_id != None
                 ):
                     return True
 
@@ -495,11 +506,12 @@ def has_access_to_objective_report(request):
         return True
 
     else:
-        user_employee = Employee.objects.get(user=request.user)
+        user_employee = get_user_employee(request.user)
         # allows corporate team lead
         if (
             request.user.user_role.role == Role.TEAM_LEAD
-            and user_employee.corporate_level != None
+            and user_employee is not None
+            and user_employee.corporate_level_id != None
         ):
             return True
         return False
@@ -0,0 +1,135 @@
+"""
+Per queue celery latency metrics, the time a task waited in its queue
+before a worker picked it up and the time it took to run, aggregated in
+redis so that every worker contributes to the same counters
+"""
+import time
+from typing import Dict
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+METRICS_KEY = "celery_queue_metrics:{queue}"
+PUBLISHED_AT_HEADER = "_published_at"
+
+# upper bounds in seconds of the queue wait histogram
+WAIT_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300)
+
+# sets a hash field to a value larger than the one it holds, in one step
+# so that concurrent workers never overwrite a larger maximum
+HASH_MAX_SCRIPT = """
+local current = tonumber(redis.call("HGET", KEYS[1], ARGV[1]) or "0")
+if tonumber(ARGV[2]) > current then
+    redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+end
+"""
+
+
+def get_header_from_task(task, name):
+    # In some cases (like Redis broker) headers are merged with `task.request`.
+    if task.request.headers and name in task.request.headers:
+        return task.request.headers.get(name)
+    return task.request.get(name)
+
+
+def get_queue_name_from_task(task) -> str:
+    delivery_info = task.request.delivery_info or {}
+    return (
+        delivery_info.get("routing_key")
+        or delivery_info.get("exchange")
+        or settings.CELERY_TASK_DEFAULT_QUEUE
+    )
+
+
+def stamp_published_at(headers=None, **kwargs):
+    """Records the publish time of a task in its message headers"""
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+def record_task_started(task=None, **kwargs):
+    """Records how long the task waited in its queue"""
+    task._started_at = time.time()
+    published_at = get_header_from_task(task, PUBLISHED_AT_HEADER)
+    if published_at is None:
+        return
+
+    # clocks of the publisher and the worker may drift slightly apart
+    wait = max(task._started_at - float(published_at), 0)
+    key = METRICS_KEY.format(queue=get_queue_name_from_task(task))
+    bucket = next(
+        (f"wait_le_{bound}" for bound in WAIT_BUCKETS if wait <= bound),
+        "wait_le_inf",
+    )
+
+    connection = get_redis_connection("default")
+    pipeline = connection.pipeline(transaction=False)
+    pipeline.hincrby(key, "started", 1)
+    pipeline.hincrbyfloat(key, "wait_seconds_total", wait)
+    pipeline.hincrby(key, bucket, 1)
+    connection.register_script(HASH_MAX_SCRIPT)(
+        keys=[key], args=["wait_seconds_max", repr(wait)], client=pipeline
+    )
+    pipeline.expire(key, settings.CELERY_QUEUE_METRICS_TTL)
+    pipeline.execute()
+
+
+def record_task_finished(task=None, state=None, **kwargs):
+    """Records how long the task ran and whether it failed"""
+    started_at = getattr(task, "_started_at", None)
+    if started_at is None:
+        return
+
+    key = METRICS_KEY.format(queue=get_queue_name_from_task(task))
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    pipeline.hincrby(key, "finished", 1)
+    pipeline.hincrbyfloat(
+        key, "run_seconds_total", max(time.time() - started_at, 0)
+    )
+    if state == "FAILURE":
+        pipeline.hincrby(key, "failed", 1)
+    pipeline.expire(key, settings.CELERY_QUEUE_METRICS_TTL)
+    pipeline.execute()
+
+
+def get_queue_metrics() -> Dict[str, Dict]:
+    """
+    Returns the metrics of every configured queue along with the number
+    of messages currently waiting in it
+    """
+    connection = get_redis_connection("default")
+    metrics = {}
+    for queue in settings.CELERY_TASK_QUEUES:
+        raw = connection.hgetall(METRICS_KEY.format(queue=queue.name))
+        values = {key.decode(): float(value) for key, value in raw.items()}
+        started = values.get("started", 0)
+
+        # redis keeps one list per priority step
+        separator = settings.CELERY_BROKER_TRANSPORT_OPTIONS["sep"]
+        depth = connection.llen(queue.name) + sum(
+            connection.llen(f"{queue.name}{separator}{step}")
+            for step in settings.CELERY_BROKER_TRANSPORT_OPTIONS[
+                "priority_steps"
+            ][1:]
+        )
+
+        metrics[queue.name] = {
+            "depth": depth,
+            "started": int(started),
+            "finished": int(values.get("finished", 0)),
+            "failed": int(values.get("failed", 0)),
+            "wait_seconds_total": values.get("wait_seconds_total", 0.0),
+            "wait_seconds_avg": (
+                values.get("wait_seconds_total", 0.0) / started
+                if started
+                else 0.0
+            ),
+            "wait_seconds_max": values.get("wait_seconds_max", 0.0),
+            "run_seconds_total": values.get("run_seconds_total", 0.0),
+            "wait_buckets": {
+                str(bound): int(values.get(f"wait_le_{bound}", 0))
+                for bound in WAIT_BUCKETS
+            },
+        }
+    return metrics
@@ -0,0 +1,24 @@
+"""
+Recurrence series. The occurrences a recurring task, initiative or objective
+is created with share a ``series_id``, editing or deleting all future
+occurrences selects them on the indexed series id. The migrations adding
+the series id gave the recurring rows created before it a series, a row
+without one is a series of its own.
+
+The occurrences are deleted with ``core.utils.bulk_delete.bulk_delete``, in
+one transaction with their clean up batched.
+"""
+
+
+def get_future_occurrences(instance, **filters):
+    """
+    The occurrences of the series of ``instance`` starting on or after it,
+    narrowed with ``filters``
+    """
+    if instance.series_id is None:
+        series = {"pk": instance.pk}
+    else:
+        series = {"series_id": instance.series_id}
+    return type(instance).objects.filter(
+        start_date__gte=instance.start_date, **series, **filters
+    )
@@ -0,0 +1,240 @@
+"""
+Read replica routing. Reads inside ``read_replica`` go to a replica of
+``DATABASE_REPLICAS``, every other query goes to ``default``. Report,
+dashboard, export and listing views opt in with ``replica_reads``,
+background jobs with ``read_replica``.
+
+A replica is only read from when
+
+* its replication lag is at most ``REPLICA_MAX_LAG_SECONDS``, the lag is
+  checked every ``REPLICA_LAG_CHECK_SECONDS`` per process
+* it replayed every change of the cached querysets the view declares, see
+  core.utils.change_versions, a conditional GET never tags old rows with
+  a new ETag
+* the user made no write in the last ``REPLICA_STICKY_SECONDS``, so users
+  read their own writes. A write inside ``read_replica`` sends the reads
+  after it to ``default`` as well
+
+The tenant of the default connection is set on the replica connection, so
+it reads the same schema.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections
+from django_tenants.utils import get_tenant_database_alias
+
+from core.utils.change_versions import get_versions
+
+
+logger = logging.getLogger("emetric.replicas")
+
+PIN_KEY_PREFIX = "replica_pin:"
+
+# seconds the replica is behind, 0 when it is not a standby or replayed
+# everything it received while streaming. NULL, unusable, when its WAL
+# receiver is not streaming, it would not know what it is missing
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (
+        SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'
+    ) THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+class ReplicaReads:
+    """Replica the reads of the running ``read_replica`` go to"""
+
+    __slots__ = ("alias",)
+
+    def __init__(self, alias: Optional[str]):
+        self.alias = alias
+
+
+class Writes:
+    """Whether the request being served wrote to the database"""
+
+    __slots__ = ("wrote",)
+
+    def __init__(self):
+        self.wrote = False
+
+
+_reads: ContextVar[Optional[ReplicaReads]] = ContextVar(
+    "replica_reads", default=None
+)
+_writes: ContextVar[Optional[Writes]] = ContextVar(
+    "replica_writes", default=None
+)
+
+# alias -> (checked at, replayed up to), None when unusable
+_lag_checks: Dict[str, Tuple[float, Optional[float]]] = {}
+_lag_checks_lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of the running ``read_replica`` to its replica, placed
+    before ``TenantSyncRouter`` which keeps the migrations on ``default``
+    """
+
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        if reads is not None and reads.alias is not None:
+            return reads.alias
+        return get_tenant_database_alias()
+
+    def db_for_write(self, model, **hints):
+        reads = _reads.get()
+        if reads is not None:
+            # reads after a write see it
+            reads.alias = None
+        writes = _writes.get()
+        if writes is not None:
+            writes.wrote = True
+        return get_tenant_database_alias()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as default
+        return True
+
+
+def get_replayed_up_to(alias: str) -> Optional[float]:
+    """
+    The time every transaction committed before was replayed on the replica
+    ``alias`` by, None when it lags too far behind or cannot be reached
+    """
+    now = time.time()
+    with _lag_checks_lock:
+        checked_at, replayed_up_to = _lag_checks.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < (
+        settings.REPLICA_LAG_CHECK_SECONDS
+    ):
+        return replayed_up_to
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        logger.warning("replica %s cannot be reached", alias, exc_info=True)
+        lag = None
+    else:
+        if lag is None:
+            logger.warning("replica %s is not streaming", alias)
+
+    if lag is None or lag > settings.REPLICA_MAX_LAG_SECONDS:
+        replayed_up_to = None
+    else:
+        replayed_up_to = now - float(lag)
+    with _lag_checks_lock:
+        _lag_checks[alias] = (now, replayed_up_to)
+    return replayed_up_to
+
+
+def get_replica(not_before: float = None) -> Optional[str]:
+    """
+    A replica which replayed the transactions committed before
+    ``not_before``, None when none did
+    """
+    tenant = getattr(connection, "tenant", None)
+    replicas = []
+    for alias in settings.DATABASE_REPLICAS:
+        replica = connections[alias]
+        if tenant is not None and replica.schema_name != tenant.schema_name:
+            replica.set_tenant(tenant)
+
+        replayed_up_to = get_replayed_up_to(alias)
+        if replayed_up_to is not None and (
+            not_before is None or replayed_up_to >= not_before
+        ):
+            replicas.append(alias)
+    return random.choice(replicas) if replicas else None
+
+
+def is_pinned(user) -> bool:
+    """Whether the reads of ``user`` stay on default after a write"""
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(f"{PIN_KEY_PREFIX}{user.pk}"))
+
+
+def pin(user):
+    """Keeps the reads of ``user`` on default for a while"""
+    if user is not None and user.is_authenticated:
+        cache.set(
+            f"{PIN_KEY_PREFIX}{user.pk}",
+            True,
+            timeout=settings.REPLICA_STICKY_SECONDS,
+        )
+
+
+@contextmanager
+def read_replica(user=None, names: Iterable[str] = ()):
+    """
+    Sends the reads inside to a replica when one is in sync with the cached
+    querysets ``names`` and ``user`` did not write recently
+    """
+    alias = None
+    if settings.DATABASE_REPLICAS and not is_pinned(user):
+        versions = get_versions(names) if names else {}
+        alias = get_replica(
+            max(versions.values()) / 10 ** 9 if versions else None
+        )
+
+    token = _reads.set(ReplicaReads(alias))
+    try:
+        yield alias
+    finally:
+        _reads.reset(token)
+
+
+def replica_reads(*names: str):
+    """
+    Reads of the view from a replica in sync with the cached querysets
+    ``names``. Place it below ``conditional_get`` on function views so that
+    the request is authenticated first, class views use
+    ``method_decorator(replica_reads(...), name="get")``
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with read_replica(getattr(request, "user", None), names):
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class ReplicaPinMiddleware:
+    """Keeps the reads of a user on default for a while after a write"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = Writes()
+        token = _writes.set(writes)
+        try:
+            response = self.get_response(request)
+        finally:
+            _writes.reset(token)
+
+        if writes.wrote and settings.DATABASE_REPLICAS:
+            # set on the request by the rest framework authentication
+            pin(getattr(request, "user", None))
+        return response
@@ -0,0 +1,128 @@
+"""
+Bounded thread pool running the independent queries of a report at the
+same time, e.g the cumulative report of every initiative of a page or the
+tiles of a dashboard bundle, so a response takes about as long as its
+slowest query instead of their sum.
+
+A call runs on a worker with the tenant and the context, replica reads
+included, of its caller, and the execute wrappers of the caller's
+connections, so the request metrics and the benchmark count its queries.
+Workers keep their database connections across calls up to
+``CONN_MAX_AGE`` like request threads do, so the pool holds up to
+``REPORT_POOL_SIZE`` extra connections per process.
+
+Calls run one after the other on the caller thread when the pool is
+disabled, when the caller is a worker itself, or when the caller is inside
+a transaction, the workers would not see its uncommitted rows.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Hashable, List
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from django_tenants.utils import get_tenant_database_alias
+
+
+_executor = None
+_executor_size = 0
+_executor_lock = threading.Lock()
+
+_in_worker: ContextVar[bool] = ContextVar("report_pool_worker", default=False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_size
+    with _executor_lock:
+        if _executor is None:
+            _executor_size = settings.REPORT_POOL_SIZE
+            _executor = ThreadPoolExecutor(
+                max_workers=_executor_size, thread_name_prefix="report"
+            )
+    return _executor
+
+
+def shutdown():
+    """
+    Closes the database connections of the workers and stops them, the
+    next call starts a new pool
+    """
+    global _executor
+    with _executor_lock:
+        executor, size, _executor = _executor, _executor_size, None
+    if executor is None:
+        return
+
+    # every worker waits for the others, so each takes one close
+    barrier = threading.Barrier(size)
+
+    def close():
+        barrier.wait()
+        connections.close_all()
+
+    for future in [executor.submit(close) for _ in range(barrier.parties)]:
+        future.result()
+    executor.shutdown()
+
+
+def get_aliases() -> tuple:
+    return (get_tenant_database_alias(), *settings.DATABASE_REPLICAS)
+
+
+def run_call(
+    tenant,
+    execute_wrappers: Dict[str, List[Callable]],
+    call: Callable[[], Any],
+):
+    """
+    Runs ``call`` on a worker, in the schema of ``tenant`` and with the
+    ``execute_wrappers`` of the caller's connections
+    """
+    _in_worker.set(True)
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            for alias, wrappers in execute_wrappers.items():
+                connections[alias].set_tenant(tenant)
+                for wrapper in wrappers:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(wrapper)
+                    )
+            return call()
+    finally:
+        close_old_connections()
+
+
+def run_concurrently(
+    calls: Dict[Hashable, Callable[[], Any]]
+) -> Dict[Hashable, Any]:
+    """
+    The results of ``calls`` by key, the first exception raised by a call
+    is raised once they are all done
+    """
+    if (
+        len(calls) < 2
+        or settings.REPORT_POOL_SIZE < 2
+        or _in_worker.get()
+        or connection.in_atomic_block
+    ):
+        return {key: call() for key, call in calls.items()}
+
+    executor = get_executor()
+    tenant = connection.tenant
+    execute_wrappers = {
+        alias: list(connections[alias].execute_wrappers)
+        for alias in get_aliases()
+    }
+    futures = {
+        key: executor.submit(
+            copy_context().run, run_call, tenant, execute_wrappers, call
+        )
+        for key, call in calls.items()
+    }
+    # waits for every call before raising, none outlives the request
+    for future in futures.values():
+        future.exception()
+    return {key: future.result() for key, future in futures.items()}
@@ -0,0 +1,492 @@
+"""
+Always on request instrumentation, every request records its latency,
+database queries, database time, cache hits and misses and serializer
+time, tagged by tenant schema and view name. Requests are aggregated in
+the process and flushed to redis every ``REQUEST_METRICS_FLUSH_INTERVAL``
+seconds so that every web worker contributes to the same counters.
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, connections
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+)
+from django.utils.crypto import constant_time_compare
+from django_redis import get_redis_connection
+from django_redis.client import DefaultClient
+from redis.exceptions import RedisError
+
+from core.utils.queue_metrics import WAIT_BUCKETS, get_queue_metrics
+
+
+logger = logging.getLogger("emetric.request_metrics")
+
+METRICS_KEY = "request_metrics:{schema}:{view}:{method}"
+METRICS_INDEX_KEY = "request_metrics:index"
+PROFILES_KEY = "request_metrics:profiles"
+PROFILE_HEADER = "HTTP_X_PROFILE_TOKEN"
+
+# upper bounds in seconds of the request latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# number of sampled profiles kept in redis
+PROFILES_KEPT = 50
+
+
+class RequestMetrics:
+    """Measurements of the request being served"""
+
+    __slots__ = (
+        "queries",
+        "db_seconds",
+        "cache_hits",
+        "cache_misses",
+        "serializer_seconds",
+        "serializer_depth",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+# the report pool runs queries of a request on several threads
+_queries_lock = threading.Lock()
+
+
+def get_current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def count_query(execute, sql, params, many, context):
+    """Database execute wrapper counting queries and their duration"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started_at
+        with _queries_lock:
+            metrics.queries += 1
+            metrics.db_seconds += duration
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """django-redis client counting cache hits and misses of the request"""
+
+    _missing = object()
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(
+            key, default=self._missing, version=version, client=client
+        )
+        metrics = _current.get()
+        if metrics is not None:
+            if value is self._missing:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is self._missing else value
+
+    def get_many(self, keys, version=None, client=None):
+        values = super().get_many(keys, version=version, client=client)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+
+def instrument_serializers():
+    """
+    Times ``serializer.data`` of every DRF serializer. Nested serializers
+    and serializers built inside ``SerializerMethodField`` run within the
+    outer one, only the outermost call is counted.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, "_instrumented", False):
+        return
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return original.fget(self)
+
+        metrics.serializer_depth += 1
+        started_at = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_seconds += time.perf_counter() - started_at
+
+    data._instrumented = True
+    BaseSerializer.data = property(data)
+
+
+class MetricsRegistry:
+    """Request counters of the process, periodically flushed to redis"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: Dict[tuple, Dict[str, float]] = {}
+        self.flushed_at = time.monotonic()
+
+    def record(self, labels: tuple, values: Dict[str, float]):
+        with self.lock:
+            counters = self.pending.setdefault(labels, {})
+            for field, value in values.items():
+                counters[field] = counters.get(field, 0) + value
+
+            if (
+                time.monotonic() - self.flushed_at
+                < settings.REQUEST_METRICS_FLUSH_INTERVAL
+            ):
+                return
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        self.flush(pending)
+
+    @staticmethod
+    def flush(pending: Dict[tuple, Dict[str, float]]):
+        try:
+            pipeline = get_redis_connection("default").pipeline(
+                transaction=False
+            )
+            for (schema, view, method), counters in pending.items():
+                key = METRICS_KEY.format(
+                    schema=schema, view=view, method=method
+                )
+                pipeline.sadd(METRICS_INDEX_KEY, key)
+                for field, value in counters.items():
+                    pipeline.hincrbyfloat(key, field, value)
+                pipeline.expire(key, settings.REQUEST_METRICS_TTL)
+            pipeline.expire(METRICS_INDEX_KEY, settings.REQUEST_METRICS_TTL)
+            pipeline.execute()
+        except (RedisError, NotImplementedError) as e:
+            # metrics must never break a request, the interval is dropped.
+            # NotImplementedError is raised for caches other than redis
+            logger.warning("Could not flush request metrics: %s", e)
+
+
+registry = MetricsRegistry()
+
+
+def get_view_name(request) -> str:
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "unresolved"
+    return resolver_match.view_name or resolver_match._func_path
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request, adds a ``Server-Timing`` header to the
+    responses of staff users, or of everyone with
+    ``REQUEST_METRICS_SERVER_TIMING``, and, for a sample of requests or when the ``X-Profile-Token``
+    header matches ``REQUEST_PROFILE_TOKEN``, keeps a full cProfile report.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        profiler = cProfile.Profile() if self.should_profile(request) else None
+        started_at = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for db in connections.all():
+                    stack.enter_context(db.execute_wrapper(count_query))
+                if profiler is not None:
+                    profiler.enable()
+                    stack.callback(profiler.disable)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        latency = time.perf_counter() - started_at
+
+        # views switch schemas while serving, the final one is the tenant
+        schema = getattr(connection, "schema_name", None) or "unknown"
+        view = get_view_name(request)
+        self.record(request, response, schema, view, latency, metrics)
+
+        if self.should_send_timing(request):
+            response["Server-Timing"] = (
+                f"app;dur={latency * 1000:.1f}, "
+                f"db;dur={metrics.db_seconds * 1000:.1f}"
+                f';desc="{metrics.queries} queries", '
+                f"serializer;dur={metrics.serializer_seconds * 1000:.1f}"
+            )
+        if profiler is not None:
+            self.save_profile(profiler, request, schema, view, latency)
+        return response
+
+    @staticmethod
+    def should_send_timing(request) -> bool:
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            return True
+        # set on the request by the rest framework authentication
+        user = getattr(request, "user", None)
+        return bool(user is not None and getattr(user, "is_staff", False))
+
+    @staticmethod
+    def should_profile(request) -> bool:
+        profile_token = settings.REQUEST_PROFILE_TOKEN
+        if profile_token and constant_time_compare(
+            request.META.get(PROFILE_HEADER, ""), profile_token
+        ):
+            return True
+        rate = settings.REQUEST_PROFILE_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def record(request, response, schema, view, latency, metrics):
+        bucket = next(
+            (
+                f"latency_le_{bound}"
+                for bound in LATENCY_BUCKETS
+                if latency <= bound
+            ),
+            "latency_le_inf",
+        )
+        registry.record(
+            (schema, view, request.method),
+            {
+                "requests": 1,
+                "errors": int(response.status_code >= 500),
+                "latency_seconds_total": latency,
+                bucket: 1,
+                "queries_total": metrics.queries,
+                "db_seconds_total": metrics.db_seconds,
+                "cache_hits": metrics.cache_hits,
+                "cache_misses": metrics.cache_misses,
+                "serializer_seconds_total": metrics.serializer_seconds,
+            },
+        )
+
+        if settings.REQUEST_METRICS_LOG:
+            logger.info(
+                json.dumps(
+                    {
+                        "schema": schema,
+                        "view": view,
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "latency_ms": round(latency * 1000, 2),
+                        "queries": metrics.queries,
+                        "db_ms": round(metrics.db_seconds * 1000, 2),
+                        "cache_hits": metrics.cache_hits,
+                        "cache_misses": metrics.cache_misses,
+                        "serializer_ms": round(
+                            metrics.serializer_seconds * 1000, 2
+                        ),
+                    }
+                )
+            )
+
+    @staticmethod
+    def save_profile(profiler, request, schema, view, latency):
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(
+            "cumulative"
+        ).print_stats(40)
+        profile = json.dumps(
+            {
+                "schema": schema,
+                "view": view,
+                "method": request.method,
+                "path": request.path,
+                "latency_ms": round(latency * 1000, 2),
+                "recorded_at": time.time(),
+                "stats": stream.getvalue(),
+            }
+        )
+        try:
+            pipeline = get_redis_connection("default").pipeline(
+                transaction=False
+            )
+            pipeline.lpush(PROFILES_KEY, profile)
+            pipeline.ltrim(PROFILES_KEY, 0, PROFILES_KEPT - 1)
+            pipeline.execute()
+        except (RedisError, NotImplementedError) as e:
+            logger.warning("Could not save request profile: %s", e)
+
+
+def parse_metrics_key(key: str) -> Tuple[str, str, str]:
+    """
+    Splits a ``METRICS_KEY`` into its schema, view and method. Namespaced
+    view names contain ``:``, schema names and methods never do.
+    """
+    _, schema, rest = key.split(":", 2)
+    view, method = rest.rsplit(":", 1)
+    return schema, view, method
+
+
+def get_request_metrics() -> List[Dict]:
+    """Returns the flushed counters of every schema, view and method"""
+    redis = get_redis_connection("default")
+    metrics = []
+    for key in sorted(redis.smembers(METRICS_INDEX_KEY)):
+        raw = redis.hgetall(key)
+        if not raw:
+            continue
+        schema, view, method = parse_metrics_key(key.decode())
+        values = {field.decode(): float(value) for field, value in raw.items()}
+        metrics.append(
+            {"schema": schema, "view": view, "method": method, **values}
+        )
+    return metrics
+
+
+def get_request_profiles() -> List[Dict]:
+    """Returns the most recent sampled profiles, newest first"""
+    redis = get_redis_connection("default")
+    return [
+        json.loads(profile)
+        for profile in redis.lrange(PROFILES_KEY, 0, PROFILES_KEPT - 1)
+    ]
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def format_labels(entry: Dict) -> str:
+    return ",".join(
+        f'{label}="{escape_label(entry[label])}"'
+        for label in ("schema", "view", "method")
+    )
+
+
+def render_prometheus() -> str:
+    """Renders the request and celery queue metrics as prometheus text"""
+    lines = []
+
+    def help_line(name, kind, description):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    request_metrics = get_request_metrics()
+    counters = (
+        ("requests", "emetric_http_requests_total", "Requests served"),
+        ("errors", "emetric_http_errors_total", "Requests failed with 5xx"),
+        ("queries_total", "emetric_http_db_queries_total", "Database queries"),
+        (
+            "db_seconds_total",
+            "emetric_http_db_seconds_total",
+            "Time spent in the database",
+        ),
+        ("cache_hits", "emetric_http_cache_hits_total", "Cache hits"),
+        ("cache_misses", "emetric_http_cache_misses_total", "Cache misses"),
+        (
+            "serializer_seconds_total",
+            "emetric_http_serializer_seconds_total",
+            "Time spent serializing responses",
+        ),
+    )
+    for field, name, description in counters:
+        help_line(name, "counter", description)
+        for entry in request_metrics:
+            labels = format_labels(entry)
+            lines.append(f"{name}{{{labels}}} {entry.get(field, 0)}")
+
+    name = "emetric_http_request_duration_seconds"
+    help_line(name, "histogram", "Request latency")
+    for entry in request_metrics:
+        labels = format_labels(entry)
+        cumulative = 0
+        for bound in LATENCY_BUCKETS:
+            cumulative += entry.get(f"latency_le_{bound}", 0)
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'{name}_bucket{{{labels},le="+Inf"}} {entry.get("requests", 0)}'
+        )
+        lines.append(
+            f"{name}_sum{{{labels}}} {entry.get('latency_seconds_total', 0)}"
+        )
+        lines.append(f"{name}_count{{{labels}}} {entry.get('requests', 0)}")
+
+    queue_metrics = get_queue_metrics()
+    name = "emetric_celery_queue_depth"
+    help_line(name, "gauge", "Messages waiting in the queue")
+    for queue, values in queue_metrics.items():
+        lines.append(f'{name}{{queue="{queue}"}} {values["depth"]}')
+    for field, description in (
+        ("started", "Tasks started"),
+        ("finished", "Tasks finished"),
+        ("failed", "Tasks failed"),
+    ):
+        name = f"emetric_celery_tasks_{field}_total"
+        help_line(name, "counter", description)
+        for queue, values in queue_metrics.items():
+            lines.append(f'{name}{{queue="{queue}"}} {values[field]}')
+    name = "emetric_celery_queue_wait_seconds"
+    help_line(name, "histogram", "Time tasks waited in the queue")
+    for queue, values in queue_metrics.items():
+        cumulative = 0
+        for bound in WAIT_BUCKETS:
+            cumulative += values["wait_buckets"][str(bound)]
+            lines.append(
+                f'{name}_bucket{{queue="{queue}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'{name}_bucket{{queue="{queue}",le="+Inf"}} {values["started"]}'
+        )
+        lines.append(
+            f'{name}_sum{{queue="{queue}"}} {values["wait_seconds_total"]}'
+        )
+        lines.append(f'{name}_count{{queue="{queue}"}} {values["started"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, protected by the ``METRICS_TOKEN`` bearer
+    token. The metrics name every tenant, without a token the endpoint is
+    not served.
+    """
+    metrics_token = settings.METRICS_TOKEN
+    if not metrics_token:
+        return HttpResponseNotFound()
+    if not constant_time_compare(
+        request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {metrics_token}"
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(), content_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,179 @@
+"""
+Indexed search for the list endpoints. Views declare a ``search_document``,
+the name of a stored ``SearchVectorField`` or a ``SearchVector`` matching a
+functional GIN index, and optionally a ``search_text`` field for substring
+matches backed by a pg_trgm index. Results are ranked unless the request
+asks for an ordering. ``?search_mode=contains`` keeps the ILIKE search over
+``search_fields``.
+
+Views list the ``search_fields`` their document is built from in
+``search_document_fields``. The other search fields, like the name of the
+upline, are only searched in ``contains`` mode, unless the view sets
+``search_contains_fallback`` to also find the rows matching them the ILIKE
+way. That ORs joined columns into the indexed condition, so it is left to
+the views that need it.
+
+pg_trgm is a contrib extension, databases without it still get the full
+text search, only the substring matches and the trigram ranking are left
+out.
+"""
+import operator
+import re
+from functools import reduce
+from typing import Optional
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection, migrations
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+
+TRIGRAM_EXTENSION = "pg_trgm"
+
+_has_trigram: Optional[bool] = None
+
+
+def has_trigram_extension() -> bool:
+    """Checks pg_trgm is installed, once per process"""
+    global _has_trigram
+    if _has_trigram is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = %s",
+                [TRIGRAM_EXTENSION],
+            )
+            _has_trigram = cursor.fetchone() is not None
+    return _has_trigram
+
+
+def name_search_document() -> SearchVector:
+    """
+    Document of the models searched by name, the functional GIN index of
+    the model and the view's ``search_document`` must both use it
+    """
+    return SearchVector("name", config="simple")
+
+
+def build_prefix_query(term: str) -> Optional[SearchQuery]:
+    """
+    Every word of ``term`` as a prefix, "ada oko" matches "Adaeze Okonkwo".
+    The words are reduced to letters and digits so that user input can
+    not break the tsquery syntax.
+    """
+    words = re.findall(r"[^\W_]+", term.lower())
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        search_type="raw",
+        config="simple",
+    )
+
+
+def add_trigram_index(table: str, column: str, name: str):
+    """
+    Migration operation creating a pg_trgm index for ``icontains`` lookups
+    on ``column``, skipped when the extension is not available
+    """
+
+    def forward(apps, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_available_extensions WHERE name = %s",
+                [TRIGRAM_EXTENSION],
+            )
+            if cursor.fetchone() is None:
+                return
+            cursor.execute(
+                f"CREATE EXTENSION IF NOT EXISTS {TRIGRAM_EXTENSION} "
+                "SCHEMA public"
+            )
+            # the expression django generates for icontains
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" '
+                f'USING gin (UPPER("{column}"::text) public.gin_trgm_ops)'
+            )
+
+    def backward(apps, schema_editor):
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    return migrations.RunPython(forward, backward)
+
+
+class DocumentSearchFilter(filters.SearchFilter):
+    """
+    Full text search on the view's ``search_document`` with prefix
+    matching, falls back to ``SearchFilter`` for views without one and in
+    ``contains`` mode. Put it after ``OrderingFilter`` so that the ranking
+    is not overridden by the default ordering.
+    """
+
+    search_mode_param = "search_mode"
+
+    def get_contains_condition(self, request, view) -> Optional[Q]:
+        """
+        The ``SearchFilter`` condition over ``search_fields`` when the view
+        sets ``search_contains_fallback`` and some of them are not in the
+        search document, None otherwise
+        """
+        if not getattr(view, "search_contains_fallback", False):
+            return None
+        search_fields = self.get_search_fields(view, request) or ()
+        document_fields = getattr(view, "search_document_fields", ())
+        if all(field in document_fields for field in search_fields):
+            return None
+
+        lookups = [self.construct_search(field) for field in search_fields]
+        return reduce(
+            operator.and_,
+            (
+                reduce(
+                    operator.or_,
+                    (Q(**{lookup: term}) for lookup in lookups),
+                )
+                for term in self.get_search_terms(request)
+            ),
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        document = getattr(view, "search_document", None)
+        mode = request.query_params.get(self.search_mode_param)
+        if document is None or mode == "contains":
+            return super().filter_queryset(request, queryset, view)
+
+        term = request.query_params.get(self.search_param, "").strip()
+        query = build_prefix_query(term)
+        if query is None:
+            return queryset
+
+        vector = F(document) if isinstance(document, str) else document
+        queryset = queryset.annotate(search_vector=vector)
+        condition = Q(search_vector=query)
+        rank = SearchRank(F("search_vector"), query)
+
+        text_field = getattr(view, "search_text", None)
+        if text_field and has_trigram_extension():
+            condition |= Q(**{f"{text_field}__icontains": term})
+            rank = rank + TrigramSimilarity(text_field, term.lower())
+
+        contains_condition = self.get_contains_condition(request, view)
+        if contains_condition is not None:
+            condition |= contains_condition
+            if self.must_call_distinct(
+                queryset, self.get_search_fields(view, request)
+            ):
+                queryset = queryset.distinct()
+
+        queryset = queryset.annotate(search_rank=rank).filter(condition)
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+        return queryset.order_by(
+            "-search_rank",
+            *(queryset.query.order_by or queryset.model._meta.ordering),
+        )
@@ -0,0 +1,243 @@
+"""
+Background expansion of recurring tasks. A recurring task created with
+``?expand=background`` has its schedule validated and its first
+``TASK_EXPANSION_PREVIEW_SIZE`` occurrences created in the request, they
+are returned as a preview with the id of a ``TaskExpansion`` job. A worker
+creates the rest in chunks of ``TASK_EXPANSION_CHUNK_SIZE``, a transaction
+each, up to ``TASK_EXPANSION_HORIZON_DAYS`` from today. The occurrences
+further away are created as the horizon rolls forward, by a nightly tenant
+job.
+
+The request computes and validates the preview occurrences only, and
+answers 400 when the owner is not free for one of them. An occurrence
+after the preview whose owner is busy is skipped by the worker, as
+nobody is left to answer a validation error by then, its date is
+recorded on the job and the rounds stay contiguous over the created
+occurrences. Deleting the future occurrences of the series cancels its
+expansion.
+"""
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterator, List, Set
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from core.utils.outbox import publish
+from core.utils.process_durations import (
+    get_localized_time,
+    process_end_date_time,
+)
+from core.utils.task_process import (
+    get_holidays,
+    get_user_schedule,
+    is_user_free,
+    iter_task_start_dates,
+)
+from strategy_deck.models import Initiative
+from tasks.models import Task, TaskExpansion
+
+
+# set per occurrence, or by the database
+EXCLUDED_FIELDS = {
+    "id",
+    "task_id",
+    "start_date",
+    "routine_round",
+    "series_id",
+}
+
+
+def get_template(task: Task) -> dict:
+    """The field values of ``task`` every occurrence of its series shares"""
+    template = {}
+    for field in Task._meta.concrete_fields:
+        if field.attname in EXCLUDED_FIELDS:
+            continue
+        value = field.value_from_object(task)
+        if isinstance(value, FieldFile):
+            # the file uploaded with the preview, occurrences share it
+            value = value.name or None
+        elif isinstance(value, (set, list)):
+            value = sorted(value)
+        template[field.attname] = value
+    return template
+
+
+def load_template(template: dict) -> dict:
+    """The field values of a stored template as python values"""
+    values = {}
+    for attname, value in template.items():
+        value = Task._meta.get_field(attname).to_python(value)
+        if isinstance(value, list):
+            # multi select lists resolve to an expression on insert
+            value = list(value)
+        values[attname] = value
+    return values
+
+
+def get_horizon() -> date:
+    """The last date occurrences are created up to"""
+    return timezone.localdate() + timedelta(
+        days=settings.TASK_EXPANSION_HORIZON_DAYS
+    )
+
+
+def start_expansion(
+    preview: List[Task], start_date: date, end_date: date
+) -> TaskExpansion:
+    """
+    Creates the job creating the occurrences after ``preview`` of a schedule
+    starting on ``start_date``, the worker starts once the transaction
+    commits
+    """
+    last = preview[-1]
+    job = TaskExpansion.objects.create(
+        series_id=last.series_id,
+        template=get_template(last),
+        start_date=start_date,
+        end_date=end_date,
+        next_date=last.start_date + timedelta(days=1),
+        next_round=last.routine_round + 1,
+    )
+    publish("tasks.tasks.detail.bulk_expand_recurring_task", (job.pk,))
+    return job
+
+
+def cancel_expansions(series_id) -> int:
+    """Stops creating occurrences of the series ``series_id``"""
+    if series_id is None:
+        return 0
+    return TaskExpansion.objects.filter(
+        series_id=series_id, status=TaskExpansion.PENDING
+    ).update(status=TaskExpansion.CANCELLED, updated_at=timezone.now())
+
+
+def iter_remaining_dates(
+    job: TaskExpansion, values: dict, holidays: Set[date], tenant
+) -> Iterator[date]:
+    """The start dates of ``job`` left to create, in order"""
+    dates = iter_task_start_dates(
+        values["routine_option"],
+        job.start_date,
+        values["repeat_every"],
+        values["occurs_days"],
+        values["occurs_month_day_number"],
+        values["occurs_month_day_position"],
+        values["occurs_month_day"],
+        job.end_date,
+        holidays,
+        tenant,
+    )
+    dates = (current for current in dates if current >= job.next_date)
+
+    after_occurrence = values["after_occurrence"]
+    if after_occurrence:
+        dates = islice(dates, max(after_occurrence - job.next_round + 1, 0))
+    return dates
+
+
+def expand(
+    job: TaskExpansion, horizon: date = None, chunk_size: int = None
+) -> int:
+    """
+    Creates the occurrences of ``job`` starting up to ``horizon`` a chunk
+    per transaction, returns the number of occurrences created
+    """
+    tenant = connection.tenant
+    horizon = horizon or get_horizon()
+    chunk_size = chunk_size or settings.TASK_EXPANSION_CHUNK_SIZE
+
+    values = load_template(job.template)
+    upline_initiative = (
+        Initiative.objects.select_related("owner")
+        .filter(initiative_id=values.pop("upline_initiative_id"))
+        .first()
+    )
+    start_time, duration = values["start_time"], values["duration"]
+    holidays = get_holidays(job.start_date, job.end_date)
+    created = 0
+
+    while True:
+        with transaction.atomic():
+            # expansions of the same job run one chunk after the other
+            job = TaskExpansion.objects.select_for_update().get(pk=job.pk)
+            if job.status != TaskExpansion.PENDING or job.next_date > horizon:
+                return created
+
+            if upline_initiative is None:
+                # deleted with its tasks
+                job.status = TaskExpansion.CANCELLED
+                job.save()
+                return created
+
+            upcoming = list(
+                islice(
+                    iter_remaining_dates(job, values, holidays, tenant),
+                    chunk_size + 1,
+                )
+            )
+            chunk = [
+                current
+                for current in upcoming[:chunk_size]
+                if current <= horizon
+            ]
+            user_schedule = (
+                get_user_schedule(
+                    chunk[0], chunk[-1], upline_initiative.owner, tenant
+                )
+                if chunk
+                else []
+            )
+
+            tasks = []
+            for current in chunk:
+                if not is_user_free(
+                    user_schedule,
+                    get_localized_time(current, start_time, tenant.timezone),
+                    process_end_date_time(
+                        current, start_time, duration, tenant
+                    ),
+                ):
+                    job.conflicts.append(current)
+                    continue
+
+                tasks.append(
+                    Task(
+                        **values,
+                        upline_initiative=upline_initiative,
+                        start_date=current,
+                        routine_round=job.next_round + len(tasks),
+                        series_id=job.series_id,
+                    )
+                )
+            if tasks:
+                Task.objects.bulk_create(tasks)
+
+            job.next_round += len(tasks)
+            job.created_count += len(tasks)
+            if len(upcoming) > len(chunk):
+                job.next_date = upcoming[len(chunk)]
+            else:
+                job.status = TaskExpansion.DONE
+            job.save()
+            created += len(tasks)
+
+
+def expand_tenant_tasks(tenant, horizon_days=None) -> int:
+    """
+    Tenant job target, moves the horizon of the pending expansions of
+    ``tenant`` forward
+    """
+    horizon = get_horizon()
+    if horizon_days is not None:
+        horizon = timezone.localdate() + timedelta(days=int(horizon_days))
+
+    created = 0
+    for job in TaskExpansion.objects.filter(
+        status=TaskExpansion.PENDING, next_date__lte=horizon
+    ):
+        created += expand(job, horizon=horizon)
+    return created
@@ -1,7 +1,12 @@
-from typing import Union, List
+from itertools import islice
+from typing import Iterator, Set
 from datetime import datetime, date, timedelta
-from django.db.models import Q, QuerySet
 from django.utils import timezone
+from core.utils.availability import (
+    BusyIntervals,
+    get_window,
+    load_busy_intervals,
+)
 from core.utils.exception import CustomValidation
 
 from core.utils.process_durations import (
@@ -11,7 +16,7 @@ from core.utils.process_durations import (
     week_difference,
 )
 from tasks.models.detail import Task
-from emetric_calendar.models import Holiday, UserScheduledEventCalendar
+from emetric_calendar.models import Holiday
 
 
 def process_start_date_list_for_task(
@@ -28,6 +33,7 @@ def process_start_date_list_for_task(
     end_date,
     after_occurrence,
     tenant,
+    limit=None,
 ) -> list:
     """Gets start date list for task
 
@@ -44,6 +50,8 @@ def process_start_date_list_for_task(
         occurs_month_day ([type]): [description]
         end_date ([type]): [description]
         after_occurrencetenant ([type]): [description]
+        limit (int): the first occurrences only, all of them when None,
+            the occurrences past it are neither computed nor validated
 
     Returns:
         list: [description]
@@ -53,8 +61,107 @@ def process_start_date_list_for_task(
     CustomValidation
         custom exception
     """
+    end_date = validate_task_schedule(
+        upline_initiative,
+        routine_option,
+        start_date,
+        start_time,
+        duration,
+        end_date,
+        tenant,
+    )
+
+    holidays = get_holidays(start_date, end_date)
+
+    if routine_option == Task.ONCE and not is_day_free(holidays, start_date):
+        raise CustomValidation(
+            detail="Date is a holiday",
+            field="start_date",
+            status_code=400,
+        )
+
+    start_dates = iter_task_start_dates(
+        routine_option,
+        start_date,
+        repeat_every,
+        occurs_days,
+        occurs_month_day_number,
+        occurs_month_day_position,
+        occurs_month_day,
+        end_date,
+        holidays,
+        tenant,
+    )
+    if after_occurrence or limit:
+        start_dates = islice(
+            start_dates, min(filter(None, (after_occurrence, limit)))
+        )
+    start_dates = list(start_dates)
+
+    # the user's schedule is loaded once, not per occurrence, over the
+    # occurrences checked only
+    user_schedule = (
+        get_user_schedule(
+            start_dates[0], start_dates[-1], upline_initiative.owner, tenant
+        )
+        if start_dates
+        else None
+    )
     start_date_list = []
-    owner = upline_initiative.owner
+
+    for current in start_dates:
+        current_start_date_time = get_localized_time(
+            current, start_time, tenant.timezone
+        )
+        current_end_date_time = process_end_date_time(
+            current, start_time, duration, tenant
+        )
+
+        if not is_user_free(
+            user_schedule,
+            current_start_date_time,
+            current_end_date_time,
+        ):
+            raise CustomValidation(
+                detail=f"Task owner is not free between "
+                f"{current_start_date_time} and "
+                f"{current_end_date_time}",
+                field="start_time",
+                status_code=400,
+            )
+
+        start_date_list.append(current)
+
+    # edge case where upline end date is < first possible occurrence
+    if len(start_date_list) == 0:
+        raise CustomValidation(
+            detail=f"Upline end date is before the first possible occurrence",
+            field="after_occurrence",
+            status_code=400,
+        )
+
+    return start_date_list
+
+
+def validate_task_schedule(
+    upline_initiative,
+    routine_option,
+    start_date,
+    start_time,
+    duration,
+    end_date,
+    tenant,
+) -> date:
+    """Validates the first occurrence of a task schedule
+
+    Returns:
+        date: the last date an occurrence can start on
+
+    Raises
+    ------
+    CustomValidation
+        custom exception
+    """
     start_date_time = get_localized_time(
         start_date, start_time, tenant.timezone
     )
@@ -129,39 +236,30 @@ def process_start_date_list_for_task(
     else:
         end_date = upline_initiative.end_date
 
-    holidays = Holiday.objects.filter(
-        date__gte=start_date,
-        date__lte=end_date,
-    )
+    return end_date
 
-    user_schedule = get_user_schedule(start_date, end_date, owner, tenant)
 
+def iter_task_start_dates(
+    routine_option,
+    start_date,
+    repeat_every,
+    occurs_days,
+    occurs_month_day_number,
+    occurs_month_day_position,
+    occurs_month_day,
+    end_date,
+    holidays: Set[date],
+    tenant,
+) -> Iterator[date]:
+    """Yields the start dates of a task schedule in order, holidays are
+    skipped. The dates are computed as they are consumed, a consumer
+    stopping early does not pay for the rest of the schedule.
+    """
     if routine_option == Task.ONCE:
-        end_date_time = process_end_date_time(
-            start_date, start_time, duration, tenant
-        )
-
-        if not is_day_free(holidays, start_date):
-            raise CustomValidation(
-                detail="Date is a holiday",
-                field="start_date",
-                status_code=400,
-            )
-
-        if not is_user_free(user_schedule, start_date_time, end_date_time):
-            raise CustomValidation(
-                detail=f"Task owner is not free between {start_date_time} and {end_date_time}",
-                field="start_time",
-                status_code=400,
-            )
-
-        start_date_list.append(start_date)
+        yield start_date
 
     elif routine_option == Task.DAILY:
         # extracts all possible dates till end date
-
-        if not after_occurrence:
-            after_occurrence = 999999999
         current = start_date
         repeat_every_check = 1
 
@@ -172,95 +270,28 @@ def process_start_date_list_for_task(
                 if repeat_every_check == 1:
                     repeat_every_check = repeat_every  # resets repeat every
 
-                    current_start_date_time = get_localized_time(
-                        current, start_time, tenant.timezone
-                    )
-                    current_end_date_time = process_end_date_time(
-                        current, start_time, duration, tenant
-                    )
-
-                    if not is_day_free(holidays, current):
-                        current += timedelta(days=1)
-                        continue
-
-                    if not is_user_free(
-                        user_schedule,
-                        current_start_date_time,
-                        current_end_date_time,
-                    ):
-                        raise CustomValidation(
-                            detail=f"Task owner is not free between "
-                            f"{current_start_date_time} and "
-                            f"{current_end_date_time}",
-                            field="start_time",
-                            status_code=400,
-                        )
-
-                    start_date_list.append(current)
-                    after_occurrence -= 1
-
-                    if after_occurrence <= 0:
-                        break
+                    if is_day_free(holidays, current):
+                        yield current
                 else:
                     repeat_every_check -= 1
 
             current += timedelta(days=1)
 
     elif routine_option == Task.WEEKLY:
-
-        # cache all user's schedule between start date time and end date time
-        end_date_time = process_end_date_time(
-            end_date, start_time, duration, tenant
-        )
-
-        if not after_occurrence:
-            after_occurrence = 999999999
         current = start_date
 
         while current <= end_date:
 
-            if tenant.is_work_day(current):
-
-                if (
-                    week_difference(start_date, current) % repeat_every == 0
-                    and current.weekday() in occurs_days
-                ):
-                    # check that user is free
-                    current_start_date_time = get_localized_time(
-                        current, start_time, tenant.timezone
-                    )
-                    current_end_date_time = process_end_date_time(
-                        current, start_time, duration, tenant
-                    )
-
-                    if not is_day_free(holidays, current):
-                        current += timedelta(days=1)
-                        continue
-
-                    if not is_user_free(
-                        user_schedule,
-                        current_start_date_time,
-                        current_end_date_time,
-                    ):
-                        raise CustomValidation(
-                            detail=f"Task owner is not free between "
-                            f"{current_start_date_time} and "
-                            f"{current_end_date_time}",
-                            field="start_time",
-                            status_code=400,
-                        )
-
-                    start_date_list.append(current)
-                    after_occurrence -= 1
-
-                    if after_occurrence <= 0:
-                        break
+            if (
+                tenant.is_work_day(current)
+                and week_difference(start_date, current) % repeat_every == 0
+                and current.weekday() in occurs_days
+                and is_day_free(holidays, current)
+            ):
+                yield current
             current += timedelta(days=1)
 
     elif routine_option == Task.MONTHLY:
-
-        if not after_occurrence:
-            after_occurrence = 999999999
         repeat_every_check = 1
 
         if occurs_month_day_number:
@@ -273,44 +304,13 @@ def process_start_date_list_for_task(
                     if repeat_every_check == 1:
                         repeat_every_check = repeat_every  # restores
 
-                        # checks if the occurred day number falls on a non work day
-                        if not tenant.is_work_day(current):
-                            current += timedelta(days=1)
-                            continue
-                            # # while it is not, adds a day till it is
-                            # while not tenant.is_work_day(current):
-                            #     current += timedelta(days=1)
-
-                        current_start_date_time = get_localized_time(
-                            current, start_time, tenant.timezone
-                        )
-                        current_end_date_time = process_end_date_time(
-                            current, start_time, duration, tenant
-                        )
-
-                        if not is_day_free(holidays, current):
-                            current += timedelta(days=1)
-                            continue
-
-                        if not is_user_free(
-                            user_schedule,
-                            current_start_date_time,
-                            current_end_date_time,
+                        # checks if the occurred day number falls on a non
+                        # work day or a holiday
+                        if tenant.is_work_day(current) and is_day_free(
+                            holidays, current
                         ):
-                            raise CustomValidation(
-                                detail=f"Task owner is not free between "
-                                f"{current_start_date_time} and "
-                                f"{current_end_date_time}",
-                                field="start_time",
-                                status_code=400,
-                            )
-
-                        start_date_list.append(current)
-                        after_occurrence -= 1
-
-                        if after_occurrence <= 0:
-                            break
-                        current += timedelta(days=25)
+                            yield current
+                            current += timedelta(days=25)
                     else:
                         repeat_every_check -= 1
                 current += timedelta(days=1)
@@ -332,58 +332,18 @@ def process_start_date_list_for_task(
                 ):
                     repeat_every_check = repeat_every
 
-                    # check that user is free
-                    current_start_date_time = get_localized_time(
-                        date_time.date(), start_time, tenant.timezone
-                    )
-                    current_end_date_time = process_end_date_time(
-                        date_time.date(), start_time, duration, tenant
-                    )
-
-                    if not is_day_free(holidays, date_time):
+                    if not is_day_free(holidays, date_time.date()):
                         continue
 
-                    if not is_user_free(
-                        user_schedule,
-                        current_start_date_time,
-                        current_end_date_time,
-                    ):
-                        raise CustomValidation(
-                            detail=f"Task owner is not free between "
-                            f"{current_start_date_time} and "
-                            f"{current_end_date_time}",
-                            field="start_time",
-                            status_code=400,
-                        )
-
-                    start_date_list.append(date_time.date())
-                    after_occurrence -= 1
-
-                    if after_occurrence <= 0:
-                        break
+                    yield date_time.date()
 
                 repeat_every_check -= 1
 
-    # edge case where upline end date is < first possible occurrence
-    if len(start_date_list) == 0:
-        raise CustomValidation(
-            detail=f"Upline end date is before the first possible occurrence",
-            field="after_occurrence",
-            status_code=400,
-        )
-
-    return start_date_list
 
-
-def is_user_free(user_schedule, start_time, end_time):
-    user_scheduled_event = user_schedule.filter(
-        (Q(start_time__lte=start_time) & Q(end_time__gte=start_time))
-        | (Q(start_time__lte=end_time) & Q(end_time__gte=end_time))
-    )
-    if user_scheduled_event.exists():
-        return False
-    else:
-        return True
+def is_user_free(user_schedule: BusyIntervals, start_time, end_time):
+    """Returns True if the loaded user's schedule is free between start
+    time and end time"""
+    return user_schedule.is_free(start_time, end_time)
 
 
 def process_target_point(
@@ -417,22 +377,26 @@ def process_target_point(
     )
 
 
-def is_day_free(holidays: Union[QuerySet, List[Holiday]], date: date):
+def is_day_free(holidays: Set[date], date: date):
     """Returns True if the date is not a holiday"""
-    if holidays.filter(date=date).exists():
-        return False
-    return True
-
-
-def get_user_schedule(start_date: datetime, end_date: datetime, user, tenant):
-    """Returns a queryset of user's schedule between start date and end date"""
-    return UserScheduledEventCalendar.objects.filter(
-        start_time__gte=get_localized_time(
-            start_date, datetime.min.time(), tenant.timezone
-        ),
-        end_time__lte=get_localized_time(
-            end_date, datetime.max.time(), tenant.timezone
-        ),
-        user=user,
-        is_free=False,
+    return date not in holidays
+
+
+def get_holidays(start_date: date, end_date: date) -> Set[date]:
+    """Returns the holiday dates between start date and end date"""
+    return set(
+        Holiday.objects.filter(
+            date__gte=start_date,
+            date__lte=end_date,
+        ).values_list("date", flat=True)
+    )
+
+
+def get_user_schedule(
+    start_date: datetime, end_date: datetime, user, tenant
+) -> BusyIntervals:
+    """Returns the busy intervals of user's schedule between start date and
+    end date"""
+    return load_busy_intervals(
+        *get_window(start_date, end_date, tenant), user=user
     )
@@ -0,0 +1,200 @@
+"""
+Cross tenant jobs, runs a callable or a management command against every
+tenant schema, or a subset of them, with bounded parallelism either in a
+local process pool or as a celery chord on the bulk queue. Progress is
+stored per tenant in ``TenantJobResult`` rows, so a failed or interrupted
+run can be resumed and only the tenants that did not succeed run again.
+
+A callable target is the dotted path of a function taking the tenant,
+e.g ``core.utils.some_module.backfill(tenant, *arguments)``, it runs with
+the tenant's schema set on the connection.
+"""
+import io
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django_tenants.utils import get_public_schema_name
+
+from client.models import Client, TenantJob, TenantJobResult
+
+
+def create_job(
+    target: str,
+    arguments: List = None,
+    is_command: bool = False,
+    schemas: Iterable[str] = None,
+    exclude: Iterable[str] = (),
+) -> TenantJob:
+    """Creates a job with one pending result per selected tenant"""
+    tenants = Client.objects.exclude(schema_name=get_public_schema_name())
+    if schemas:
+        tenants = tenants.filter(schema_name__in=schemas)
+    if exclude:
+        tenants = tenants.exclude(schema_name__in=exclude)
+
+    job = TenantJob.objects.create(
+        target=target, arguments=arguments or [], is_command=is_command
+    )
+    TenantJobResult.objects.bulk_create(
+        TenantJobResult(job=job, schema_name=schema_name)
+        for schema_name in tenants.order_by("schema_name").values_list(
+            "schema_name", flat=True
+        )
+    )
+    return job
+
+
+def reset_unfinished(job: TenantJob) -> int:
+    """
+    Marks the results that did not succeed as pending again, results
+    left running by a killed worker included
+    :return: the number of tenants to run again
+    """
+    job.status = TenantJob.RUNNING
+    job.finished_at = None
+    job.save(update_fields=["status", "finished_at"])
+    return job.results.exclude(status=TenantJobResult.SUCCEEDED).update(
+        status=TenantJobResult.PENDING
+    )
+
+
+def run_for_tenant(result_id: int) -> Dict:
+    """Runs the job of the result in the result's tenant schema"""
+    result = TenantJobResult.objects.select_related("job").get(pk=result_id)
+    job = result.job
+    result.status = TenantJobResult.RUNNING
+    result.attempts += 1
+    result.started_at = timezone.now()
+    result.save(update_fields=["status", "attempts", "started_at"])
+
+    output = io.StringIO()
+    started_at = time.perf_counter()
+    try:
+        tenant = Client.objects.get(schema_name=result.schema_name)
+        connection.set_tenant(tenant)
+        if job.is_command:
+            call_command(job.target, *job.arguments, stdout=output)
+        else:
+            returned = import_string(job.target)(tenant, *job.arguments)
+            if returned is not None:
+                output.write(str(returned))
+        result.status = TenantJobResult.SUCCEEDED
+        result.error = ""
+    except Exception:
+        result.status = TenantJobResult.FAILED
+        result.error = traceback.format_exc()
+    finally:
+        connection.set_schema_to_public()
+
+    result.seconds = time.perf_counter() - started_at
+    result.output = output.getvalue()
+    result.save(update_fields=["status", "seconds", "output", "error"])
+    return {
+        "schema_name": result.schema_name,
+        "status": result.status,
+        "seconds": result.seconds,
+    }
+
+
+def finish_job(job: TenantJob) -> TenantJob:
+    failed = job.results.exclude(status=TenantJobResult.SUCCEEDED).exists()
+    job.status = TenantJob.FAILED if failed else TenantJob.SUCCEEDED
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+    return job
+
+
+def run_job(
+    job: TenantJob,
+    workers: int = 1,
+    on_progress: Optional[Callable[[Dict, int, int], None]] = None,
+) -> TenantJob:
+    """
+    Runs the pending results of the job in ``workers`` processes,
+    ``on_progress`` is called with each outcome, the number of finished
+    and the number of pending tenants
+    """
+    pending = list(
+        job.results.filter(status=TenantJobResult.PENDING).values_list(
+            "pk", flat=True
+        )
+    )
+
+    if workers <= 1:
+        for done, result_id in enumerate(pending, start=1):
+            outcome = run_for_tenant(result_id)
+            if on_progress:
+                on_progress(outcome, done, len(pending))
+        return finish_job(job)
+
+    # forked workers must not share the parent's database connections
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        futures = [
+            executor.submit(run_for_tenant, result_id) for result_id in pending
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            outcome = future.result()
+            if on_progress:
+                on_progress(outcome, done, len(pending))
+    return finish_job(job)
+
+
+def run_job_with_celery(job: TenantJob):
+    """
+    Runs the pending results of the job as a chord on the bulk queue, the
+    parallelism is the concurrency of the bulk workers
+    """
+    from celery import chord
+
+    from client.tasks import bulk_finish_tenant_job, bulk_run_tenant_job
+
+    pending = job.results.filter(status=TenantJobResult.PENDING).values_list(
+        "pk", flat=True
+    )
+    return chord(
+        bulk_run_tenant_job.si(result_id) for result_id in pending
+    )(bulk_finish_tenant_job.si(job.pk))
+
+
+def get_job_summary(job: TenantJob, slowest: int = 5) -> Dict:
+    results = list(job.results.all())
+    timed = [result for result in results if result.seconds is not None]
+    counts = {status: 0 for status, _ in TenantJobResult.STATUS_CHOICES}
+    for result in results:
+        counts[result.status] += 1
+
+    return {
+        "job": job.pk,
+        "target": job.target,
+        "status": job.status,
+        "tenants": len(results),
+        "counts": counts,
+        "seconds_total": sum(result.seconds for result in timed),
+        "seconds_max": max((result.seconds for result in timed), default=0),
+        "wall_seconds": (
+            (job.finished_at - job.created_at).total_seconds()
+            if job.finished_at
+            else None
+        ),
+        "slowest": [
+            (result.schema_name, result.seconds)
+            for result in sorted(
+                timed, key=lambda result: result.seconds, reverse=True
+            )[:slowest]
+        ],
+        "failed": [
+            (result.schema_name, result.error.strip().splitlines()[-1])
+            for result in results
+            if result.status == TenantJobResult.FAILED and result.error
+        ],
+    }
@@ -3,7 +3,6 @@ from django.db import connection
 
 from account.models.email_invitation import EmailInvitation
 from client.models import Domain
-from core.utils.modify_raw_sql import dictfetchall
 
 
 User = get_user_model()
@@ -22,19 +21,13 @@ def delete_client(client) -> None:
     Domain.objects.filter(tenant_id=client.id).delete()
     EmailInvitation.objects.filter(user__email=user.email).delete()
 
-    token = None
     with connection.cursor() as cursor:
         cursor.execute(
-            "SELECT * FROM token_blacklist_outstandingtoken WHERE user_id=%s",
+            "DELETE FROM token_blacklist_blacklistedtoken WHERE token_id IN "
+            "(SELECT id FROM token_blacklist_outstandingtoken "
+            "WHERE user_id=%s)",
             [user.id],
         )
-        tokens = dictfetchall(cursor)
-
-        for token in tokens:
-            cursor.execute(
-                "DELETE FROM token_blacklist_blacklistedtoken WHERE token_id=%s",
-                [token["id"]],
-            )
 
     with connection.cursor() as cursor:
 
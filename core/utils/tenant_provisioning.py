@@ -0,0 +1,315 @@
+"""
+Tenant provisioning from a template schema. The template is migrated and
+seeded once, new tenants get a copy of it instead of running every tenant
+migration, either by renaming a warm schema cloned ahead of time into the
+pool or, when the pool is empty, by cloning the template on the spot.
+
+The clone is built from the catalog of the template rather than with the
+``clone_schema`` function shipped with django-tenants, which fails on the
+mixed case table names of some apps, and keeps the names of constraints
+and indexes so that later migrations apply to cloned schemas unchanged.
+"""
+import logging
+import uuid
+from typing import FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import ProgrammingError, connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django_tenants.utils import schema_exists
+
+
+logger = logging.getLogger(__name__)
+
+_disk_migrations: Optional[FrozenSet[Tuple[str, str]]] = None
+
+
+def get_disk_migrations() -> FrozenSet[Tuple[str, str]]:
+    """Every migration of the project, loaded once per process"""
+    global _disk_migrations
+    if _disk_migrations is None:
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        _disk_migrations = frozenset(loader.disk_migrations)
+    return _disk_migrations
+
+
+def get_applied_migrations(schema_name: str) -> FrozenSet[Tuple[str, str]]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT app, name FROM "{schema_name}".django_migrations'
+        )
+        return frozenset(cursor.fetchall())
+
+
+def is_schema_current(schema_name: str) -> bool:
+    """Checks the schema has every migration of the code applied"""
+    if not schema_exists(schema_name):
+        return False
+    return get_disk_migrations() <= get_applied_migrations(schema_name)
+
+
+def get_pool_schemas() -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nspname FROM pg_namespace WHERE nspname LIKE %s "
+            "ORDER BY nspname",
+            [f"{settings.TENANT_POOL_PREFIX}%"],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def drop_schema(schema_name: str):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP SCHEMA IF EXISTS "{schema_name}" CASCADE')
+
+
+def clone_schema(source: str, dest: str):
+    """
+    Copies the tables, rows, sequences, constraints and indexes of the
+    ``source`` schema into the new ``dest`` schema. The statements are
+    sent to the database as one batch inside the caller's transaction.
+    """
+    quote = connection.ops.quote_name
+    # expressions read with the source schema alone on the search path are
+    # unqualified and resolve to the copies once run inside the new schema
+    connection.set_schema(source, include_public=False)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class"
+            " WHERE relnamespace = %s::regnamespace AND relkind IN ('r', 'p')"
+            " ORDER BY relname",
+            [source],
+        )
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT sequencename, data_type::text, increment_by, min_value,"
+            " max_value, start_value, cycle, last_value FROM pg_sequences"
+            " WHERE schemaname = %s",
+            [source],
+        )
+        sequences = cursor.fetchall()
+        cursor.execute(
+            "SELECT seq.relname, tbl.relname, att.attname FROM pg_depend dep"
+            " JOIN pg_class seq ON seq.oid = dep.objid AND seq.relkind = 'S'"
+            " JOIN pg_class tbl ON tbl.oid = dep.refobjid"
+            " JOIN pg_attribute att ON att.attrelid = tbl.oid"
+            " AND att.attnum = dep.refobjsubid"
+            " WHERE seq.relnamespace = %s::regnamespace AND dep.deptype = 'a'",
+            [source],
+        )
+        owned_sequences = cursor.fetchall()
+        cursor.execute(
+            "SELECT tbl.relname, att.attname,"
+            " pg_get_expr(def.adbin, def.adrelid) FROM pg_attrdef def"
+            " JOIN pg_class tbl ON tbl.oid = def.adrelid"
+            " JOIN pg_attribute att ON att.attrelid = def.adrelid"
+            " AND att.attnum = def.adnum"
+            " WHERE tbl.relnamespace = %s::regnamespace"
+            " AND pg_get_expr(def.adbin, def.adrelid) LIKE 'nextval(%%'",
+            [source],
+        )
+        serial_defaults = cursor.fetchall()
+        # foreign keys last, once every referenced key exists
+        cursor.execute(
+            "SELECT tbl.relname, con.conname, pg_get_constraintdef(con.oid)"
+            " FROM pg_constraint con"
+            " JOIN pg_class tbl ON tbl.oid = con.conrelid"
+            " WHERE tbl.relnamespace = %s::regnamespace"
+            " AND con.contype IN ('p', 'u', 'x', 'f')"
+            " ORDER BY con.contype = 'f', tbl.relname, con.conname",
+            [source],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT pg_get_indexdef(idx.indexrelid) FROM pg_index idx"
+            " JOIN pg_class cls ON cls.oid = idx.indexrelid"
+            " WHERE cls.relnamespace = %s::regnamespace AND NOT EXISTS ("
+            " SELECT 1 FROM pg_constraint con"
+            " WHERE con.conindid = idx.indexrelid"
+            " AND con.contype IN ('p', 'u', 'x'))",
+            [source],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT quote_ident(%s), quote_ident(%s)", [source, dest]
+        )
+        source_prefix, dest_prefix = (
+            f" ON {name}." for name in cursor.fetchone()
+        )
+
+    statements = [
+        f"CREATE SCHEMA {quote(dest)}",
+        f"SET search_path TO {quote(dest)}, public",
+    ]
+    for name, data_type, increment, minimum, maximum, start, cycle, last in (
+        sequences
+    ):
+        statements.append(
+            f"CREATE SEQUENCE {quote(name)} AS {data_type}"
+            f" INCREMENT {increment} MINVALUE {minimum} MAXVALUE {maximum}"
+            f" START {start} {'CYCLE' if cycle else 'NO CYCLE'}"
+        )
+        if last is not None:
+            statements.append(f"SELECT setval('{quote(name)}', {last})")
+    for table in tables:
+        statements.append(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(source)}.{quote(table)}"
+            " INCLUDING CONSTRAINTS INCLUDING GENERATED INCLUDING STORAGE)"
+        )
+    for table, column, expression in serial_defaults:
+        statements.append(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)}"
+            f" SET DEFAULT {expression}"
+        )
+    for sequence, table, column in owned_sequences:
+        statements.append(
+            f"ALTER SEQUENCE {quote(sequence)}"
+            f" OWNED BY {quote(table)}.{quote(column)}"
+        )
+    for table in tables:
+        statements.append(
+            f"INSERT INTO {quote(table)}"
+            f" SELECT * FROM {quote(source)}.{quote(table)}"
+        )
+    for index in indexes:
+        statements.append(index.replace(source_prefix, dest_prefix, 1))
+    for table, name, definition in constraints:
+        statements.append(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)}"
+            f" {definition}"
+        )
+
+    connection.set_schema_to_public()
+    with connection.cursor() as cursor:
+        cursor.execute(";\n".join(statements))
+    # the batch changed the search path behind the connection's back
+    connection.set_schema_to_public()
+
+
+def build_template():
+    """
+    Creates or migrates the template schema and seeds the rows every
+    tenant starts with. Run after every deploy that adds migrations.
+    """
+    template = settings.TENANT_TEMPLATE_SCHEMA
+    connection.set_schema_to_public()
+    if not schema_exists(template):
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA "{template}"')
+
+    call_command(
+        "migrate_schemas",
+        tenant=True,
+        schema_name=template,
+        interactive=False,
+        verbosity=0,
+    )
+
+    connection.set_schema(schema_name=template)
+    call_command("bulk_create_roles")
+    connection.set_schema_to_public()
+
+
+def fill_pool(size: int = None) -> int:
+    """
+    Drops pool schemas cloned from an older template and clones the
+    template until the pool holds ``size`` schemas.
+    :return: the number of schemas cloned
+    """
+    size = settings.TENANT_POOL_SIZE if size is None else size
+    template = settings.TENANT_TEMPLATE_SCHEMA
+    connection.set_schema_to_public()
+    if not is_schema_current(template):
+        logger.warning("tenant template %s is missing or outdated", template)
+        return 0
+
+    template_migrations = get_applied_migrations(template)
+    pool = []
+    for schema_name in get_pool_schemas():
+        if get_applied_migrations(schema_name) == template_migrations:
+            pool.append(schema_name)
+        else:
+            drop_schema(schema_name)
+
+    cloned = 0
+    for _ in range(size - len(pool)):
+        schema_name = f"{settings.TENANT_POOL_PREFIX}{uuid.uuid4().hex[:12]}"
+        clone_schema(template, schema_name)
+        cloned += 1
+    return cloned
+
+
+def drain_pool() -> int:
+    connection.set_schema_to_public()
+    pool = get_pool_schemas()
+    for schema_name in pool:
+        drop_schema(schema_name)
+    return len(pool)
+
+
+def claim_pool_schema(schema_name: str) -> bool:
+    """
+    Renames a warm pool schema to ``schema_name``. Concurrent signups may
+    race for the same schema, the loser's rename fails and it moves on to
+    the next one.
+    """
+    template_migrations = None
+    for pool_schema in get_pool_schemas():
+        if template_migrations is None:
+            if not is_schema_current(settings.TENANT_TEMPLATE_SCHEMA):
+                return False
+            template_migrations = get_applied_migrations(
+                settings.TENANT_TEMPLATE_SCHEMA
+            )
+        try:
+            with transaction.atomic():
+                if get_applied_migrations(pool_schema) != template_migrations:
+                    continue
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'ALTER SCHEMA "{pool_schema}" '
+                        f'RENAME TO "{schema_name}"'
+                    )
+        except ProgrammingError:
+            # claimed by another signup in the meantime
+            continue
+        return True
+    return False
+
+
+def provision_schema(schema_name: str) -> bool:
+    """
+    Creates the schema of a new tenant from the pool or the template.
+    :return: False when neither is available and the schema has to be
+        migrated from scratch
+    """
+    connection.set_schema_to_public()
+    if claim_pool_schema(schema_name):
+        refill_pool()
+        return True
+
+    template = settings.TENANT_TEMPLATE_SCHEMA
+    if is_schema_current(template):
+        clone_schema(template, schema_name)
+        refill_pool()
+        return True
+    return False
+
+
+def refill_pool():
+    """Queues a pool refill once the provisioning transaction commits"""
+    if not settings.TENANT_POOL_SIZE:
+        return
+
+    def dispatch():
+        from client.tasks import bulk_fill_tenant_pool
+
+        # a signup must not fail or wait because the broker is unreachable,
+        # the next refill or `manage.py tenant_pool` tops the pool up
+        try:
+            bulk_fill_tenant_pool.apply_async(retry=False)
+        except Exception:
+            logger.exception("could not queue the tenant pool refill")
+
+    transaction.on_commit(dispatch)
@@ -0,0 +1,115 @@
+"""
+Tenant registry, resolves the subfolder of a request or an organisation
+short name to its tenant without a query. Tenants are kept in a small LRU
+in each worker process, backed by the shared cache, both keyed by a
+registry version. Saving or deleting a ``Client`` or ``Domain`` moves the
+version forward, which drops the tenants every worker holds at once; the
+price is one cache read of the version per lookup.
+
+The cache keys are made in the public schema, the cache key function
+prefixes them with the current schema otherwise.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django_tenants.utils import (
+    get_public_schema_name,
+    get_tenant_domain_model,
+    get_tenant_model,
+    schema_context,
+)
+
+
+VERSION_KEY = "tenant_registry_version"
+KEY_PREFIX = "tenant_registry:"
+
+# stored for names without a tenant, unknown subfolders cost no query either
+MISSING = "missing"
+
+_tenants = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_version() -> int:
+    with schema_context(get_public_schema_name()):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(VERSION_KEY, version, timeout=None):
+                version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate():
+    """Drops the registered tenants of every worker"""
+    with _lock:
+        _tenants.clear()
+    with schema_context(get_public_schema_name()):
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_receiver(sender, **kwargs):
+    """Receiver for the ``Client`` and ``Domain`` save and delete signals"""
+    transaction.on_commit(invalidate)
+
+
+def lookup(key: str, load: Callable):
+    """
+    The tenant registered under ``key``, loaded with ``load`` and
+    registered when unknown. Every caller gets its own copy, the
+    middleware sets request attributes on it.
+    """
+    version = get_version()
+    with _lock:
+        entry = _tenants.get(key)
+        if entry is not None and entry[0] == version:
+            _tenants.move_to_end(key)
+            tenant = entry[1]
+            return None if tenant == MISSING else copy.copy(tenant)
+
+    cache_key = f"{KEY_PREFIX}{version}:{key}"
+    with schema_context(get_public_schema_name()):
+        tenant = cache.get(cache_key)
+        if tenant is None:
+            tenant = load() or MISSING
+            cache.set(
+                cache_key, tenant, timeout=settings.TENANT_REGISTRY_TIMEOUT
+            )
+
+    with _lock:
+        _tenants[key] = (version, tenant)
+        _tenants.move_to_end(key)
+        while len(_tenants) > settings.TENANT_REGISTRY_SIZE:
+            _tenants.popitem(last=False)
+    return None if tenant == MISSING else copy.copy(tenant)
+
+
+def get_tenant_by_subfolder(subfolder: str):
+    """The tenant routed under ``subfolder``, None when there is none"""
+
+    def load():
+        domain = (
+            get_tenant_domain_model()
+            .objects.select_related("tenant")
+            .filter(domain=subfolder)
+            .first()
+        )
+        return domain.tenant if domain else None
+
+    return lookup(f"subfolder:{subfolder}", load)
+
+
+def get_tenant_by_schema(schema_name: str) -> Optional[object]:
+    """The tenant of ``schema_name``, None when there is none"""
+    return lookup(
+        f"schema:{schema_name}",
+        lambda: get_tenant_model()
+        .objects.filter(schema_name=schema_name)
+        .first(),
+    )
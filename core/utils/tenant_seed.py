@@ -0,0 +1,671 @@
+"""
+Deterministic synthetic data for a tenant schema. Rows are written with
+bulk inserts through the base managers, which skips the custom
+``bulk_create`` managers and the post_save signals (periodic tasks,
+calendar events, invitations), and every value, uuids included, is drawn
+from a seeded random generator so two runs with the same seed produce the
+same organisation.
+"""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from account.models import Role
+from career_path.models import CareerPath
+from designation.models import Designation
+from emetric_calendar.models import Holiday, UserScheduledEventCalendar
+from employee.models import Employee
+from employee.search import refresh_search_documents
+from employee_profile.models import (
+    BasicInformation,
+    ContactInformation,
+    EmploymentInformation,
+)
+from organization.models import (
+    CorporateLevel,
+    Department,
+    Division,
+    Group,
+    Unit,
+)
+from payroll.models.generated_employee_montly_structure import (
+    EmployeeSavedEmployeeReceivables,
+    EmployeeSavedEmployeeRegulatoryDeductables,
+    EmployeeSavedMonthlySalaryStructure,
+)
+from payroll.models.monthly_salary_structure import (
+    EmployeeReceivables,
+    EmployeeRegulatoryDeductables,
+    MonthlySalaryStructure,
+)
+from strategy_deck.models import Initiative, Objective
+from tasks.models import Task, TaskSubmission
+
+
+User = get_user_model()
+
+# rows of every model for each preset size, employees are spread evenly
+# over the units of the organisation tree
+SIZES = {
+    "small": {
+        "divisions": 2,
+        "groups_per_division": 2,
+        "departments_per_group": 2,
+        "units_per_department": 2,
+        "employees": 200,
+        "objectives": 5,
+        "initiatives_per_employee": 2,
+        "tasks_per_initiative": 5,
+        "recurring_initiatives": 0.1,
+    },
+    "medium": {
+        "divisions": 4,
+        "groups_per_division": 3,
+        "departments_per_group": 3,
+        "units_per_department": 4,
+        "employees": 2000,
+        "objectives": 10,
+        "initiatives_per_employee": 2,
+        "tasks_per_initiative": 5,
+        "recurring_initiatives": 0.1,
+    },
+    "large": {
+        "divisions": 6,
+        "groups_per_division": 4,
+        "departments_per_group": 4,
+        "units_per_department": 5,
+        "employees": 10000,
+        "objectives": 20,
+        "initiatives_per_employee": 3,
+        "tasks_per_initiative": 8,
+        "recurring_initiatives": 0.2,
+    },
+}
+
+FIRST_NAMES = (
+    "ada", "bola", "chidi", "dayo", "emeka", "funmi", "gbenga", "halima",
+    "ife", "jide", "kemi", "lola", "musa", "ngozi", "olu", "remi", "segun",
+    "tolu", "uche", "yemi", "zainab",
+)
+LAST_NAMES = (
+    "adeyemi", "bello", "chukwu", "danjuma", "eze", "fashola", "garba",
+    "ibrahim", "johnson", "kalu", "lawal", "mohammed", "nwosu", "okafor",
+    "okonkwo", "salami", "taiwo", "usman", "williams", "yusuf",
+)
+HOLIDAYS = (
+    (1, 1, "new year's day"),
+    (5, 1, "workers' day"),
+    (6, 12, "democracy day"),
+    (10, 1, "independence day"),
+    (12, 25, "christmas day"),
+    (12, 26, "boxing day"),
+)
+
+# days of task history before today and of planned tasks after it
+TASK_HISTORY_DAYS = 90
+TASK_PLANNED_DAYS = 30
+
+BATCH_SIZE = 1000
+DEFAULT_PASSWORD = "seeded-password"
+# the dates of the organisation are laid out around this day, a fixed one
+# so that the same seed produces the same rows on any day
+DEFAULT_TODAY = date(2025, 6, 2)
+
+
+class TenantSeeder:
+    """Fills the current tenant schema with a synthetic organisation"""
+
+    def __init__(
+        self,
+        tenant,
+        size: str = "small",
+        seed: int = 0,
+        password: str = DEFAULT_PASSWORD,
+        today: date = None,
+    ):
+        self.tenant = tenant
+        self.size = SIZES[size]
+        self.random = random.Random(seed)
+        self.password = make_password(password, salt=f"seed{seed}")
+        self.today = today or DEFAULT_TODAY
+        self.counts: Dict[str, int] = {}
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def bulk_create(self, model, objs: List) -> List:
+        # the base manager skips the overridden bulk_create of the app
+        # managers, which would schedule periodic tasks per row
+        created = model._base_manager.bulk_create(objs, batch_size=BATCH_SIZE)
+        self.counts[model._meta.label] = (
+            self.counts.get(model._meta.label, 0) + len(created)
+        )
+        return created
+
+    def seed(self) -> Dict[str, int]:
+        """Creates every row in one transaction and returns the counts"""
+        connection.set_tenant(self.tenant)
+        with transaction.atomic():
+            self.seed_roles()
+            self.seed_admin()
+            self.seed_structure()
+            self.seed_career_paths()
+            self.seed_designations()
+            self.seed_employees()
+            self.seed_objectives()
+            self.seed_initiatives()
+            self.seed_tasks()
+            self.seed_submissions()
+            self.seed_holidays()
+            self.seed_payroll()
+        return self.counts
+
+    def seed_roles(self):
+        if not Role.objects.exists():
+            self.bulk_create(
+                Role, [Role(role=role) for role, _ in Role.ROLE_CHOICES]
+            )
+        self.roles = {role.role: role for role in Role.objects.all()}
+
+    def seed_admin(self):
+        self.admin = self.bulk_create(
+            User,
+            [
+                User(
+                    email=f"admin@{self.tenant.schema_name}.test",
+                    first_name="admin",
+                    last_name=self.tenant.schema_name,
+                    phone_number="+2348000000000",
+                    user_id=self.uuid(),
+                    user_role=self.roles[Role.SUPER_ADMIN],
+                    password=self.password,
+                    is_active=True,
+                    is_staff=True,
+                    is_superuser=True,
+                    is_registration_mail_sent=True,
+                )
+            ],
+        )[0]
+
+    def structure(self, model, name, **kwargs):
+        return model(
+            uuid=self.uuid(),
+            name=name,
+            slug=slugify(name),
+            organisation_short_name=self.tenant,
+            **kwargs,
+        )
+
+    def seed_structure(self):
+        size = self.size
+        self.corporate_level = self.bulk_create(
+            CorporateLevel, [self.structure(CorporateLevel, "corporate")]
+        )[0]
+        self.divisions = self.bulk_create(
+            Division,
+            [
+                self.structure(
+                    Division,
+                    f"division {d}",
+                    corporate_level=self.corporate_level,
+                )
+                for d in range(size["divisions"])
+            ],
+        )
+        self.groups = self.bulk_create(
+            Group,
+            [
+                self.structure(Group, f"group {d}.{g}", division=division)
+                for d, division in enumerate(self.divisions)
+                for g in range(size["groups_per_division"])
+            ],
+        )
+        self.departments = self.bulk_create(
+            Department,
+            [
+                self.structure(
+                    Department, f"department {group.name[6:]}.{p}", group=group
+                )
+                for group in self.groups
+                for p in range(size["departments_per_group"])
+            ],
+        )
+        self.units = self.bulk_create(
+            Unit,
+            [
+                self.structure(
+                    Unit,
+                    f"unit {department.name[11:]}.{u}",
+                    department=department,
+                )
+                for department in self.departments
+                for u in range(size["units_per_department"])
+            ],
+        )
+
+    def seed_career_paths(self):
+        self.career_paths = self.bulk_create(
+            CareerPath,
+            [
+                CareerPath(
+                    career_path_id=self.uuid(),
+                    name=f"grade level {level}",
+                    level=level,
+                    educational_qualification="bsc",
+                    years_of_experience_required=level * 2,
+                    min_age=18 + level,
+                    max_age=60,
+                    position_lifespan=3,
+                    slots_available=10 * level,
+                    annual_package=1200000 * level,
+                )
+                for level in range(1, 11)
+            ],
+        )
+
+    def seed_designations(self):
+        self.designations = self.bulk_create(
+            Designation,
+            [
+                Designation(
+                    designation_id=self.uuid(),
+                    name=f"{title} {department.name}",
+                    department=department,
+                )
+                for department in self.departments
+                for title in ("analyst", "officer", "manager")
+            ],
+        )
+
+    def seed_employees(self):
+        """
+        Employees are spread over the units, the first employee of every
+        unit leads it and is the upline of the others
+        """
+        count = self.size["employees"]
+        users, unit_of_user = [], []
+        for number in range(count):
+            unit = self.units[number % len(self.units)]
+            is_lead = number < len(self.units)
+            users.append(
+                User(
+                    email=f"employee{number}@{self.tenant.schema_name}.test",
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    phone_number=f"+234801{number:07d}",
+                    user_id=self.uuid(),
+                    user_role=self.roles[
+                        Role.TEAM_LEAD if is_lead else Role.EMPLOYEE
+                    ],
+                    password=self.password,
+                    is_active=True,
+                    is_invited=True,
+                    is_registration_mail_sent=True,
+                )
+            )
+            unit_of_user.append(unit)
+        users = self.bulk_create(User, users)
+
+        self.team_leads = {}
+        for user, unit in zip(users, unit_of_user):
+            if unit.pk not in self.team_leads:
+                self.team_leads[unit.pk] = user
+                unit.team_lead = user
+        Unit._base_manager.bulk_update(self.units, ["team_lead"])
+
+        self.employees = self.bulk_create(
+            Employee,
+            [
+                Employee(
+                    uuid=self.uuid(),
+                    user=user,
+                    organisation_short_name=self.tenant,
+                    unit=unit,
+                    career_path=self.random.choice(self.career_paths),
+                )
+                for user, unit in zip(users, unit_of_user)
+            ],
+        )
+        designations_of_department = {}
+        for designation in self.designations:
+            designations_of_department.setdefault(
+                designation.department_id, []
+            ).append(designation)
+
+        self.bulk_create(
+            BasicInformation,
+            [
+                BasicInformation(
+                    employee=employee,
+                    basic_information_id=self.uuid(),
+                    designation=self.random.choice(
+                        designations_of_department[employee.unit.department_id]
+                    ),
+                    date_of_birth=date(1970, 1, 1)
+                    + timedelta(days=self.random.randrange(30 * 365)),
+                    brief_description="seeded employee",
+                )
+                for employee in self.employees
+            ],
+        )
+        self.bulk_create(
+            ContactInformation,
+            [
+                ContactInformation(
+                    employee=employee,
+                    contact_information_id=self.uuid(),
+                    official_email=employee.user.email,
+                    personal_email=f"personal.{employee.user.email}",
+                    phone_number=employee.user.phone_number,
+                    address=f"{self.random.randrange(1, 200)} marina, lagos",
+                )
+                for employee in self.employees
+            ],
+        )
+        self.bulk_create(
+            EmploymentInformation,
+            [
+                EmploymentInformation(
+                    employee=employee,
+                    employment_information_id=self.uuid(),
+                    date_employed=self.today
+                    - timedelta(days=self.random.randrange(30, 10 * 365)),
+                    upline=(
+                        None
+                        if self.team_leads[employee.unit_id] == employee.user
+                        else self.team_leads[employee.unit_id]
+                    ),
+                    status=(
+                        EmploymentInformation.ACTIVE
+                        if self.random.random() < 0.95
+                        else EmploymentInformation.ON_LEAVE
+                    ),
+                )
+                for employee in self.employees
+            ],
+        )
+        # bulk inserts skip the signals maintaining the search documents
+        refresh_search_documents(Employee._base_manager.all())
+
+    def seed_objectives(self):
+        start_date = self.today.replace(month=1, day=1)
+        self.objectives = self.bulk_create(
+            Objective,
+            [
+                Objective(
+                    objective_id=self.uuid(),
+                    name=f"objective {number}",
+                    corporate_level=self.corporate_level,
+                    objective_status=Objective.ACTIVE,
+                    routine_option=Objective.ONCE,
+                    start_date=start_date,
+                    end_date=start_date.replace(month=12, day=31),
+                )
+                for number in range(self.size["objectives"])
+            ],
+        )
+
+    def seed_initiatives(self):
+        start_date = self.today - timedelta(days=TASK_HISTORY_DAYS)
+        end_date = self.today + timedelta(days=TASK_PLANNED_DAYS)
+        initiatives = []
+        for employee in self.employees:
+            lead = self.team_leads[employee.unit_id]
+            for number in range(self.size["initiatives_per_employee"]):
+                initiatives.append(
+                    Initiative(
+                        initiative_id=self.uuid(),
+                        name=f"initiative {employee.pk}.{number}",
+                        upline_objective=self.random.choice(self.objectives),
+                        unit=employee.unit,
+                        owner=employee.user,
+                        assignor=self.admin if lead == employee.user else lead,
+                        routine_option=Initiative.ONCE,
+                        start_date=start_date,
+                        end_date=end_date,
+                        initiative_status=Initiative.ACTIVE,
+                    )
+                )
+        self.initiatives = self.bulk_create(Initiative, initiatives)
+
+    def task(self, initiative, name, start_date, **kwargs) -> Task:
+        """A task of the initiative, closed and rated if it is past"""
+        is_closed = start_date < self.today
+        turn_around = Decimal(self.random.randrange(1, 5))
+        quantity = Decimal(self.random.randrange(1, 10))
+        quality = Decimal(self.random.randrange(1, 10))
+        achieved = (
+            Decimal(self.random.randrange(0, 101)) / 100
+            if is_closed
+            else Decimal(0)
+        )
+        return Task(
+            task_id=self.uuid(),
+            name=name,
+            upline_initiative=initiative,
+            task_type=Task.QUANTITATIVE_AND_QUALITATIVE,
+            start_date=start_date,
+            start_time=time(hour=self.random.randrange(8, 16)),
+            duration=timedelta(hours=self.random.randrange(1, 4)),
+            task_status=Task.CLOSED if is_closed else Task.PENDING,
+            turn_around_time_target_point=turn_around,
+            turn_around_time_target_point_achieved=(
+                turn_around if is_closed else Decimal(0)
+            ),
+            quantity_target_unit=quantity,
+            quantity_target_unit_achieved=quantity * achieved,
+            quantity_target_point=quantity,
+            quantity_target_point_achieved=quantity * achieved,
+            quality_target_point=quality,
+            quality_target_point_achieved=quality * achieved,
+            target_point=turn_around + quantity + quality,
+            target_point_achieved=(
+                turn_around + (quantity + quality) * achieved
+                if is_closed
+                else Decimal(0)
+            ),
+            **kwargs,
+        )
+
+    def seed_tasks(self):
+        """
+        Tasks are spread over the history and planning window, past ones
+        are closed and rated. A share of the initiatives also carries a
+        weekly task, stored like the task serializer stores recurring
+        tasks, one row per round sharing a series id. Every task has its calendar event.
+        """
+        span = TASK_HISTORY_DAYS + TASK_PLANNED_DAYS
+        window_start = self.today - timedelta(days=TASK_HISTORY_DAYS)
+        window_end = self.today + timedelta(days=TASK_PLANNED_DAYS)
+        tasks = []
+        for initiative in self.initiatives:
+            for number in range(self.size["tasks_per_initiative"]):
+                tasks.append(
+                    self.task(
+                        initiative,
+                        f"task {initiative.pk}.{number}",
+                        window_start
+                        + timedelta(days=self.random.randrange(span)),
+                        routine_option=Task.ONCE,
+                    )
+                )
+
+            if self.random.random() >= self.size["recurring_initiatives"]:
+                continue
+            # first work day of the window the series starts on
+            first_date = window_start + timedelta(
+                days=self.random.randrange(7)
+            )
+            while first_date.weekday() > Task.FRIDAY:
+                first_date += timedelta(days=1)
+            rounds = (window_end - first_date).days // 7 + 1
+            series_id = self.uuid()
+            for round_number in range(rounds):
+                tasks.append(
+                    self.task(
+                        initiative,
+                        f"weekly task {initiative.pk}",
+                        first_date + timedelta(weeks=round_number),
+                        routine_option=Task.WEEKLY,
+                        routine_round=round_number + 1,
+                        series_id=series_id,
+                        occurs_days=[first_date.weekday()],
+                        end_date=window_end,
+                    )
+                )
+        self.tasks = self.bulk_create(Task, tasks)
+
+        self.bulk_create(
+            UserScheduledEventCalendar,
+            [
+                UserScheduledEventCalendar(
+                    name=task.name,
+                    user=task.upline_initiative.owner,
+                    task=task,
+                    start_time=timezone.make_aware(
+                        datetime.combine(task.start_date, task.start_time)
+                    ),
+                    end_time=timezone.make_aware(
+                        datetime.combine(task.start_date, task.start_time)
+                        + task.duration
+                    ),
+                    **UserScheduledEventCalendar.get_team(
+                        task.upline_initiative
+                    ),
+                )
+                for task in self.tasks
+            ],
+        )
+
+    def seed_submissions(self):
+        """One owner submission for every closed task, made in time"""
+        closed_tasks = [
+            task for task in self.tasks if task.task_status == Task.CLOSED
+        ]
+        submissions = self.bulk_create(
+            TaskSubmission,
+            [
+                TaskSubmission(
+                    task_submission_id=self.uuid(),
+                    user=task.upline_initiative.owner,
+                    task=task,
+                    quantity_target_unit_achieved=(
+                        task.quantity_target_unit_achieved
+                    ),
+                )
+                for task in closed_tasks
+            ],
+        )
+        # created is set on insert, the history is written afterwards
+        for submission, task in zip(submissions, closed_tasks):
+            submission.created = timezone.make_aware(
+                datetime.combine(task.start_date, task.start_time)
+                + task.duration * self.random.random()
+            )
+        TaskSubmission._base_manager.bulk_update(
+            submissions, ["created"], batch_size=BATCH_SIZE
+        )
+
+    def seed_holidays(self):
+        self.bulk_create(
+            Holiday,
+            [
+                Holiday(name=name, date=date(year, month, day))
+                for year in (self.today.year - 1, self.today.year)
+                for month, day, name in HOLIDAYS
+            ],
+        )
+
+    def seed_payroll(self):
+        """One salary template per grade level and last month's payroll"""
+        templates = self.bulk_create(
+            MonthlySalaryStructure,
+            [
+                MonthlySalaryStructure(
+                    grade_level=career_path,
+                    gross_money=Decimal(career_path.annual_package) / 12,
+                )
+                for career_path in self.career_paths
+            ],
+        )
+        self.bulk_create(
+            EmployeeReceivables,
+            [
+                EmployeeReceivables(
+                    monthly_salary_structure=template,
+                    fixed_receivables_element=element,
+                    fixed_receivables_element_gross_percent=percent,
+                    value=template.gross_money * percent / 100,
+                )
+                for template in templates
+                for element, percent in (("basic", 60), ("housing", 40))
+            ],
+        )
+        self.bulk_create(
+            EmployeeRegulatoryDeductables,
+            [
+                EmployeeRegulatoryDeductables(
+                    monthly_salary_structure=template,
+                    Employee_regulatory_deductables="pension",
+                    Employee_regulatory_deductables_gross_percent=100,
+                    regulatory_rates=8,
+                    value=template.gross_money * 8 / 100,
+                )
+                for template in templates
+            ],
+        )
+
+        template_of_career_path = {
+            template.grade_level_id: template for template in templates
+        }
+        last_month = self.today.replace(day=1) - timedelta(days=1)
+        generated_for = last_month.replace(day=1)
+        salaries = self.bulk_create(
+            EmployeeSavedMonthlySalaryStructure,
+            [
+                EmployeeSavedMonthlySalaryStructure(
+                    grade_level_id=employee.career_path_id,
+                    gross_money=template_of_career_path[
+                        employee.career_path_id
+                    ].gross_money,
+                    employee=employee,
+                    generated_for=generated_for,
+                )
+                for employee in self.employees
+            ],
+        )
+        self.bulk_create(
+            EmployeeSavedEmployeeReceivables,
+            [
+                EmployeeSavedEmployeeReceivables(
+                    monthly_salary_structure=salary,
+                    fixed_receivables_element=element,
+                    fixed_receivables_element_gross_percent=percent,
+                    value=salary.gross_money * percent / 100,
+                )
+                for salary in salaries
+                for element, percent in (("basic", 60), ("housing", 40))
+            ],
+        )
+        self.bulk_create(
+            EmployeeSavedEmployeeRegulatoryDeductables,
+            [
+                EmployeeSavedEmployeeRegulatoryDeductables(
+                    monthly_salary_structure=salary,
+                    Employee_regulatory_deductables="pension",
+                    Employee_regulatory_deductables_gross_percent=100,
+                    regulatory_rates=8,
+                    value=salary.gross_money * 8 / 100,
+                )
+                for salary in salaries
+            ],
+        )
+        self.payroll_month = generated_for
@@ -0,0 +1,78 @@
+"""
+Purge of expired refresh tokens. Refresh tokens are rotated and blacklisted
+on every refresh, so the outstanding and blacklisted token tables of the
+public and every tenant schema grow with each refresh. Tokens past their
+expiry can not be used anymore, they are deleted in batches walking the
+primary key, each batch in its own transaction, until none is left or the
+time budget is spent. The next run continues where it stopped.
+
+``client.tasks.bulk_purge_expired_tokens`` is scheduled by celery beat, it
+purges the public schema and runs ``purge_tenant_tokens`` for every tenant
+as a tenant job, see core.utils.tenant_jobs.
+"""
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+def purge_expired_tokens(
+    batch_size: int = None, time_budget: float = None
+) -> Dict:
+    """
+    Deletes the expired outstanding tokens of the current schema and their
+    blacklist entries
+    :param batch_size: tokens deleted per transaction
+    :param time_budget: seconds after which no new batch is started
+    :return: the deleted counts, whether every expired token was deleted
+    """
+    batch_size = batch_size or settings.TOKEN_PURGE_BATCH_SIZE
+    time_budget = time_budget or settings.TOKEN_PURGE_TIME_BUDGET
+    now = aware_utcnow()
+    started_at = time.perf_counter()
+    summary = {
+        "outstanding": 0,
+        "blacklisted": 0,
+        "batches": 0,
+        "finished": False,
+    }
+
+    last_pk = 0
+    while time.perf_counter() - started_at < time_budget:
+        # tokens are created in primary key order, walking the key keeps
+        # every batch on the primary key index
+        pks = list(
+            OutstandingToken.objects.filter(
+                pk__gt=last_pk, expires_at__lte=now
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            summary["finished"] = True
+            break
+
+        with transaction.atomic():
+            _, deleted = OutstandingToken.objects.filter(pk__in=pks).delete()
+        summary["outstanding"] += deleted.get(
+            OutstandingToken._meta.label, 0
+        )
+        summary["blacklisted"] += deleted.get(
+            "token_blacklist.BlacklistedToken", 0
+        )
+        summary["batches"] += 1
+        last_pk = pks[-1]
+
+    summary["seconds"] = round(time.perf_counter() - started_at, 3)
+    return summary
+
+
+def purge_tenant_tokens(tenant, batch_size: int = None, time_budget=None):
+    """Tenant job target, runs with the schema of ``tenant`` set"""
+    return purge_expired_tokens(
+        batch_size=batch_size and int(batch_size),
+        time_budget=time_budget and float(time_budget),
+    )
@@ -1,7 +1,7 @@
 import uuid
-from django.core.cache import cache
 from django.db import models
 
+from core.utils.change_versions import invalidate
 from core.models import BaseModel
 from employee.models import Employee
 from organization.models import (
@@ -16,7 +16,7 @@ from organization.models import (
 class DesignationManager(models.Manager):
     def bulk_create(self, objs, **kwargs):
         result = super().bulk_create(objs, **kwargs)
-        cache.delete("designation_queryset")
+        invalidate("designation_queryset")
         return result
 
 
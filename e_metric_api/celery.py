@@ -9,6 +9,8 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "e_metric_api.settings")
 
 from tenant_schemas_celery.app import CeleryApp as TenantAwareCeleryApp
 from celery.schedules import crontab
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from django.conf import settings
 
 
 app = TenantAwareCeleryApp()
@@ -23,8 +25,60 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
-# Note: celery worker must be run with "default" queue defined
-# app.conf.task_default_queue = "default"
+
+def _stamp_published_at(**kwargs):
+    from core.utils.queue_metrics import stamp_published_at
+
+    stamp_published_at(**kwargs)
+
+
+def _record_task_started(**kwargs):
+    from core.utils.queue_metrics import record_task_started
+
+    record_task_started(**kwargs)
+
+
+def _record_task_finished(**kwargs):
+    from core.utils.queue_metrics import record_task_finished
+
+    record_task_finished(**kwargs)
+
+
+# per queue latency metrics, see core.utils.queue_metrics
+before_task_publish.connect(
+    _stamp_published_at, dispatch_uid="queue_metrics_stamp_published_at"
+)
+task_prerun.connect(
+    _record_task_started, dispatch_uid="queue_metrics_record_task_started"
+)
+task_postrun.connect(
+    _record_task_finished, dispatch_uid="queue_metrics_record_task_finished"
+)
+
+# synced into the database by the beat DatabaseScheduler
+app.conf.beat_schedule = {
+    "purge-expired-tokens": {
+        "task": "client.tasks.bulk_purge_expired_tokens",
+        "schedule": crontab(minute="30", hour="2"),
+    },
+    "expand-recurring-tasks": {
+        "task": "client.tasks.bulk_expand_recurring_tasks",
+        "schedule": crontab(minute="0", hour="3"),
+    },
+    "relay-outbox": {
+        "task": "client.tasks.relay_outbox",
+        "schedule": settings.OUTBOX_RELAY_INTERVAL,
+        # a late relay is replaced by the next one
+        "options": {"expires": settings.OUTBOX_RELAY_INTERVAL},
+    },
+    "sweep-outbox": {
+        "task": "client.tasks.bulk_sweep_outbox",
+        "schedule": settings.OUTBOX_SWEEP_INTERVAL,
+    },
+}
+
+# Note: queues, routes and worker profiles are defined in settings,
+# start workers with `python manage.py run_worker <profile>`
 # from django_tenants_celery_beat.utils import generate_beat_schedule
 
 # app.conf.beat_schedule = generate_beat_schedule(
@@ -68,7 +68,10 @@ for i in ALLOWED_HOSTS:
 
 # Application definition
 
-DATABASE_ROUTERS = ("django_tenants.routers.TenantSyncRouter",)
+DATABASE_ROUTERS = (
+    "core.utils.replicas.ReplicaRouter",
+    "django_tenants.routers.TenantSyncRouter",
+)
 
 SHARED_APPS = [
     "django_tenants",
@@ -155,10 +158,28 @@ PUBLIC_SCHEMA_URLCONF = "e_metric_api.urls_public"
 TENANT_MODEL = "client.Client"
 TENANT_DOMAIN_MODEL = "client.Domain"
 TENANT_SUBFOLDER_PREFIX = "client"
+# new tenants copy a pre-migrated template schema instead of running every
+# migration, see core.utils.tenant_provisioning and `manage.py tenant_pool`
+TENANT_PROVISION_FROM_TEMPLATE = bool(
+    int(env("TENANT_PROVISION_FROM_TEMPLATE", default="1"))
+)
+TENANT_TEMPLATE_SCHEMA = "tenant_template"
+TENANT_POOL_PREFIX = "tenant_pool_"
+# warm schemas kept cloned ahead of signups
+TENANT_POOL_SIZE = int(env("TENANT_POOL_SIZE", default=3))
+# processes `manage.py run_tenant_job` runs tenants in
+TENANT_JOB_WORKERS = int(env("TENANT_JOB_WORKERS", default=4))
+# tenants resolved from the url kept per worker process and the seconds
+# they are kept in the shared cache, see core.utils.tenant_registry
+TENANT_REGISTRY_SIZE = 256
+TENANT_REGISTRY_TIMEOUT = 60 * 60
 DEFAULT_FROM_EMAIL = env(
     "DEFAULT_MAIL_SENDER", default="emetricsuite@gmail.com"
 )
-DATABASE_ROUTERS = ("django_tenants.routers.TenantSyncRouter",)
+DATABASE_ROUTERS = (
+    "core.utils.replicas.ReplicaRouter",
+    "django_tenants.routers.TenantSyncRouter",
+)
 
 DEFAULT_ACTIVATION_DAYS = 7
 
@@ -172,6 +193,7 @@ ADMINS = MANAGERS
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "core.utils.CustomTenantSubFolderMiddleware",
+    "core.utils.replicas.ReplicaPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -182,6 +204,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_user_agents.middleware.UserAgentMiddleware",
 ]
+# always on, placed after the tenant middleware so requests are tagged
+# with their schema, silk stays a DEBUG only tool
+MIDDLEWARE.insert(2, "core.utils.request_metrics.RequestMetricsMiddleware")
 MIDDLEWARE.insert(2, "silk.middleware.SilkyMiddleware") if DEBUG else None
 
 
@@ -237,6 +262,30 @@ else:
         }
     }
 
+# read replicas of the default database, reports, dashboards, exports and
+# listings read from them, see core.utils.replicas
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(
+    env.list("DATABASE_REPLICA_URLS", default=[]), start=1
+):
+    replica_info = urlparse(replica_url)
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "NAME": replica_info.path[1:],
+        "USER": replica_info.username,
+        "PASSWORD": replica_info.password,
+        "HOST": replica_info.hostname,
+        "PORT": replica_info.port,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+# seconds a replica may lag behind, between lag checks and during which the
+# reads of a user stay on default after a write
+REPLICA_MAX_LAG_SECONDS = float(env("REPLICA_MAX_LAG_SECONDS", default=5))
+REPLICA_LAG_CHECK_SECONDS = float(env("REPLICA_LAG_CHECK_SECONDS", default=2))
+REPLICA_STICKY_SECONDS = int(env("REPLICA_STICKY_SECONDS", default=15))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -269,7 +318,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
     "EXCEPTION_HANDLER": "core.utils.custom_exception_handler",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.utils.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
@@ -278,6 +327,11 @@ REST_FRAMEWORK = {
     ],
 }
 
+# how cursor paginated lists count their rows unless the request asks for
+# another mode, exact, estimate (query planner), cached or none
+PAGINATION_COUNT_MODE = env("PAGINATION_COUNT_MODE", default="estimate")
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
 # JWT config
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
@@ -289,6 +343,56 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# expired outstanding and blacklisted tokens are purged nightly per schema,
+# see core.utils.token_purge
+TOKEN_PURGE_BATCH_SIZE = int(env("TOKEN_PURGE_BATCH_SIZE", default=5000))
+# seconds spent purging one schema per run, the next run continues
+TOKEN_PURGE_TIME_BUDGET = int(env("TOKEN_PURGE_TIME_BUDGET", default=120))
+
+# celery tasks published from signals are relayed to the broker every
+# interval in batches, and every schema is swept for events missed in
+# between, see core.utils.outbox
+OUTBOX_RELAY_INTERVAL = float(env("OUTBOX_RELAY_INTERVAL", default=5))
+OUTBOX_RELAY_BATCH_SIZE = int(env("OUTBOX_RELAY_BATCH_SIZE", default=500))
+OUTBOX_SWEEP_INTERVAL = float(env("OUTBOX_SWEEP_INTERVAL", default=10 * 60))
+
+# recurring tasks created with ?expand=background create their first
+# occurrences in the request, a worker creates the rest in chunks up to a
+# horizon that rolls forward nightly, see core.utils.task_expansion
+TASK_EXPANSION_PREVIEW_SIZE = int(
+    env("TASK_EXPANSION_PREVIEW_SIZE", default=10)
+)
+TASK_EXPANSION_CHUNK_SIZE = int(env("TASK_EXPANSION_CHUNK_SIZE", default=200))
+TASK_EXPANSION_HORIZON_DAYS = int(
+    env("TASK_EXPANSION_HORIZON_DAYS", default=90)
+)
+
+# free slot search of the user and team calendars, days searched when no
+# end date is given, longest range and most slots returned, see
+# core.utils.availability
+AVAILABILITY_SEARCH_DAYS = int(env("AVAILABILITY_SEARCH_DAYS", default=14))
+AVAILABILITY_MAX_DAYS = int(env("AVAILABILITY_MAX_DAYS", default=92))
+AVAILABILITY_MAX_SLOTS = int(env("AVAILABILITY_MAX_SLOTS", default=50))
+
+# iCalendar feeds of the user and team calendars, events per streamed chunk,
+# largest feed cached and for how long, days of past events kept in a feed,
+# seconds a feed url stays valid, see core.utils.ical
+ICAL_CHUNK_SIZE = int(env("ICAL_CHUNK_SIZE", default=500))
+ICAL_CACHE_MAX_BYTES = int(env("ICAL_CACHE_MAX_BYTES", default=1024 * 1024))
+ICAL_CACHE_TIMEOUT = int(env("ICAL_CACHE_TIMEOUT", default=60 * 60))
+ICAL_PAST_DAYS = int(env("ICAL_PAST_DAYS", default=90))
+ICAL_TOKEN_MAX_AGE = int(
+    env("ICAL_TOKEN_MAX_AGE", default=60 * 60 * 24 * 180)
+)
+
+# what happens to the tasks starting on a new holiday, "drop", "shift" to
+# the next work day or "flag" for review, see core.utils.holiday_changes
+HOLIDAY_TASK_POLICY = env("HOLIDAY_TASK_POLICY", default="drop")
+
+# threads running the independent queries of a report at the same time, 1
+# runs them one after the other, see core.utils.report_pool
+REPORT_POOL_SIZE = int(env("REPORT_POOL_SIZE", default=4))
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -319,7 +423,24 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # sending blue
-SENDINBLUE_API_KEY = env("SENDINBLUE_API_KEY")
+SENDINBLUE_API_KEY = env("SENDINBLUE_API_KEY", default="")
+
+# Mail dispatch
+# MAIL_BACKEND can point to mailing.services.local.InMemoryMailing or
+# mailing.services.local.FileMailing to keep emails on the machine
+MAIL_BACKEND = env(
+    "MAIL_BACKEND", default="mailing.services.send_in_blue.SendInBlue"
+)
+MAIL_FILE_PATH = env(
+    "MAIL_FILE_PATH", default=str(BASE_DIR / "sent_emails" / "emails.jsonl")
+)
+MAIL_BATCH_SIZE = int(env("MAIL_BATCH_SIZE", default=100))
+# messages per second and burst size of each mail worker process
+MAIL_RATE_LIMIT = float(env("MAIL_RATE_LIMIT", default=10))
+MAIL_RATE_LIMIT_BURST = int(env("MAIL_RATE_LIMIT_BURST", default=100))
+MAIL_MAX_RETRIES = int(env("MAIL_MAX_RETRIES", default=3))
+MAIL_RETRY_BACKOFF = float(env("MAIL_RETRY_BACKOFF", default=2))
+MAIL_CONNECTION_POOL_SIZE = int(env("MAIL_CONNECTION_POOL_SIZE", default=4))
 
 # Redis
 # setup -> https://digitalocean.com/community/tutorials/how-to-install-and-secure-redis-on-ubuntu-18-04
@@ -365,7 +486,8 @@ CACHES = {
         "KEY_FUNCTION": "django_tenants.cache.make_key",
         "REVERSE_KEY_FUNCTION": "django_tenants.cache.reverse_key",
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # counts the cache hits and misses of every request
+            "CLIENT_CLASS": "core.utils.request_metrics.InstrumentedRedisClient",
             # "CONNECTION_POOL_KWARGS": {
             #     "ssl_cert_reqs": None
             # },
@@ -383,9 +505,104 @@ BROKER_CONNECTION_TIMEOUT = 10
 # Celery Configuration Options
 CELERY_ENABLE_UTC = True
 CELERY_TIMEZONE = "UTC"
-# configure queues, currently we have only one
-CELERY_DEFAULT_QUEUE = "default"
-CELERY_QUEUES = (Queue("default", Exchange("default"), routing_key="default"),)
+# configure queues, each workload has its own queue so that a slow job
+# never holds back a time critical one
+# status  -> task, initiative and objective status transitions and the
+#            outbox relay
+# scoring -> cpu bound system based rating of submissions
+# mail    -> transactional emails
+# bulk    -> imports, payroll and maintenance jobs over many rows
+# default -> everything else, e.g target point roll ups
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = tuple(
+    Queue(name, Exchange(name), routing_key=name)
+    for name in ("status", "default", "scoring", "mail", "bulk")
+)
+# lower runs first, redis emulates priorities with one list per step
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_TASK_ROUTES = {
+    "tasks.tasks.detail.change_task_status_to_*": {
+        "queue": "status",
+        "priority": 0,
+    },
+    "strategy_deck.tasks.*.change_*_status_to_*": {
+        "queue": "status",
+        "priority": 0,
+    },
+    "tasks.tasks.detail.generate_system_based_rating": {"queue": "scoring"},
+    "mailing.tasks.*": {"queue": "mail"},
+    # the relay sends the messages of the other queues, it must not wait
+    # behind a bulk job
+    "client.tasks.relay_outbox": {"queue": "status", "priority": 0},
+    # bulk jobs are listed by name, a new one is added here
+    **{
+        name: {"queue": "bulk", "priority": 9}
+        for name in (
+            "client.tasks.bulk_fill_tenant_pool",
+            "client.tasks.bulk_run_tenant_job",
+            "client.tasks.bulk_finish_tenant_job",
+            "client.tasks.bulk_purge_expired_tokens",
+            "client.tasks.bulk_sweep_outbox",
+            "client.tasks.bulk_expand_recurring_tasks",
+            "tasks.tasks.detail.bulk_expand_recurring_task",
+        )
+    },
+}
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "queue_order_strategy": "priority",
+    "sep": ":",
+}
+
+# worker profile per queue, started with `python manage.py run_worker <name>`
+CELERY_WORKER_PROFILES = {
+    # short row updates that must run on time, many threads and no
+    # prefetching so a flip is never stuck behind another one
+    "status": {
+        "queues": ["status"],
+        "pool": "threads",
+        "concurrency": int(env("CELERY_STATUS_CONCURRENCY", default=8)),
+        "prefetch_multiplier": 1,
+    },
+    "default": {
+        "queues": ["default"],
+        "pool": "prefork",
+        "concurrency": int(env("CELERY_DEFAULT_CONCURRENCY", default=2)),
+        "prefetch_multiplier": 4,
+    },
+    # pdf extraction and text analysis are cpu bound, use processes and
+    # hand out one job at a time
+    "scoring": {
+        "queues": ["scoring"],
+        "pool": "prefork",
+        "concurrency": int(env("CELERY_SCORING_CONCURRENCY", default=2)),
+        "prefetch_multiplier": 1,
+        "max_tasks_per_child": 50,
+    },
+    # network bound, threads share the pooled mail client
+    "mail": {
+        "queues": ["mail"],
+        "pool": "threads",
+        "concurrency": int(env("CELERY_MAIL_CONCURRENCY", default=8)),
+        "prefetch_multiplier": 4,
+    },
+    "bulk": {
+        "queues": ["bulk"],
+        "pool": "prefork",
+        "concurrency": int(env("CELERY_BULK_CONCURRENCY", default=1)),
+        "prefetch_multiplier": 1,
+        "max_tasks_per_child": 10,
+    },
+    # single worker consuming every queue, status first, for small setups
+    "all": {
+        "queues": ["status", "default", "scoring", "mail", "bulk"],
+        "pool": "prefork",
+        "concurrency": int(env("CELERY_ALL_CONCURRENCY", default=2)),
+        "prefetch_multiplier": 1,
+    },
+}
+# seconds the per queue latency metrics are kept in redis
+CELERY_QUEUE_METRICS_TTL = 60 * 60 * 24
 CELERY_ALWAYS_EAGER = False
 CELERY_ACKS_LATE = True
 CELERY_TASK_PUBLISH_RETRY = True
@@ -434,3 +651,29 @@ SILKY_PYTHON_PROFILER_BINARY = SILKY_PYTHON_PROFILER
 SILKY_PYTHON_PROFILER_RESULT_PATH = "/profiled/"
 SILKY_META = SILKY_PYTHON_PROFILER
 SILKY_INTERCEPT_FUNC = lambda r: DEBUG
+
+
+# Request metrics, aggregated per tenant schema and view, scraped from
+# /metrics/ in prometheus text format
+REQUEST_METRICS_ENABLED = bool(
+    int(env("REQUEST_METRICS_ENABLED", default="1"))
+)
+# also log one json line per request on the emetric.request_metrics logger
+REQUEST_METRICS_LOG = bool(int(env("REQUEST_METRICS_LOG", default="0")))
+# seconds each process aggregates requests before writing to redis
+REQUEST_METRICS_FLUSH_INTERVAL = int(
+    env("REQUEST_METRICS_FLUSH_INTERVAL", default=10)
+)
+REQUEST_METRICS_TTL = 60 * 60 * 24 * 7
+# share of requests that get a full cProfile report, e.g 0.001
+REQUEST_PROFILE_SAMPLE_RATE = float(
+    env("REQUEST_PROFILE_SAMPLE_RATE", default=0)
+)
+# requests sending this value in the X-Profile-Token header are profiled
+REQUEST_PROFILE_TOKEN = env("REQUEST_PROFILE_TOKEN", default="")
+# bearer token required by /metrics/, the endpoint answers 404 when empty
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+# send the Server-Timing header to every client, staff users always get it
+REQUEST_METRICS_SERVER_TIMING = bool(
+    int(env("REQUEST_METRICS_SERVER_TIMING", default="0"))
+)
@@ -19,6 +19,7 @@ from django.contrib import admin
 from django.urls import path, include
 
 from account.views.user import GetUsersByRoleView
+from core.utils.request_metrics import metrics_view
 from employee.views import GetAllEmployeeView
 
 urlpatterns = [
@@ -39,7 +40,8 @@ urlpatterns = [
     ),
     path(
         'client-management/',include('client.urls')
-    )
+    ),
+    path("metrics/", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
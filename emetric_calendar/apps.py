@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
 
 class EmetricCalendarConfig(AppConfig):
@@ -8,7 +8,11 @@ class EmetricCalendarConfig(AppConfig):
 
     def ready(self) -> None:
         from emetric_calendar.models import Holiday
-        from emetric_calendar.signals import post_save_holiday_created_receiver
+        from emetric_calendar.signals import (
+            post_delete_holiday_receiver,
+            post_save_holiday_created_receiver,
+        )
 
         post_save.connect(post_save_holiday_created_receiver, sender=Holiday)
+        post_delete.connect(post_delete_holiday_receiver, sender=Holiday)
         return super().ready()
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+TEAM_FIELDS = ("corporate_level", "division", "group", "department", "unit")
+
+
+def copy_team(apps, schema_editor):
+    """Copies the team of the upline initiative of every event's task"""
+    UserScheduledEventCalendar = apps.get_model(
+        "emetric_calendar", "UserScheduledEventCalendar"
+    )
+    Task = apps.get_model("tasks", "Task")
+    UserScheduledEventCalendar.objects.update(
+        **{
+            f"{field}_id": models.Subquery(
+                Task.objects.filter(
+                    task_id=models.OuterRef("task_id")
+                ).values(f"upline_initiative__{field}_id")[:1]
+            )
+            for field in TEAM_FIELDS
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0001_initial'),
+        ('strategy_deck', '0003_series'),
+        ('tasks', '0004_expansion'),
+        ('emetric_calendar', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userscheduledeventcalendar',
+            name='corporate_level',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='organization.corporatelevel'),
+        ),
+        migrations.AddField(
+            model_name='userscheduledeventcalendar',
+            name='department',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='organization.department'),
+        ),
+        migrations.AddField(
+            model_name='userscheduledeventcalendar',
+            name='division',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='organization.division'),
+        ),
+        migrations.AddField(
+            model_name='userscheduledeventcalendar',
+            name='group',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='organization.group'),
+        ),
+        migrations.AddField(
+            model_name='userscheduledeventcalendar',
+            name='unit',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='organization.unit'),
+        ),
+        migrations.RunPython(copy_team, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userscheduledeventcalendar',
+            index=models.Index(fields=['corporate_level', 'division', 'group', 'department', 'unit', 'is_free', 'start_time'], name='calendar_team_events'),
+        ),
+        migrations.AddIndex(
+            model_name='userscheduledeventcalendar',
+            index=models.Index(fields=['user', 'is_free', 'start_time'], name='calendar_user_events'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:11
+
+import django.core.serializers.json
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emetric_calendar', '0002_event_team'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HolidayChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, unique=True)),
+                ('policy', models.CharField(choices=[('drop', 'drop'), ('shift', 'shift to the next work day'), ('flag', 'flag for review')], max_length=255)),
+                ('dates', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('dropped_count', models.PositiveIntegerField(default=0)),
+                ('shifted_count', models.PositiveIntegerField(default=0)),
+                ('flagged', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -1,12 +1,31 @@
+import uuid
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
+from organization.models import (
+    Unit,
+    Department,
+    Group,
+    Division,
+    CorporateLevel,
+)
 from tasks.models.detail import Task
 
 User = get_user_model()
 
 
 class UserScheduledEventCalendar(models.Model):
+    # the team of the task's upline initiative, copied onto the event so
+    # team calendars select on one index instead of joining initiatives
+    TEAM_FIELDS = (
+        "corporate_level",
+        "division",
+        "group",
+        "department",
+        "unit",
+    )
+
     name = models.CharField(max_length=255, db_index=True)
     user = models.ForeignKey(
         User, to_field="user_id", on_delete=models.CASCADE
@@ -18,14 +37,91 @@ class UserScheduledEventCalendar(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
 
+    corporate_level = models.ForeignKey(
+        CorporateLevel,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name="+",
+    )
+    division = models.ForeignKey(
+        Division,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name="+",
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name="+",
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name="+",
+    )
+    unit = models.ForeignKey(
+        Unit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name="+",
+    )
+
     objects = models.Manager()
 
     class Meta:
         ordering = ["-id"]
+        indexes = [
+            models.Index(
+                fields=[
+                    "corporate_level",
+                    "division",
+                    "group",
+                    "department",
+                    "unit",
+                    "is_free",
+                    "start_time",
+                ],
+                name="calendar_team_events",
+            ),
+            models.Index(
+                fields=["user", "is_free", "start_time"],
+                name="calendar_user_events",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def get_team(cls, initiative) -> dict:
+        """The team fields of the events of ``initiative``'s tasks"""
+        return {
+            f"{field}_id": getattr(initiative, f"{field}_id")
+            for field in cls.TEAM_FIELDS
+        }
+
+    @classmethod
+    def update_team(cls, initiative) -> int:
+        """Moves the events of ``initiative``'s tasks to its current team"""
+        team = cls.get_team(initiative)
+        return (
+            cls.objects.filter(task__upline_initiative=initiative)
+            .exclude(**team)
+            .update(**team)
+        )
+
 
 class Holiday(models.Model):
     """Keeps track of holidays in the system"""
@@ -41,6 +137,42 @@ class Holiday(models.Model):
     def __str__(self):
         return self.date.strftime("%Y-%m-%d")
 
-    def delete_related_tasks(self):
-        """Delete all related tasks"""
-        Task.objects.filter(start_date=self.date).delete()
+
+class HolidayChange(models.Model):
+    """
+    What happened to the tasks starting on a batch of new holidays, see
+    core.utils.holiday_changes
+    """
+
+    DROP = "drop"
+    SHIFT = "shift"
+    FLAG = "flag"
+
+    POLICY_CHOICES = (
+        (DROP, "drop"),
+        (SHIFT, "shift to the next work day"),
+        (FLAG, "flag for review"),
+    )
+
+    change_id = models.UUIDField(
+        default=uuid.uuid4, editable=False, unique=True, db_index=True
+    )
+    policy = models.CharField(max_length=255, choices=POLICY_CHOICES)
+    dates = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+
+    task_count = models.PositiveIntegerField(default=0)
+    event_count = models.PositiveIntegerField(default=0)
+    dropped_count = models.PositiveIntegerField(default=0)
+    shifted_count = models.PositiveIntegerField(default=0)
+    # ids of the tasks left on a holiday for review
+    flagged = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.change_id} {self.policy}"
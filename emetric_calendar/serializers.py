@@ -1,11 +1,18 @@
+from datetime import timedelta
+from django.conf import settings
 from django.utils import timezone
 from rest_framework import serializers
 from core.serializers.nested import (
     NestedTaskSerializer,
     NestedUserSerializer,
 )
+from core.utils.eager_loading import EagerLoadingMixin
 
-from emetric_calendar.models import Holiday, UserScheduledEventCalendar
+from emetric_calendar.models import (
+    Holiday,
+    HolidayChange,
+    UserScheduledEventCalendar,
+)
 
 
 class HolidaySerializer(serializers.ModelSerializer):
@@ -23,9 +30,46 @@ class HolidaySerializer(serializers.ModelSerializer):
         return value
 
 
-class UserScheduledEventCalendarSerializer(serializers.ModelSerializer):
+class HolidayBulkCreateSerializer(serializers.Serializer):
+    """Holidays created at once, with the policy applied to their tasks"""
+
+    holidays = HolidaySerializer(many=True, allow_empty=False)
+    policy = serializers.ChoiceField(
+        choices=HolidayChange.POLICY_CHOICES,
+        default=settings.HOLIDAY_TASK_POLICY,
+    )
+
+    def validate_holidays(self, value):
+        dates = [holiday["date"] for holiday in value]
+        if len(dates) != len(set(dates)):
+            raise serializers.ValidationError("dates must be unique")
+        return value
+
+
+class HolidayChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HolidayChange
+        fields = [
+            "change_id",
+            "policy",
+            "dates",
+            "task_count",
+            "event_count",
+            "dropped_count",
+            "shifted_count",
+            "flagged",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class UserScheduledEventCalendarSerializer(
+    serializers.ModelSerializer, EagerLoadingMixin
+):
     """User scheduled event calendar serializer"""
 
+    select_related_fields = ("user", "task")
+
     user = NestedUserSerializer(read_only=True)
     task = NestedTaskSerializer(read_only=True)
 
@@ -55,3 +99,40 @@ class CalendarDashboardSerializer(serializers.Serializer):
     in_active_hours = serializers.IntegerField(read_only=True)
     active_days = serializers.IntegerField(read_only=True)
     in_active_days = serializers.IntegerField(read_only=True)
+
+
+class FreeSlotSearchSerializer(serializers.Serializer):
+    """Free slot search serializer"""
+
+    duration = serializers.DurationField(min_value=timedelta(minutes=1))
+    count = serializers.IntegerField(
+        min_value=1, max_value=settings.AVAILABILITY_MAX_SLOTS, default=5
+    )
+    date_after = serializers.DateField(required=False)
+    date_before = serializers.DateField(required=False)
+
+    def validate(self, data):
+        date_after = data.get("date_after") or timezone.localdate()
+        date_before = data.get("date_before") or date_after + timedelta(
+            days=settings.AVAILABILITY_SEARCH_DAYS - 1
+        )
+        if date_after > date_before:
+            raise serializers.ValidationError(
+                {"date_after": "date_after cannot be greater than date_before"}
+            )
+        if (date_before - date_after).days >= settings.AVAILABILITY_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "date_before": "date range cannot be longer than "
+                    f"{settings.AVAILABILITY_MAX_DAYS} days"
+                }
+            )
+        data.update(date_after=date_after, date_before=date_before)
+        return data
+
+
+class FreeSlotSerializer(serializers.Serializer):
+    """Free slot serializer"""
+
+    start_time = serializers.DateTimeField(read_only=True)
+    end_time = serializers.DateTimeField(read_only=True)
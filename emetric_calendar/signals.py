@@ -1,6 +1,7 @@
 from typing import Dict
-from django.core.cache import cache
 
+from core.utils.change_versions import invalidate
+from core.utils.holiday_changes import apply_holidays
 from emetric_calendar.models import Holiday
 
 
@@ -9,6 +10,10 @@ def post_save_holiday_created_receiver(
 ):
 
     if created:
-        instance.delete_related_tasks()
+        apply_holidays([instance.date])
 
-    cache.delete("holiday_queryset")
+    invalidate("holiday_queryset")
+
+
+def post_delete_holiday_receiver(sender, instance: Holiday, **kwargs: Dict):
+    invalidate("holiday_queryset")
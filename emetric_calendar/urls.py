@@ -10,6 +10,11 @@ from emetric_calendar.views import (
     TeamScheduledEventCalendarView,
     UserCalendarDashboardView,
     TeamCalendarDashboardView,
+    UserFreeSlotsView,
+    TeamFreeSlotsView,
+    UserCalendarFeedLinkView,
+    TeamCalendarFeedLinkView,
+    CalendarFeedView,
 )
 
 
@@ -38,5 +43,30 @@ urlpatterns = [
         TeamCalendarDashboardView.as_view(),
         name="team-calendar-dashboard",
     ),
+    path(
+        "user/<str:user_id>/free-slots/",
+        UserFreeSlotsView.as_view(),
+        name="user-free-slots",
+    ),
+    path(
+        "team/<str:team_id>/free-slots/",
+        TeamFreeSlotsView.as_view(),
+        name="team-free-slots",
+    ),
+    path(
+        "user/<str:user_id>/feed/",
+        UserCalendarFeedLinkView.as_view(),
+        name="user-calendar-feed",
+    ),
+    path(
+        "team/<str:team_id>/feed/",
+        TeamCalendarFeedLinkView.as_view(),
+        name="team-calendar-feed",
+    ),
+    path(
+        "feed/<str:token>.ics",
+        CalendarFeedView.as_view(),
+        name="calendar-feed",
+    ),
 ]
 urlpatterns += router.urls
@@ -2,17 +2,25 @@ from datetime import date, datetime, timedelta
 from math import ceil
 from typing import List, Union
 import django_filters
+from django.conf import settings
 from django.core.cache import cache
+from django.utils.decorators import method_decorator
 from django.forms import ValidationError
 from django.contrib.auth import get_user_model
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db import connection
+from django.db import connection, transaction
 from django.db.models import Count, F, Sum, QuerySet
 from django.db.models.functions import TruncDate
+from django.core import signing
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import viewsets, status, generics
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 
 from core.utils.permissions import (
@@ -20,12 +28,46 @@ from core.utils.permissions import (
     has_access_to_team,
 )
 from core.utils import response_data, permissions
+from core.utils.availability import (
+    find_free_slots,
+    get_window,
+    iter_work_periods,
+    load_busy_intervals,
+)
+from core.utils.change_versions import (
+    conditional_get,
+    get_not_modified_response,
+    invalidate,
+    get_validators,
+    set_validators,
+)
+from core.utils.ical import (
+    TEAM_FEED,
+    USER_FEED,
+    cache_feed,
+    get_cached_feed,
+    is_feed_user,
+    iter_feed,
+    make_feed_token,
+    read_feed_token,
+)
+from core.utils.holiday_changes import apply_holidays
 from core.utils.process_levels import process_level_by_uuid
-from emetric_calendar.models import Holiday, UserScheduledEventCalendar
+from core.utils.replicas import replica_reads
+from core.utils.task_process import get_holidays
+from emetric_calendar.models import (
+    Holiday,
+    HolidayChange,
+    UserScheduledEventCalendar,
+)
 from emetric_calendar.serializers import (
     HolidaySerializer,
+    HolidayBulkCreateSerializer,
+    HolidayChangeSerializer,
     UserScheduledEventCalendarSerializer,
     DateRangeSerializer,
+    FreeSlotSearchSerializer,
+    FreeSlotSerializer,
 )
 from emetric_calendar.filter import (
     HolidayFilter,
@@ -72,6 +114,56 @@ class HolidayViewsets(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="bulk",
+        serializer_class=HolidayBulkCreateSerializer,
+        permission_classes=[permissions.IsAdminOrSuperAdminOrReadOnly],
+    )
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Adds a batch of holidays, the policy is applied to the tasks starting
+        on them at once
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            holidays = Holiday.objects.bulk_create(
+                Holiday(**holiday)
+                for holiday in serializer.validated_data["holidays"]
+            )
+            change = apply_holidays(
+                [holiday.date for holiday in holidays],
+                serializer.validated_data["policy"],
+            )
+            invalidate("holiday_queryset")
+
+        data = response_data(
+            201,
+            "Holidays have been added successfully",
+            {
+                "holidays": HolidaySerializer(holidays, many=True).data,
+                "change": HolidayChangeSerializer(change).data,
+            },
+        )
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=["get"],
+        detail=False,
+        serializer_class=HolidayChangeSerializer,
+        permission_classes=[permissions.IsAdminOrSuperAdminOrReadOnly],
+    )
+    def changes(self, request, *args, **kwargs):
+        """What happened to the tasks starting on the new holidays"""
+        serializer = self.get_serializer(
+            HolidayChange.objects.all(), many=True
+        )
+        data = response_data(200, "Holiday changes", serializer.data)
+        return Response(data, status=status.HTTP_200_OK)
+
     def get_queryset(self):
         queryset = cache.get("holiday_queryset")
 
@@ -81,6 +173,10 @@ class HolidayViewsets(viewsets.ModelViewSet):
         return queryset
 
 
+@method_decorator(
+    conditional_get("task_queryset", "holiday_queryset", "employee_queryset"),
+    name="get",
+)
 class UserScheduledEventCalendarView(generics.ListAPIView):
     serializer_class = UserScheduledEventCalendarSerializer
     queryset = UserScheduledEventCalendar.objects.all()
@@ -105,14 +201,19 @@ class UserScheduledEventCalendarView(generics.ListAPIView):
             raise PermissionDenied(
                 {"user_id": "Permission denied to view user's calendar"}
             )
-        return UserScheduledEventCalendar.objects.filter(
+        queryset = UserScheduledEventCalendar.objects.filter(
             user__user_id=user_id, is_free=False
         ).order_by("start_time")
+        return self.get_serializer_class().setup_eager_loading(queryset)
 
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
+@method_decorator(
+    conditional_get("task_queryset", "holiday_queryset", "employee_queryset"),
+    name="get",
+)
 class TeamScheduledEventCalendarView(generics.ListAPIView):
     serializer_class = UserScheduledEventCalendarSerializer
     queryset = UserScheduledEventCalendar.objects.all()
@@ -155,14 +256,15 @@ class TeamScheduledEventCalendarView(generics.ListAPIView):
                 {"team_id": "Permission denied to view team's report"}
             )
 
-        return UserScheduledEventCalendar.objects.filter(
-            task__upline_initiative__corporate_level=corporate_level_obj,
-            task__upline_initiative__division=division_level_obj,
-            task__upline_initiative__group=group_level_obj,
-            task__upline_initiative__department=department_level_obj,
-            task__upline_initiative__unit=unit_level_obj,
+        queryset = UserScheduledEventCalendar.objects.filter(
+            corporate_level=corporate_level_obj,
+            division=division_level_obj,
+            group=group_level_obj,
+            department=department_level_obj,
+            unit=unit_level_obj,
             is_free=False,
         ).order_by("start_time")
+        return self.get_serializer_class().setup_eager_loading(queryset)
 
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -235,6 +337,14 @@ class CalendarDashboardMixins:
         }
 
 
+@method_decorator(
+    conditional_get("task_queryset", "holiday_queryset", "employee_queryset"),
+    name="get",
+)
+@method_decorator(
+    replica_reads("task_queryset", "holiday_queryset", "employee_queryset"),
+    name="get",
+)
 class UserCalendarDashboardView(
     generics.GenericAPIView, CalendarDashboardMixins
 ):
@@ -263,9 +373,10 @@ class UserCalendarDashboardView(
             raise PermissionDenied(
                 {"user_id": "Permission denied to view user's calendar"}
             )
-        return UserScheduledEventCalendar.objects.filter(
+        queryset = UserScheduledEventCalendar.objects.filter(
             user__user_id=user_id, is_free=False
         ).order_by("start_time")
+        return self.get_serializer_class().setup_eager_loading(queryset)
 
     def get(self, request, *args, **kwargs):
 
@@ -288,6 +399,14 @@ class UserCalendarDashboardView(
         return Response(data, status=status.HTTP_200_OK)
 
 
+@method_decorator(
+    conditional_get("task_queryset", "holiday_queryset", "employee_queryset"),
+    name="get",
+)
+@method_decorator(
+    replica_reads("task_queryset", "holiday_queryset", "employee_queryset"),
+    name="get",
+)
 class TeamCalendarDashboardView(
     generics.GenericAPIView, CalendarDashboardMixins
 ):
@@ -335,11 +454,11 @@ class TeamCalendarDashboardView(
             )
 
         return UserScheduledEventCalendar.objects.filter(
-            task__upline_initiative__corporate_level=corporate_level_obj,
-            task__upline_initiative__division=division_level_obj,
-            task__upline_initiative__group=group_level_obj,
-            task__upline_initiative__department=department_level_obj,
-            task__upline_initiative__unit=unit_level_obj,
+            corporate_level=corporate_level_obj,
+            division=division_level_obj,
+            group=group_level_obj,
+            department=department_level_obj,
+            unit=unit_level_obj,
             is_free=False,
         ).order_by("start_time")
 
@@ -362,3 +481,300 @@ class TeamCalendarDashboardView(
         )
         data = response_data(200, "Calendar dashboard details", detail)
         return Response(data, status=status.HTTP_200_OK)
+
+
+class FreeSlotsMixins:
+    """Mixins for free slot search"""
+
+    @classmethod
+    def retrieve_free_slots(cls, request, *args, **filters):
+        """
+        The next free slots of the requested duration within work hours
+        of the events selected with ``filters``
+        """
+        serialized_data = FreeSlotSearchSerializer(data=request.query_params)
+        serialized_data.is_valid(raise_exception=True)
+        duration = serialized_data.validated_data.get("duration")
+        count = serialized_data.validated_data.get("count")
+        date_after = serialized_data.validated_data.get("date_after")
+        date_before = serialized_data.validated_data.get("date_before")
+
+        tenant = connection.tenant
+        busy = load_busy_intervals(
+            *get_window(date_after, date_before, tenant), **filters
+        )
+        holidays = get_holidays(date_after, date_before)
+        work_periods = iter_work_periods(
+            date_after, date_before, tenant, holidays
+        )
+        slots = find_free_slots(
+            busy, duration, work_periods, count, not_before=timezone.now()
+        )
+        return FreeSlotSerializer(
+            [
+                {"start_time": start_time, "end_time": end_time}
+                for start_time, end_time in slots
+            ],
+            many=True,
+        ).data
+
+
+class UserFreeSlotsView(generics.GenericAPIView, FreeSlotsMixins):
+    """Next free slots of a user"""
+
+    serializer_class = FreeSlotSerializer
+    pagination_class = None
+    permission_classes = (IsAuthenticated,)
+    lookup_field = "user_id"
+
+    def get(self, request, *args, **kwargs):
+        user_id = self.kwargs.get(self.lookup_field)
+
+        try:
+            user = get_object_or_404(User, user_id=user_id)
+        except ValidationError:
+            raise Http404
+
+        if not has_access_to_user(user, self.request):
+            raise PermissionDenied(
+                {"user_id": "Permission denied to view user's calendar"}
+            )
+
+        slots = self.retrieve_free_slots(request, user=user)
+        data = response_data(200, "Free slots", slots)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class TeamFreeSlotsView(generics.GenericAPIView, FreeSlotsMixins):
+    """Next free slots every employee of a team shares"""
+
+    serializer_class = FreeSlotSerializer
+    pagination_class = None
+    permission_classes = (IsAuthenticated,)
+    lookup_field = "team_id"
+
+    def get(self, request, *args, **kwargs):
+        team_id = self.kwargs.get(self.lookup_field)
+
+        try:
+            (
+                corporate_level_obj,
+                division_level_obj,
+                group_level_obj,
+                department_level_obj,
+                unit_level_obj,
+            ) = process_level_by_uuid(team_id)
+        except ValidationError:
+            raise Http404
+
+        current_level = (
+            corporate_level_obj
+            or division_level_obj
+            or group_level_obj
+            or department_level_obj
+            or unit_level_obj
+        )
+
+        if not current_level:
+            raise Http404
+
+        if not has_access_to_team(current_level, self.request):
+            raise PermissionDenied(
+                {"team_id": "Permission denied to view team's calendar"}
+            )
+
+        slots = self.retrieve_free_slots(
+            request,
+            user__employee__corporate_level=corporate_level_obj,
+            user__employee__division=division_level_obj,
+            user__employee__group=group_level_obj,
+            user__employee__department=department_level_obj,
+            user__employee__unit=unit_level_obj,
+        )
+        data = response_data(200, "Free slots", slots)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def get_feed_url(request, kind: str, calendar_id) -> dict:
+    token = make_feed_token(request.user, kind, calendar_id)
+    return {
+        "url": request.build_absolute_uri(
+            reverse("emetric_calendar:calendar-feed", kwargs={"token": token})
+        )
+    }
+
+
+class UserCalendarFeedLinkView(generics.GenericAPIView):
+    """iCalendar feed url of a user's calendar"""
+
+    permission_classes = (IsAuthenticated,)
+    lookup_field = "user_id"
+
+    def get(self, request, *args, **kwargs):
+        user_id = self.kwargs.get(self.lookup_field)
+
+        try:
+            user = get_object_or_404(User, user_id=user_id)
+        except ValidationError:
+            raise Http404
+
+        if not has_access_to_user(user, self.request):
+            raise PermissionDenied(
+                {"user_id": "Permission denied to view user's calendar"}
+            )
+
+        data = response_data(
+            200, "Calendar feed url", get_feed_url(request, USER_FEED, user_id)
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class TeamCalendarFeedLinkView(generics.GenericAPIView):
+    """iCalendar feed url of a team's calendar"""
+
+    permission_classes = (IsAuthenticated,)
+    lookup_field = "team_id"
+
+    def get(self, request, *args, **kwargs):
+        team_id = self.kwargs.get(self.lookup_field)
+
+        try:
+            (
+                corporate_level_obj,
+                division_level_obj,
+                group_level_obj,
+                department_level_obj,
+                unit_level_obj,
+            ) = process_level_by_uuid(team_id)
+        except ValidationError:
+            raise Http404
+
+        current_level = (
+            corporate_level_obj
+            or division_level_obj
+            or group_level_obj
+            or department_level_obj
+            or unit_level_obj
+        )
+
+        if not current_level:
+            raise Http404
+
+        if not has_access_to_team(current_level, self.request):
+            raise PermissionDenied(
+                {"team_id": "Permission denied to view team's calendar"}
+            )
+
+        data = response_data(
+            200, "Calendar feed url", get_feed_url(request, TEAM_FEED, team_id)
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class CalendarFeedView(APIView):
+    """
+    iCalendar feed of a user's or team's calendar, calendar clients poll it
+    with the signed token of its url instead of credentials
+    """
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    # the querysets a feed is built from, see core.utils.change_versions
+    feed_querysets = {
+        USER_FEED: ("task_queryset",),
+        TEAM_FEED: ("task_queryset", "initiative_queryset"),
+    }
+
+    def get(self, request, token, *args, **kwargs):
+        try:
+            feed = read_feed_token(token)
+        except signing.BadSignature:
+            raise Http404
+
+        # the user the url was issued to must still have access, checked
+        # before answering from the ETag or the cache
+        user = User.objects.filter(pk=feed["user"]).first()
+        if not is_feed_user(feed, user):
+            raise Http404
+        request.user = user
+        name, queryset = self.get_feed(feed)
+
+        etag, last_modified = get_validators(
+            request, self.feed_querysets[feed["kind"]]
+        )
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        content_type = "text/calendar; charset=utf-8"
+        body = get_cached_feed(etag)
+        if body is not None:
+            response = HttpResponse(body, content_type=content_type)
+        else:
+            events = (
+                queryset.filter(
+                    is_free=False,
+                    start_time__gte=timezone.now()
+                    - timedelta(days=settings.ICAL_PAST_DAYS),
+                )
+                .order_by("start_time")
+                .values_list("task_id", "name", "start_time", "end_time")
+                .iterator(chunk_size=settings.ICAL_CHUNK_SIZE)
+            )
+            parts = iter_feed(
+                name,
+                events,
+                datetime.fromtimestamp(last_modified, tz=timezone.utc),
+                connection.schema_name,
+            )
+            response = StreamingHttpResponse(
+                cache_feed(etag, parts), content_type=content_type
+            )
+
+        set_validators(response, etag, last_modified)
+        return response
+
+    def get_feed(self, feed: dict):
+        """
+        The name and the events of ``feed``, 404 when its user cannot see
+        the calendar anymore
+        """
+        if feed["kind"] == USER_FEED:
+            user = get_object_or_404(User, user_id=feed["id"])
+            if not has_access_to_user(user, self.request):
+                raise Http404
+            return (
+                f"{user.first_name} {user.last_name}",
+                UserScheduledEventCalendar.objects.filter(user=user),
+            )
+
+        (
+            corporate_level_obj,
+            division_level_obj,
+            group_level_obj,
+            department_level_obj,
+            unit_level_obj,
+        ) = process_level_by_uuid(feed["id"])
+        current_level = (
+            corporate_level_obj
+            or division_level_obj
+            or group_level_obj
+            or department_level_obj
+            or unit_level_obj
+        )
+        if not current_level or not has_access_to_team(
+            current_level, self.request
+        ):
+            raise Http404
+
+        return (
+            current_level.name,
+            UserScheduledEventCalendar.objects.filter(
+                corporate_level=corporate_level_obj,
+                division=division_level_obj,
+                group=group_level_obj,
+                department=department_level_obj,
+                unit=unit_level_obj,
+            ),
+        )
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 
 
 class EmployeeConfig(AppConfig):
@@ -7,12 +7,31 @@ class EmployeeConfig(AppConfig):
     name = "employee"
 
     def ready(self):
+        from account.models import User
+        from designation.models import Designation
         from employee.models import Employee
+        from employee_profile.models import BasicInformation
         from employee.signals import (
+            SEARCH_LEVEL_FIELDS,
             post_save_employee_created_receiver,
+            pre_save_employee_claims_receiver,
             post_delete_employee_receiver,
+            pre_save_search_source_receiver,
+            refresh_search_document_receiver,
         )
 
         post_save.connect(post_save_employee_created_receiver, sender=Employee)
 
+        pre_save.connect(pre_save_employee_claims_receiver, sender=Employee)
+
         post_delete.connect(post_delete_employee_receiver, sender=Employee)
+
+        for sender in (
+            Employee,
+            User,
+            BasicInformation,
+            Designation,
+            *SEARCH_LEVEL_FIELDS,
+        ):
+            pre_save.connect(pre_save_search_source_receiver, sender=sender)
+            post_save.connect(refresh_search_document_receiver, sender=sender)
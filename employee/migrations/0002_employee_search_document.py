@@ -0,0 +1,95 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower, Replace
+from django_tenants.utils import get_public_schema_name
+
+from core.utils.search import add_trigram_index
+
+
+NAME_FIELDS = ("user__first_name", "user__last_name")
+CONTACT_FIELDS = ("user__email", "employee_basic_infomation__designation__name")
+LEVEL_FIELDS = (
+    "corporate_level__name",
+    "division__name",
+    "group__name",
+    "department__name",
+    "unit__name",
+)
+
+
+def build_search_documents(apps, schema_editor):
+    """
+    The search columns of every employee as employee.search builds them
+    when this migration was written, kept here so that later changes to
+    that module do not change this migration
+    """
+    if schema_editor.connection.schema_name == get_public_schema_name():
+        # employees only exist in tenant schemas
+        return
+
+    Employee = apps.get_model("employee", "Employee")
+    email = Replace(
+        Replace(F("user__email"), Value("@"), Value(" ")),
+        Value("."),
+        Value(" "),
+    )
+    document = (
+        SearchVector(*NAME_FIELDS, weight="A", config="simple")
+        + SearchVector(
+            email,
+            "employee_basic_infomation__designation__name",
+            weight="B",
+            config="simple",
+        )
+        + SearchVector(*LEVEL_FIELDS, weight="C", config="simple")
+    )
+    parts = []
+    for field in NAME_FIELDS + CONTACT_FIELDS + LEVEL_FIELDS:
+        parts.extend(
+            [
+                Coalesce(F(field), Value(""), output_field=TextField()),
+                Value(" ", output_field=TextField()),
+            ]
+        )
+    text = Lower(Concat(*parts[:-1]))
+
+    documents = Employee.objects.filter(pk=OuterRef("pk")).annotate(
+        document=document, text=text
+    )
+    Employee.objects.update(
+        search_document=Subquery(documents.values("document")[:1]),
+        search_text=Subquery(documents.values("text")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0001_initial'),
+        ('employee_profile', '0001_initial'),
+        ('designation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='employee_search_document'),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        add_trigram_index('employee_employee', 'search_text', 'employee_search_text_trgm'),
+    ]
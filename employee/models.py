@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from career_path.models import CareerPath
@@ -58,6 +60,9 @@ class Employee(Structure):
     career_path = models.ForeignKey(
         CareerPath, on_delete=models.SET_NULL, null=True, blank=True
     )
+    # maintained by employee.search, see refresh_search_documents
+    search_document = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default="", editable=False)
 
     def parent_name(self):
         return self.unit
@@ -67,6 +72,11 @@ class Employee(Structure):
 
     class Meta:
         ordering = ["user"]
+        indexes = [
+            GinIndex(
+                fields=["search_document"], name="employee_search_document"
+            ),
+        ]
 
     def is_available(self):
         """Returns True if the employee is available, False otherwise."""
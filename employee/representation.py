@@ -0,0 +1,173 @@
+"""
+Read path of ``EmployeeSerializer``. The nested serializers cost more to
+construct than the data they render, so an employee is turned into the
+same JSON as the nested serializers produce straight from the rows loaded
+by ``EmployeeSerializer.setup_eager_loading``, one joined query for the
+employees and one prefetch for the education details.
+"""
+from typing import Dict, Optional
+
+from django.core.exceptions import ObjectDoesNotExist
+
+
+DATE_FORMAT = "%d-%m-%Y"
+
+CONTACT_FIELDS = (
+    "personal_email",
+    "official_email",
+    "phone_number",
+    "address",
+    "guarantor_one_first_name",
+    "guarantor_one_last_name",
+    "guarantor_one_address",
+    "guarantor_one_occupation",
+    "guarantor_one_age",
+    "guarantor_one_id_card",
+    "guarantor_one_passport",
+    "guarantor_two_first_name",
+    "guarantor_two_last_name",
+    "guarantor_two_address",
+    "guarantor_two_occupation",
+    "guarantor_two_age",
+    "guarantor_two_id_card",
+    "guarantor_two_passport",
+)
+CONTACT_FILE_FIELDS = frozenset(
+    (
+        "guarantor_one_id_card",
+        "guarantor_one_passport",
+        "guarantor_two_id_card",
+        "guarantor_two_passport",
+    )
+)
+
+
+def get_related(instance, name: str):
+    """The reverse one to one ``name``, None when it does not exist"""
+    try:
+        return getattr(instance, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def uuid_data(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def date_data(value, date_format: str = None) -> Optional[str]:
+    if not value:
+        return None
+    return value.strftime(date_format) if date_format else value.isoformat()
+
+
+def file_data(value) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return value.url
+    except AttributeError:
+        return None
+
+
+def user_data(user) -> Optional[Dict]:
+    if user is None:
+        return None
+    return {
+        "user_id": uuid_data(user.user_id),
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "phone_number": user.phone_number,
+        "email": user.email,
+        "user_role": str(user.user_role) if user.user_role else None,
+    }
+
+
+def level_data(level) -> Optional[Dict]:
+    if level is None:
+        return None
+    return {
+        "name": level.name,
+        "organisation_short_name": level.organisation_short_name_id,
+        "uuid": uuid_data(level.uuid),
+        "slug": level.slug,
+    }
+
+
+def career_path_data(career_path) -> Optional[Dict]:
+    if career_path is None:
+        return None
+    return {
+        "level": career_path.level,
+        "career_path_id": uuid_data(career_path.career_path_id),
+        "name": career_path.name,
+    }
+
+
+def basic_information_data(basic_information) -> Dict:
+    designation = basic_information.designation
+    return {
+        "designation": (
+            {
+                "name": designation.name,
+                "designation_id": uuid_data(designation.designation_id),
+            }
+            if designation
+            else None
+        ),
+        "basic_information_id": uuid_data(
+            basic_information.basic_information_id
+        ),
+        "date_of_birth": date_data(
+            basic_information.date_of_birth, DATE_FORMAT
+        ),
+        "brief_description": basic_information.brief_description,
+        "education_details": [
+            {
+                "institution": education_detail.institution,
+                "year": education_detail.year,
+                "qualification": education_detail.qualification,
+            }
+            for education_detail in basic_information.education_details.all()
+        ],
+        "profile_picture": file_data(basic_information.profile_picture),
+    }
+
+
+def contact_information_data(contact_information) -> Dict:
+    data = {
+        "contact_information_id": uuid_data(
+            contact_information.contact_information_id
+        )
+    }
+    for field in CONTACT_FIELDS:
+        value = getattr(contact_information, field)
+        data[field] = (
+            file_data(value) if field in CONTACT_FILE_FIELDS else value
+        )
+    return data
+
+
+def employment_information_data(employment_information) -> Dict:
+    upline = employment_information.upline
+    return {
+        "employment_information_id": uuid_data(
+            employment_information.employment_information_id
+        ),
+        "date_employed": date_data(
+            employment_information.date_employed, DATE_FORMAT
+        ),
+        "upline": (
+            {
+                "user_id": uuid_data(upline.user_id),
+                "email": upline.email,
+                "first_name": upline.first_name,
+                "last_name": upline.last_name,
+            }
+            if upline
+            else None
+        ),
+        "date_of_last_promotion": date_data(
+            employment_information.date_of_last_promotion
+        ),
+        "status": employment_information.status,
+    }
@@ -0,0 +1,75 @@
+"""
+Search document of employees, the names, email, designation and
+organisation levels of an employee are kept in ``Employee.search_document``
+weighted by importance and in ``Employee.search_text`` for substring and
+trigram matches. The columns are refreshed with a single UPDATE whenever
+one of the rows they are built from changes.
+"""
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, QuerySet, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower, Replace
+from django_tenants.utils import get_public_schema_name
+
+
+NAME_FIELDS = ("user__first_name", "user__last_name")
+CONTACT_FIELDS = ("user__email", "employee_basic_infomation__designation__name")
+LEVEL_FIELDS = (
+    "corporate_level__name",
+    "division__name",
+    "group__name",
+    "department__name",
+    "unit__name",
+)
+
+
+def build_search_document():
+    # the parser keeps an address as one word, split it so that the
+    # prefixes of its parts match
+    email = Replace(
+        Replace(F("user__email"), Value("@"), Value(" ")),
+        Value("."),
+        Value(" "),
+    )
+    return (
+        SearchVector(*NAME_FIELDS, weight="A", config="simple")
+        + SearchVector(
+            email,
+            "employee_basic_infomation__designation__name",
+            weight="B",
+            config="simple",
+        )
+        + SearchVector(*LEVEL_FIELDS, weight="C", config="simple")
+    )
+
+
+def build_search_text():
+    parts = []
+    for field in NAME_FIELDS + CONTACT_FIELDS + LEVEL_FIELDS:
+        parts.extend(
+            [
+                Coalesce(F(field), Value(""), output_field=TextField()),
+                Value(" ", output_field=TextField()),
+            ]
+        )
+    return Lower(Concat(*parts[:-1]))
+
+
+def refresh_search_documents(employees: QuerySet) -> int:
+    """
+    Rebuilds the search columns of ``employees``, employee migration 0002
+    keeps its own copy of these expressions, change them here only
+    :return: the number of employees updated
+    """
+    if connection.schema_name == get_public_schema_name():
+        # employees only exist in tenant schemas
+        return 0
+    documents = employees.model._base_manager.filter(
+        pk=OuterRef("pk")
+    ).annotate(
+        document=build_search_document(), text=build_search_text()
+    )
+    return employees.update(
+        search_document=Subquery(documents.values("document")[:1]),
+        search_text=Subquery(documents.values("text")[:1]),
+    )
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from typing import List, Dict
 
 from django.contrib.auth import get_user_model
@@ -16,6 +17,7 @@ from core.serializers.nested import (
     NestedUnitLevelSerializer,
     NestedCareerPathSerializer,
 )
+from core.utils.bulk_slug_field import BulkSlugRelatedField
 from core.utils.bulk_upload import extract_key_message
 from core.utils.eager_loading import EagerLoadingMixin
 from core.utils.employee_data import employee_data_validation, get_upline_user
@@ -29,6 +31,16 @@ from core.utils.process_levels import (
 from core.utils.validators import validate_file_extension_for_xlsx
 from designation.models import Designation
 from employee.models import Employee
+from employee.representation import (
+    basic_information_data,
+    career_path_data,
+    contact_information_data,
+    employment_information_data,
+    get_related,
+    level_data,
+    user_data,
+    uuid_data,
+)
 from employee_profile.models import (
     EmploymentInformation,
     BasicInformation,
@@ -256,23 +268,18 @@ class EmployeeSerializer(serializers.ModelSerializer, EagerLoadingMixin):
     career_path = NestedCareerPathSerializer(many=False, required=False)
 
     select_related_fields = (
-        "user",
-        "organisation_short_name",
+        "user__user_role",
         "corporate_level",
         "department",
         "division",
         "group",
         "unit",
         "career_path",
-        "employee_basic_infomation",
+        "employee_basic_infomation__designation",
         "employee_contact_infomation",
-        "employee_employmentinformation",
+        "employee_employmentinformation__upline",
     )
     prefetch_related_fields = (
-        "employee_basic_infomation",
-        "employee_contact_infomation",
-        "employee_employmentinformation",
-        "employee_basic_infomation__designation",
         "employee_basic_infomation__education_details",
     )
 
@@ -303,22 +310,66 @@ class EmployeeSerializer(serializers.ModelSerializer, EagerLoadingMixin):
             "slug": {"read_only": True},
         }
 
+    def to_representation(self, instance: Employee):
+        """
+        Same output as the declared fields, built without constructing the
+        nested serializers for every employee
+        """
+        basic_information = get_related(instance, "employee_basic_infomation")
+        contact_information = get_related(
+            instance, "employee_contact_infomation"
+        )
+        employment_information = get_related(
+            instance, "employee_employmentinformation"
+        )
+        return OrderedDict(
+            (
+                ("user", user_data(instance.user)),
+                ("corporate_level", level_data(instance.corporate_level)),
+                ("department", level_data(instance.department)),
+                ("division", level_data(instance.division)),
+                ("group", level_data(instance.group)),
+                ("unit", level_data(instance.unit)),
+                (
+                    "employee_basic_information",
+                    basic_information_data(basic_information)
+                    if basic_information
+                    else self.get_employee_basic_information(instance),
+                ),
+                (
+                    "employee_contact_information",
+                    contact_information_data(contact_information)
+                    if contact_information
+                    else self.get_employee_contact_information(instance),
+                ),
+                (
+                    "employee_employment_information",
+                    employment_information_data(employment_information)
+                    if employment_information
+                    else self.get_employee_employment_information(instance),
+                ),
+                ("career_path", career_path_data(instance.career_path)),
+                ("uuid", uuid_data(instance.uuid)),
+                ("slug", instance.slug),
+            )
+        )
+
     def get_employee_designation(self, obj):
         return obj.employee_basic_infomation.designation.name
 
     def get_employee_basic_information(self, obj):
         return NestedBasicInformationSerializer(
-            obj.employee_basic_infomation, many=False
+            get_related(obj, "employee_basic_infomation"), many=False
         ).data
 
     def get_employee_contact_information(self, obj):
         return NestedContactInformationSerializer(
-            obj.employee_contact_infomation, many=False
+            get_related(obj, "employee_contact_infomation"), many=False
         ).data
 
     def get_employee_employment_information(self, obj):
         return NestedEmploymentInformationSerializer(
-            obj.employee_employmentinformation, many=False
+            get_related(obj, "employee_employmentinformation"), many=False
         ).data
 
     def create(self, validated_data):
@@ -854,7 +905,7 @@ class EmployeeImportSerializer(serializers.Serializer):
 
 
 class MultipleEmployeeSerializer(serializers.Serializer):
-    employee = serializers.SlugRelatedField(
+    employee = BulkSlugRelatedField(
         slug_field="uuid",
         queryset=Employee.objects.all(),
         required=True,
@@ -1,11 +1,53 @@
 from typing import Dict
-from django.core.cache import cache
 
-from account.models import EmailInvitation
+from core.utils.authentication import (
+    get_changed_claims,
+    revoke_tokens_on_commit,
+)
+from core.utils.bulk_delete import get_delete_cleanup
+from core.utils.change_versions import invalidate
+from core.utils.generate_token import EMPLOYEE_CLAIM_FIELDS
+from account.models import EmailInvitation, User
+from designation.models import Designation
 from employee.models import Employee
+from employee.search import refresh_search_documents
+from employee_profile.models import BasicInformation
+from organization.models import (
+    Unit,
+    Department,
+    Group,
+    Division,
+    CorporateLevel,
+)
 from django.db import transaction
 
 
+SEARCH_LEVEL_FIELDS = {
+    Unit: "unit",
+    Department: "department",
+    Group: "group",
+    Division: "division",
+    CorporateLevel: "corporate_level",
+}
+
+# fields of the saved rows the employee search document is built from, see
+# employee.search
+SEARCH_SOURCE_FIELDS = {
+    Employee: (
+        "user_id",
+        "corporate_level_id",
+        "division_id",
+        "group_id",
+        "department_id",
+        "unit_id",
+    ),
+    User: ("first_name", "last_name", "email"),
+    BasicInformation: ("designation_id",),
+    Designation: ("name",),
+    **{level: ("name",) for level in SEARCH_LEVEL_FIELDS},
+}
+
+
 def post_save_employee_created_receiver(
     sender, instance: Employee, created, **kwargs: Dict
 ):
@@ -32,10 +74,73 @@ def post_save_employee_created_receiver(
             transaction.on_commit(
                 lambda: email_activation_obj.send_invitation()
             )
-        cache.delete("employee_queryset")
+        invalidate("employee_queryset")
+
+
+def pre_save_employee_claims_receiver(
+    sender, instance: Employee, **kwargs: Dict
+):
+    """Revoke the tokens of the user when the employee claims change"""
+    stored = get_changed_claims(
+        instance,
+        ("user_id", *EMPLOYEE_CLAIM_FIELDS),
+        kwargs.get("update_fields"),
+    )
+    if stored:
+        revoke_tokens_on_commit(stored["user_id"], instance.user_id)
 
 
 def post_delete_employee_receiver(sender, instance: Employee, **kwargs: Dict):
     """Delete all connected elements"""
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        cleanup.delete_later(User, instance.user_id)
+        cleanup.invalidate("employee_queryset")
+        return
+
     instance.user.delete()
-    cache.delete("employee_queryset")
+    invalidate("employee_queryset")
+
+
+def pre_save_search_source_receiver(sender, instance, **kwargs: Dict):
+    """Remember whether the save changes the search document of employees"""
+    if instance._state.adding or instance.pk is None:
+        # nobody is attached to a new designation or level yet
+        instance._search_changed = sender in (Employee, User, BasicInformation)
+    else:
+        # e.g the last_login update on login is skipped without a query
+        instance._search_changed = (
+            get_changed_claims(
+                instance,
+                SEARCH_SOURCE_FIELDS[sender],
+                kwargs.get("update_fields"),
+            )
+            is not None
+        )
+
+
+def refresh_search_document_receiver(
+    sender, instance, created, **kwargs: Dict
+):
+    """
+    Rebuild the search document of the employees built from the saved row
+    """
+    if not getattr(instance, "_search_changed", True):
+        return
+    instance._search_changed = False
+    if sender is Employee:
+        employees = Employee.objects.filter(pk=instance.pk)
+    elif sender is User:
+        employees = Employee.objects.filter(user=instance)
+    elif sender is BasicInformation:
+        employees = Employee.objects.filter(uuid=instance.employee_id)
+    elif sender is Designation:
+        employees = Employee.objects.filter(
+            employee_basic_infomation__designation=instance
+        )
+    else:
+        # organisation levels
+        employees = Employee.objects.filter(
+            **{SEARCH_LEVEL_FIELDS[sender]: instance}
+        )
+    refresh_search_documents(employees)
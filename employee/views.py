@@ -10,7 +10,9 @@ from client.models import Client
 
 from core.utils import CustomPagination, response_data, NestedMultipartParser
 from employee.resources import EmployeeResource
+from core.utils.bulk_delete import bulk_delete
 from core.utils.mixins import ExportMixin
+from mailing.services.dispatcher import MailDispatcher
 from employee.models import Employee
 from employee.serializers import (
     EmployeeSerializer,
@@ -24,6 +26,7 @@ from core.utils.permissions import (
     IsAdminOrHRAdminOrReadOnly,
     IsAdminOrHRAdminOrEmployeeOrReadOnly,
 )
+from core.utils.search import DocumentSearchFilter
 
 
 class EmployeeFilter(FilterSet):
@@ -66,9 +69,11 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
     parser_classes = (NestedMultipartParser, JSONParser)
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        DocumentSearchFilter,
     ]
+    search_document = "search_document"
+    search_text = "search_text"
     search_fields = (
         "user__email",
         "user__first_name",
@@ -80,6 +85,8 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         "department__name",
         "unit__name",
     )
+    # every search field is in the document, see employee.search
+    search_document_fields = search_fields
     ordering_fields = (
         "updated_at",
         "user__first_name",
@@ -87,6 +94,7 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         "employee_basic_infomation__designation__name",
     )
     ordering = ("-updated_at",)
+    cursor_ordering = ("-updated_at", "id")
     filterset_class = EmployeeFilter
 
     def list(self, request, *args, **kwargs):
@@ -129,7 +137,9 @@ class EmployeeImportView(generics.CreateAPIView):
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        # invitations for every imported employee go out as one batch
+        with MailDispatcher.batch():
+            serializer.is_valid(raise_exception=True)
         data = response_data(
             201, "Employees added from excel sheet successfully", []
         )
@@ -244,8 +254,9 @@ class MultipleEmployeeDeleteView(generics.GenericAPIView):
 
     def perform_multiple_delete(self, serializer):
         employees = serializer.validated_data["employee"]
-        for employee in employees:
-            employee.delete()
+        bulk_delete(
+            Employee.objects.filter(pk__in=[obj.pk for obj in employees])
+        )
 
 
 class EmployeeExportView(ExportMixin, generics.GenericAPIView):
@@ -1,5 +1,4 @@
-from django.core.cache import cache
-
+from core.utils.change_versions import invalidate
 from employee_file.models import EmployeeFile
 
 
@@ -7,7 +6,7 @@ def post_save_employee_file_receiver(
     sender, instance: EmployeeFile, created, **kwargs
 ):
     """Signal for EmployeeFile post save"""
-    cache.delete("employee_file_queryset")
+    invalidate("employee_file_queryset")
 
 
 def post_delete_employee_file_receiver(
@@ -15,4 +14,4 @@ def post_delete_employee_file_receiver(
 ):
     """Delete all connected elements"""
 
-    cache.delete("employee_file_queryset")
+    invalidate("employee_file_queryset")
@@ -0,0 +1,65 @@
+"""
+command for the application to measure mail dispatch throughput
+"""
+import time
+
+from django.core.management import BaseCommand
+from django.test.utils import override_settings
+
+from mailing.services.dispatcher import MailDispatcher
+
+
+class Command(BaseCommand):
+    """
+    Django command to send generated emails through the mail dispatcher
+    and report the throughput, use a local backend to benchmark offline
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000)
+        parser.add_argument(
+            "--backend",
+            type=str,
+            default="mailing.services.local.InMemoryMailing",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=0,
+            help="messages per second, 0 disables rate limiting",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        messages = [
+            {
+                "kind": "benchmark",
+                "sender": {"email": "support@emetricsuite.com", "name": "Support"},
+                "to": [{"email": f"employee{index}@example.com"}],
+                "subject": f"Hi! employee {index} benchmark email",
+                "html_content": "<p>benchmark email</p>",
+                "reply_to": None,
+            }
+            for index in range(count)
+        ]
+
+        overrides = {
+            "MAIL_BACKEND": options["backend"],
+            "MAIL_RATE_LIMIT": options["rate_limit"],
+        }
+        if options["batch_size"]:
+            overrides["MAIL_BATCH_SIZE"] = options["batch_size"]
+
+        with override_settings(**overrides):
+            MailDispatcher._bucket = None
+            started = time.perf_counter()
+            undelivered = MailDispatcher.send(messages)
+            elapsed = time.perf_counter() - started
+            MailDispatcher._bucket = None
+
+        self.stdout.write(
+            f"sent {count - len(undelivered)} of {count} emails with "
+            f"{options['backend']} in {elapsed:.3f}s "
+            f"({count / elapsed if elapsed else 0:.1f} emails/s)"
+        )
@@ -0,0 +1,164 @@
+"""
+Mail dispatch module, every outgoing email goes through the dispatcher
+which batches, rate limits and retries messages on the configured backend
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Type
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from mailing.services.mailing import Mailing
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter, ``rate`` tokens are added every second up to
+    ``capacity``. The bucket lives in the worker process, so the effective
+    rate of the deployment is ``rate`` times the number of mail workers.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, tokens: int = 1) -> float:
+        """
+        Takes tokens from the bucket, sleeping until enough are available.
+        Requests larger than the bucket wait for a full bucket and leave it
+        in debt, which later requests pay back.
+        :return: the number of seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated_at) * self.rate,
+                )
+                self.updated_at = now
+                required = min(tokens, self.capacity)
+                if self.tokens >= required:
+                    self.tokens -= tokens
+                    return waited
+                delay = (required - self.tokens) / self.rate
+                time.sleep(delay)
+                waited += delay
+
+
+class MailDispatcher:
+    """Sends messages in batches through the configured mailing backend"""
+
+    _bucket: TokenBucket = None
+    _local = threading.local()
+
+    @classmethod
+    def get_backend(cls) -> Type[Mailing]:
+        return import_string(settings.MAIL_BACKEND)
+
+    @classmethod
+    def get_bucket(cls) -> TokenBucket:
+        if cls._bucket is None:
+            cls._bucket = TokenBucket(
+                rate=settings.MAIL_RATE_LIMIT,
+                capacity=settings.MAIL_RATE_LIMIT_BURST,
+            )
+        return cls._bucket
+
+    @classmethod
+    def send(cls, messages: List[Dict]) -> List[Dict]:
+        """
+        Sends the messages in chunks of ``MAIL_BATCH_SIZE``, retrying
+        retryable failures with exponential backoff.
+        :return: the messages that could not be delivered
+        """
+        backend = cls.get_backend()
+        bucket = cls.get_bucket()
+        batch_size = settings.MAIL_BATCH_SIZE
+        undelivered = []
+
+        for index in range(0, len(messages), batch_size):
+            pending = messages[index : index + batch_size]
+
+            for attempt in range(settings.MAIL_MAX_RETRIES + 1):
+                bucket.consume(len(pending))
+                failed = backend.send_batch(pending)
+
+                undelivered.extend(
+                    message for message in failed if not message["retryable"]
+                )
+                pending = [
+                    {
+                        key: value
+                        for key, value in message.items()
+                        if key not in ("error", "retryable", "rejected")
+                    }
+                    for message in failed
+                    if message["retryable"]
+                ]
+                if not pending:
+                    break
+                if attempt < settings.MAIL_MAX_RETRIES:
+                    time.sleep(settings.MAIL_RETRY_BACKOFF * 2 ** attempt)
+            else:
+                undelivered.extend(
+                    {
+                        **message,
+                        "error": "retries exhausted",
+                        "retryable": True,
+                        "rejected": False,
+                    }
+                    for message in pending
+                )
+
+        return undelivered
+
+    @classmethod
+    def queue(cls, message: Dict):
+        """
+        Queues a message for delivery. Inside a ``batch`` block the message
+        is held back and sent with the rest of the batch, otherwise it is
+        handed to a worker right away.
+        """
+        buffer = getattr(cls._local, "buffer", None)
+        if buffer is not None:
+            buffer.append(message)
+            return None
+
+        from mailing.tasks.send_bulk_email_task import send_bulk_email
+
+        return send_bulk_email.delay([message])
+
+    @classmethod
+    @contextmanager
+    def batch(cls):
+        """
+        Collects every message queued inside the block and hands them to
+        workers in ``MAIL_BATCH_SIZE`` chunks when the block exits, e.g
+        one task per chunk for a bulk employee import instead of one per
+        employee. Nested blocks join the outermost batch.
+        """
+        if getattr(cls._local, "buffer", None) is not None:
+            yield
+            return
+
+        cls._local.buffer = []
+        try:
+            yield
+        finally:
+            messages, cls._local.buffer = cls._local.buffer, None
+            if messages:
+                from mailing.tasks.send_bulk_email_task import send_bulk_email
+
+                batch_size = settings.MAIL_BATCH_SIZE
+                for index in range(0, len(messages), batch_size):
+                    send_bulk_email.delay(messages[index : index + batch_size])
@@ -0,0 +1,90 @@
+"""
+Local mailing backends, they never leave the machine and are meant for
+development and for benchmarking mail throughput offline
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from django.conf import settings
+from django.utils import timezone
+
+from mailing.services.mailing import Mailing, render_params
+
+
+def rendered(message: Dict) -> Dict:
+    """The message as its recipient receives it"""
+    return {
+        **message,
+        "html_content": render_params(
+            message["html_content"], message.get("params")
+        ),
+    }
+
+
+class InMemoryMailing(Mailing):
+    """Keeps every sent message in the ``outbox`` list of the process"""
+
+    outbox: List[Dict] = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def send_email(cls, sender, to, subject, html_content, reply_to=None):
+        with cls._lock:
+            cls.outbox.append(
+                {
+                    "sender": sender,
+                    "to": to,
+                    "subject": subject,
+                    "html_content": html_content,
+                    "reply_to": reply_to,
+                }
+            )
+
+    @classmethod
+    def send_batch(cls, messages: List[Dict]) -> List[Dict]:
+        with cls._lock:
+            cls.outbox.extend(rendered(message) for message in messages)
+        return []
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls.outbox = []
+
+
+class FileMailing(Mailing):
+    """
+    Appends every sent message as a json line to ``MAIL_FILE_PATH``, one
+    file write per batch
+    """
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def send_email(cls, sender, to, subject, html_content, reply_to=None):
+        cls.send_batch(
+            [
+                {
+                    "sender": sender,
+                    "to": to,
+                    "subject": subject,
+                    "html_content": html_content,
+                    "reply_to": reply_to,
+                }
+            ]
+        )
+
+    @classmethod
+    def send_batch(cls, messages: List[Dict]) -> List[Dict]:
+        path = Path(settings.MAIL_FILE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sent_at = timezone.now().isoformat()
+        lines = "".join(
+            json.dumps({**rendered(message), "sent_at": sent_at}) + "\n"
+            for message in messages
+        )
+        with cls._lock, open(path, "a") as mail_file:
+            mail_file.write(lines)
+        return []
@@ -1,18 +1,59 @@
 """
 Mailing base module
 """
+import re
 from abc import ABCMeta, abstractmethod
+from typing import Dict, List
 
+from django.utils.html import escape
 from requests import Response
 
 
+# sendinblue fills ``{{ params.name }}`` in with the ``params`` of every
+# message version, so that recipients of the same email share one body
+PARAM_PATTERN = re.compile(r"\{\{\s*params\.(\w+)\s*\}\}")
+
+
+def param(name: str) -> str:
+    """Placeholder of the per recipient value ``name`` in a template"""
+    return "{{ params.%s }}" % name
+
+
+def render_params(html_content: str, params: Dict = None) -> str:
+    """
+    Fills the ``params`` placeholders of a message in, for backends that
+    do not render them themselves
+    """
+    if not params:
+        return html_content
+    return PARAM_PATTERN.sub(
+        lambda match: escape(params.get(match.group(1), "")), html_content
+    )
+
+
 class MailException(Exception):
     """
     Mail Exception class
     """
 
-    def __init__(self, message: str):
+    def __init__(
+        self, message: str, retryable: bool = False, rejected: bool = False
+    ):
         super(MailException, self).__init__(message)
+        self.retryable = retryable
+        # the service refused the recipients of this message for good,
+        # e.g an invalid address, and would refuse them again
+        self.rejected = rejected
+
+
+def failure(message: Dict, exception: MailException) -> Dict:
+    """``message`` as returned by ``send_batch`` when it was not sent"""
+    return {
+        **message,
+        "error": str(exception),
+        "retryable": exception.retryable,
+        "rejected": exception.rejected,
+    }
 
 
 class Mailing(metaclass=ABCMeta):
@@ -28,4 +69,28 @@ class Mailing(metaclass=ABCMeta):
         :return:
         """
 
-    pass
+    @classmethod
+    def send_batch(cls, messages: List[Dict]) -> List[Dict]:
+        """
+        Send a batch of messages, each a dict holding the ``send_email``
+        keyword arguments and the ``params`` of its placeholders. Backends
+        with a bulk endpoint override this, the default sends the messages
+        one after the other.
+        :return: the messages that were not sent, each carrying an
+            ``error``, a ``retryable`` and a ``rejected`` key
+        """
+        failed = []
+        for message in messages:
+            try:
+                cls.send_email(
+                    sender=message["sender"],
+                    to=message["to"],
+                    subject=message["subject"],
+                    html_content=render_params(
+                        message["html_content"], message.get("params")
+                    ),
+                    reply_to=message.get("reply_to"),
+                )
+            except MailException as _:
+                failed.append(failure(message, _))
+        return failed
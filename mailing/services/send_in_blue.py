@@ -1,16 +1,55 @@
 from __future__ import print_function
+import json
+import os
+from typing import Dict, List
+
 import sib_api_v3_sdk
 from django.conf import settings
 from sib_api_v3_sdk.rest import ApiException
-from pprint import pprint
+from urllib3.exceptions import HTTPError
+
+from mailing.services.mailing import Mailing, MailException, failure
+
+
+# sendinblue accepts at most 1000 message versions per request
+MESSAGE_VERSIONS_LIMIT = 1000
+
+
+def is_retryable(exception: ApiException) -> bool:
+    """Rate limited, server side and connection errors are worth a retry"""
+    return exception.status in (0, None, 429) or exception.status >= 500
+
 
-from mailing.services.mailing import Mailing, MailException
+def is_rejection(exception: ApiException) -> bool:
+    """
+    A bad request, e.g an invalid address. Only meaningful for a message
+    sent on its own, a batch fails as a whole for one bad recipient.
+    """
+    return exception.status == 400
 
 
 class SendInBlue(Mailing):
     apiKey = settings.SENDINBLUE_API_KEY
     configuration = sib_api_v3_sdk.Configuration()
     configuration.api_key["api-key"] = apiKey
+    configuration.connection_pool_maxsize = settings.MAIL_CONNECTION_POOL_SIZE
+
+    _api_instance = None
+    _api_instance_pid = None
+
+    @classmethod
+    def get_api_instance(cls) -> sib_api_v3_sdk.TransactionalEmailsApi:
+        """
+        Returns the long lived api client of the current worker process.
+        The client keeps its connections alive between messages, it is
+        rebuilt after a fork so that processes never share sockets.
+        """
+        if cls._api_instance is None or cls._api_instance_pid != os.getpid():
+            cls._api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
+                sib_api_v3_sdk.ApiClient(cls.configuration)
+            )
+            cls._api_instance_pid = os.getpid()
+        return cls._api_instance
 
     @classmethod
     def send_email(cls, sender, to, subject, html_content, reply_to=None):
@@ -18,12 +57,6 @@ class SendInBlue(Mailing):
         This function takes the details of the email to be sent,
         and sends it using the sendinblue API.
         """
-        if reply_to is not None:
-            reply_to = reply_to
-
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
-            sib_api_v3_sdk.ApiClient(cls.configuration)
-        )
         # SendSmtpEmail | Values to send a transactional email
         send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
             sender=sender,
@@ -32,12 +65,101 @@ class SendInBlue(Mailing):
             subject=subject,
             html_content=html_content,
         )
+        return cls.__send(send_smtp_email, single=True)
+
+    @classmethod
+    def send_batch(cls, messages: List[Dict]) -> List[Dict]:
+        """
+        Sends messages sharing the same sender and content in a single
+        request as message versions, each version keeping its own
+        recipients, subject and ``params``. Invitations and confirmations
+        carry their per recipient values as params, so the emails of a
+        bulk import share one content.
+        """
+        groups: Dict[str, List[Dict]] = {}
+        for message in messages:
+            key = json.dumps(
+                [
+                    message["sender"],
+                    message.get("reply_to"),
+                    message["html_content"],
+                ],
+                sort_keys=True,
+            )
+            groups.setdefault(key, []).append(message)
+
+        failed = []
+        for group in groups.values():
+            for index in range(0, len(group), MESSAGE_VERSIONS_LIMIT):
+                chunk = group[index : index + MESSAGE_VERSIONS_LIMIT]
+                if len(chunk) == 1:
+                    failed.extend(cls.__send_messages(chunk))
+                    continue
 
+                first = chunk[0]
+                send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+                    sender=first["sender"],
+                    reply_to=first.get("reply_to"),
+                    subject=first["subject"],
+                    html_content=first["html_content"],
+                    message_versions=[
+                        sib_api_v3_sdk.SendSmtpEmailMessageVersions(
+                            to=message["to"],
+                            subject=message["subject"],
+                            params=message.get("params") or None,
+                        )
+                        for message in chunk
+                    ],
+                )
+                try:
+                    cls.__send(send_smtp_email)
+                except MailException as _:
+                    if _.retryable:
+                        # the dispatcher retries the chunk as it is
+                        failed.extend(failure(message, _) for message in chunk)
+                    else:
+                        # one bad recipient fails the whole request, the
+                        # messages are sent one by one to isolate it
+                        failed.extend(cls.__send_messages(chunk))
+        return failed
+
+    @classmethod
+    def __send_messages(cls, messages: List[Dict]) -> List[Dict]:
+        """Sends ``messages`` a request each, returns the failed ones"""
+        failed = []
+        for message in messages:
+            try:
+                cls.__send(
+                    sib_api_v3_sdk.SendSmtpEmail(
+                        sender=message["sender"],
+                        to=message["to"],
+                        reply_to=message.get("reply_to"),
+                        subject=message["subject"],
+                        html_content=message["html_content"],
+                        params=message.get("params") or None,
+                    ),
+                    single=True,
+                )
+            except MailException as _:
+                failed.append(failure(message, _))
+        return failed
+
+    @classmethod
+    def __send(
+        cls, send_smtp_email: sib_api_v3_sdk.SendSmtpEmail, single=False
+    ):
         try:
             # Send a transactional email
-            api_response = api_instance.send_transac_email(send_smtp_email)
-            pprint(api_response)
+            return cls.get_api_instance().send_transac_email(send_smtp_email)
         except ApiException as e:
             raise MailException(
-                "Exception when calling SMTPApi->send_transac_email: %s\n" % e
+                "Exception when calling SMTPApi->send_transac_email: %s\n" % e,
+                retryable=is_retryable(e),
+                rejected=single and is_rejection(e),
+            )
+        except HTTPError as e:
+            raise MailException(
+                "Connection error when calling SMTPApi->send_transac_email: %s\n"
+                % e,
+                retryable=True,
             )
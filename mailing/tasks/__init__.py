@@ -1,3 +1,4 @@
+from .send_bulk_email_task import *
 from .send_invitation_email_task import *
 from .send_confirmation_email_task import *
 from .send_forgot_password_email_task import *
@@ -0,0 +1,52 @@
+from typing import Dict, List
+
+from e_metric_api.celery import app
+
+from mailing.services.dispatcher import MailDispatcher
+
+
+INVITATION = "invitation"
+CONFIRMATION = "confirmation"
+PASSWORD_RESET = "password_reset"
+
+
+def remove_unreachable_users(recipient_email: List[Dict]):
+    """
+    Deletes the users and invitations of recipients the mail service
+    rejected, so that they can be invited again. Messages that failed for
+    any other reason, e.g retries exhausted, keep their users.
+    """
+    from account.models import User
+    from account.models.email_invitation import EmailInvitation
+
+    emails = [recipient["email"] for recipient in recipient_email]
+    print(f"deleting user with email: {emails}")
+    EmailInvitation.objects.filter(email__in=emails).delete()
+    User.objects.filter(email__in=emails).delete()
+    print(f"deleted user with email: {emails}")
+
+
+@app.task()
+def send_bulk_email(messages: List[Dict]):
+    """
+    A function that sends a batch of emails through the mail dispatcher
+    Args:
+        messages: the messages to send, each a dict with kind, sender, to,
+            subject, html_content and reply_to
+    Returns:
+
+    """
+    undelivered = MailDispatcher.send(messages)
+
+    unreachable = []
+    for message in undelivered:
+        print(message["error"])
+        if message["rejected"] and message.get("kind") in (
+            INVITATION,
+            CONFIRMATION,
+        ):
+            unreachable.extend(message["to"])
+    if unreachable:
+        remove_unreachable_users(unreachable)
+
+    return f"{len(messages) - len(undelivered)} of {len(messages)} emails sent"
@@ -1,11 +1,30 @@
 from e_metric_api.celery import app
 
-from mailing.services.mailing import MailException
-from mailing.services.send_in_blue import SendInBlue
+from mailing.services.dispatcher import MailDispatcher
+from mailing.tasks.send_bulk_email_task import (
+    CONFIRMATION,
+    remove_unreachable_users,
+)
+
+
+def build_confirmation_email(sender: dict, content: str, first_name: str, last_name: str, recipient_email: list, params: dict = None) -> dict:
+    """
+    Builds a confirmation email message for the mail dispatcher, ``params``
+    fill the per recipient placeholders of ``content`` in
+    """
+    return {
+        "kind": CONFIRMATION,
+        "sender": sender,
+        "to": recipient_email,
+        "subject": f"Hi! {first_name} {last_name} Email Confirmation from E-MetricSuite",
+        "html_content": content,
+        "params": params or {},
+        "reply_to": None,
+    }
 
 
 @app.task()
-def send_confirmation_email(sender: dict, content: str, first_name: str, last_name: str, recipient_email: list):
+def send_confirmation_email(sender: dict, content: str, first_name: str, last_name: str, recipient_email: list, params: dict = None):
     """
     A function that sends a confirmation email
     Args:
@@ -14,17 +33,12 @@ def send_confirmation_email(sender: dict, content: str, first_name: str, last_na
         content:
         last_name:
         recipient_email:
+        params: the values of the placeholders of content
     Returns:
 
     """
-    subject = f"Hi! {first_name} {last_name} Email Confirmation from E-MetricSuite"
-    try:
-        SendInBlue.send_email(sender=sender, to=recipient_email, subject=subject, html_content=content)
-    except MailException as _:
-        print(_)
-        from account.models import User
-        from account.models.email_invitation import EmailInvitation
-        print(f"deleting user with email: {recipient_email}")
-        EmailInvitation.objects.filter(email=recipient_email).delete()
-        User.objects.filter(email=recipient_email).delete()
-        print(f"deleted user with email: {recipient_email}")
+    message = build_confirmation_email(sender, content, first_name, last_name, recipient_email, params)
+    for undelivered in MailDispatcher.send([message]):
+        print(undelivered["error"])
+        if undelivered["rejected"]:
+            remove_unreachable_users(recipient_email)
@@ -1,7 +1,21 @@
 from e_metric_api.celery import app
 
-from mailing.services.mailing import MailException
-from mailing.services.send_in_blue import SendInBlue
+from mailing.services.dispatcher import MailDispatcher
+from mailing.tasks.send_bulk_email_task import PASSWORD_RESET
+
+
+def build_password_reset_email(sender: dict, content: str, first_name: str, recipient_email: list) -> dict:
+    """
+    Builds a password reset email message for the mail dispatcher
+    """
+    return {
+        "kind": PASSWORD_RESET,
+        "sender": sender,
+        "to": recipient_email,
+        "subject": f"Hi! {first_name} Password Reset Email from E-MetricSuite",
+        "html_content": content,
+        "reply_to": None,
+    }
 
 
 @app.task()
@@ -16,8 +30,6 @@ def send_password_reset_email(sender: dict, content: str, first_name: str, recip
     Returns:
 
     """
-    subject = f"Hi! {first_name} Password Reset Email from E-MetricSuite"
-    try:
-        SendInBlue.send_email(sender=sender, to=recipient_email, subject=subject, html_content=content)
-    except MailException as _:
-        print(_)
+    message = build_password_reset_email(sender, content, first_name, recipient_email)
+    for undelivered in MailDispatcher.send([message]):
+        print(undelivered["error"])
@@ -1,3 +1,190 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+from sib_api_v3_sdk.rest import ApiException
+
+from mailing.services.dispatcher import MailDispatcher, TokenBucket
+from mailing.services.local import InMemoryMailing
+from mailing.services.mailing import param, render_params
+from mailing.services.send_in_blue import SendInBlue
+from mailing.tasks.send_bulk_email_task import send_bulk_email
+
+
+def invitation(email: str, first_name: str) -> dict:
+    return {
+        "kind": "invitation",
+        "sender": {"email": "support@emetricsuite.com", "name": "Support"},
+        "to": [{"email": email}],
+        "subject": f"Hi! {first_name} Email Invitation from E-MetricSuite",
+        "html_content": f"<h3>Hi, {param('first_name')}</h3>"
+        f'<a href="{param("setup_path")}">Setup Account</a>',
+        "params": {
+            "first_name": first_name,
+            "setup_path": f"https://emetric.test/verify/?key={first_name}&org=acme",
+        },
+        "reply_to": None,
+    }
+
+
+class RenderParamsTests(SimpleTestCase):
+    def test_placeholders_are_filled_in_and_escaped(self):
+        self.assertEqual(
+            render_params(
+                "<p>{{ params.name }} {{params.link}}</p>",
+                {"name": "<ada>", "link": "a?b=1&c=2"},
+            ),
+            "<p>&lt;ada&gt; a?b=1&amp;c=2</p>",
+        )
+
+    def test_content_without_params_is_unchanged(self):
+        self.assertEqual(render_params("<p>hi</p>", None), "<p>hi</p>")
+
+    def test_local_backends_keep_the_rendered_content(self):
+        InMemoryMailing.clear()
+        InMemoryMailing.send_batch([invitation("ada@acme.test", "ada")])
+
+        self.assertEqual(
+            InMemoryMailing.outbox[0]["html_content"],
+            '<h3>Hi, ada</h3><a href="https://emetric.test/verify/'
+            '?key=ada&amp;org=acme">Setup Account</a>',
+        )
+
+
+class SendInBlueBatchTests(SimpleTestCase):
+    def test_invitations_share_one_request_with_their_params(self):
+        messages = [
+            invitation("ada@acme.test", "ada"),
+            invitation("bola@acme.test", "bola"),
+        ]
+        api = mock.Mock()
+
+        with mock.patch.object(
+            SendInBlue, "get_api_instance", return_value=api
+        ):
+            failed = SendInBlue.send_batch(messages)
+
+        self.assertEqual(failed, [])
+        api.send_transac_email.assert_called_once()
+        email = api.send_transac_email.call_args[0][0]
+        self.assertEqual(email.html_content, messages[0]["html_content"])
+        self.assertEqual(
+            [
+                (version.to, version.params)
+                for version in email.message_versions
+            ],
+            [(message["to"], message["params"]) for message in messages],
+        )
+
+    def test_a_bad_address_is_isolated_from_its_batch(self):
+        messages = [
+            invitation(f"{name}@acme.test", name)
+            for name in ("ada", "bola", "bad", "chidi")
+        ]
+        sent = []
+
+        def send_transac_email(email):
+            # one bad recipient fails the whole request
+            recipients = [
+                recipient["email"]
+                for version in email.message_versions or [email]
+                for recipient in version.to
+            ]
+            if "bad@acme.test" in recipients:
+                raise ApiException(status=400, reason="invalid email")
+            sent.extend(recipients)
+
+        api = mock.Mock(
+            **{"send_transac_email.side_effect": send_transac_email}
+        )
+        with mock.patch.object(
+            SendInBlue, "get_api_instance", return_value=api
+        ):
+            failed = SendInBlue.send_batch(messages)
+
+        self.assertEqual(
+            sent, ["ada@acme.test", "bola@acme.test", "chidi@acme.test"]
+        )
+        self.assertEqual(
+            [message["to"] for message in failed], [messages[2]["to"]]
+        )
+        self.assertTrue(failed[0]["rejected"])
+        self.assertFalse(failed[0]["retryable"])
+
+    def test_a_server_error_fails_the_batch_without_rejecting_it(self):
+        messages = [
+            invitation("ada@acme.test", "ada"),
+            invitation("bola@acme.test", "bola"),
+        ]
+        api = mock.Mock(
+            **{
+                "send_transac_email.side_effect": ApiException(
+                    status=502, reason="bad gateway"
+                )
+            }
+        )
+
+        with mock.patch.object(
+            SendInBlue, "get_api_instance", return_value=api
+        ):
+            failed = SendInBlue.send_batch(messages)
+
+        # left to the retries of the dispatcher, as one request
+        api.send_transac_email.assert_called_once()
+        self.assertEqual(len(failed), 2)
+        self.assertTrue(all(message["retryable"] for message in failed))
+        self.assertFalse(any(message["rejected"] for message in failed))
+
+
+@override_settings(
+    MAIL_BACKEND="mailing.services.send_in_blue.SendInBlue",
+    MAIL_MAX_RETRIES=1,
+    MAIL_RETRY_BACKOFF=0,
+)
+class SendBulkEmailTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(
+            MailDispatcher, "_bucket", TokenBucket(rate=0, capacity=1)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, messages, side_effect):
+        api = mock.Mock(**{"send_transac_email.side_effect": side_effect})
+        with mock.patch.object(
+            SendInBlue, "get_api_instance", return_value=api
+        ), mock.patch(
+            "mailing.tasks.send_bulk_email_task.remove_unreachable_users"
+        ) as remove_unreachable_users:
+            send_bulk_email(messages)
+        return remove_unreachable_users
+
+    def test_only_the_rejected_recipient_is_removed(self):
+        messages = [
+            invitation(f"{name}@acme.test", name)
+            for name in ("ada", "bad", "bola")
+        ]
+
+        def send_transac_email(email):
+            if (
+                email.message_versions
+                or email.to[0]["email"] == "bad@acme.test"
+            ):
+                raise ApiException(status=400, reason="invalid email")
+
+        remove_unreachable_users = self.send(messages, send_transac_email)
+
+        remove_unreachable_users.assert_called_once_with(
+            [{"email": "bad@acme.test"}]
+        )
+
+    def test_recipients_are_kept_when_retries_are_exhausted(self):
+        messages = [
+            invitation("ada@acme.test", "ada"),
+            invitation("bola@acme.test", "bola"),
+        ]
+
+        remove_unreachable_users = self.send(
+            messages, ApiException(status=503, reason="unavailable")
+        )
+
+        remove_unreachable_users.assert_not_called()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from core.utils.eager_loading import EagerLoadingMixin
 from core.utils.exception import CustomValidation
 from ..models import monthly_salary_structure
 from ..models import generated_employee_montly_structure
@@ -104,7 +105,7 @@ class generatedMonthlyStructureSerializer(serializers.Serializer):
         return validated_data
 
 
-class cleanGeneratedEmployeeSavedMonthlySalaryStructure(serializers.ModelSerializer):
+class cleanGeneratedEmployeeSavedMonthlySalaryStructure(serializers.ModelSerializer, EagerLoadingMixin):
     saved_employee_receivables = serializers.SerializerMethodField()
     saved_employee_regulatory_recievables = serializers.SerializerMethodField()
     saved_employee_other_recievables = serializers.SerializerMethodField()
@@ -115,6 +116,28 @@ class cleanGeneratedEmployeeSavedMonthlySalaryStructure(serializers.ModelSeriali
     annual_gross = serializers.SerializerMethodField()
     employee_full_name = serializers.SerializerMethodField()
 
+    # the saved elements of every row are read from these prefetches, the
+    # list runs the same number of queries whatever the number of employees
+    select_related_fields = ("employee__user",)
+    prefetch_related_fields = (
+        "employeesavedotherreceivables_set",
+        "employeesavedemployeereceivables_set",
+        "employeesavedemployeeregulatoryrecievables_set",
+        "employeesavedemployeeregulatorydeductables_set",
+        "employeesavedemployeeotherdeductables_set",
+    )
+
+    @staticmethod
+    def _values(related_manager, *fields):
+        return [
+            {field: getattr(obj, field) for field in fields}
+            for obj in related_manager.all()
+        ]
+
+    @staticmethod
+    def _sum(related_manager):
+        return sum(obj.value for obj in related_manager.all())
+
     def get_employee_full_name(self,EmployeeSavedMonthlySalaryStructureInstance):
         emp = EmployeeSavedMonthlySalaryStructureInstance.employee.user
         # 
@@ -122,16 +145,16 @@ class cleanGeneratedEmployeeSavedMonthlySalaryStructure(serializers.ModelSeriali
         return emp.first_name+' '+emp.last_name
     def get_net_salary(self,EmployeeSavedMonthlySalaryStructureInstance):
         "// Total Gross Minus (All Deductibles + Regulatory Receivables)"
-        sum_of_regulatory = sum(generated_employee_montly_structure.EmployeeSavedEmployeeRegulatoryRecievables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values_list('value',flat=True))
-        sum_of_regulatory_deductables = sum(generated_employee_montly_structure.EmployeeSavedEmployeeRegulatoryDeductables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values_list('value',flat=True))
-        sum_of_other_deductables = sum(generated_employee_montly_structure.EmployeeSavedEmployeeOtherDeductables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values_list('value',flat=True))
+        sum_of_regulatory = self._sum(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeregulatoryrecievables_set)
+        sum_of_regulatory_deductables = self._sum(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeregulatorydeductables_set)
+        sum_of_other_deductables = self._sum(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeotherdeductables_set)
         total_sum = sum_of_regulatory+sum_of_regulatory_deductables+sum_of_other_deductables
         return EmployeeSavedMonthlySalaryStructureInstance.gross_money-total_sum
 
     def get_total_gross(self,EmployeeSavedMonthlySalaryStructureInstance):
        " // sum of all the receiveables"
-       sum_of_recievable = sum(generated_employee_montly_structure.EmployeeSavedEmployeeRegulatoryRecievables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values_list('value',flat=True))
-       sum_of_regulatory = sum(generated_employee_montly_structure.EmployeeSavedEmployeeReceivables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values_list('value',flat=True))
+       sum_of_recievable = self._sum(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeregulatoryrecievables_set)
+       sum_of_regulatory = self._sum(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeereceivables_set)
        return sum_of_regulatory+sum_of_recievable
 
     def get_annual_gross(self,EmployeeSavedMonthlySalaryStructureInstance):
@@ -139,25 +162,25 @@ class cleanGeneratedEmployeeSavedMonthlySalaryStructure(serializers.ModelSeriali
         return EmployeeSavedMonthlySalaryStructureInstance.gross_money*12
     
     def get_saved_employee_other_recievables(self,EmployeeSavedMonthlySalaryStructureInstance):
-        return generated_employee_montly_structure.EmployeeSavedOtherReceivables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values(
+        return self._values(EmployeeSavedMonthlySalaryStructureInstance.employeesavedotherreceivables_set,
             'value','other_receivables_element','other_receivables_element_gross_percent'
         )
     def get_saved_employee_receivables(self,EmployeeSavedMonthlySalaryStructureInstance):
-        return generated_employee_montly_structure.EmployeeSavedEmployeeReceivables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values(
+        return self._values(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeereceivables_set,
             'fixed_receivables_element','fixed_receivables_element_gross_percent','value'
         )
     def get_saved_employee_regulatory_recievables(self,EmployeeSavedMonthlySalaryStructureInstance):
-        return generated_employee_montly_structure.EmployeeSavedEmployeeRegulatoryRecievables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values(
+        return self._values(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeregulatoryrecievables_set,
             'Employee_regulatory_recievables','Employee_regulatory_recievables_gross_percent','regulatory_rates',
             'value'
         )
     def get_saved_employee_regulatory_deductables(self,EmployeeSavedMonthlySalaryStructureInstance):
-        return generated_employee_montly_structure.EmployeeSavedEmployeeRegulatoryDeductables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values(
+        return self._values(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeregulatorydeductables_set,
             'Employee_regulatory_deductables','Employee_regulatory_deductables_gross_percent','regulatory_rates',
             'value'
         )
     def get_saved_employee_other_deductables(self,EmployeeSavedMonthlySalaryStructureInstance):
-        return generated_employee_montly_structure.EmployeeSavedEmployeeOtherDeductables.objects.filter(monthly_salary_structure=EmployeeSavedMonthlySalaryStructureInstance).values(
+        return self._values(EmployeeSavedMonthlySalaryStructureInstance.employeesavedemployeeotherdeductables_set,
             'Employee_other_deductables','Employee_other_deductables_gross_percent','value',
         )
 
@@ -1,4 +1,5 @@
 from  rest_framework import serializers,status
+from core.utils.eager_loading import EagerLoadingMixin
 from core.utils.exception import CustomValidation
 from core.utils.helper_function import get_amount_by_percent
 from ..models import monthly_salary_structure as models
@@ -201,7 +202,7 @@ class MonthSalaryStructureCreationSerializer(serializers.Serializer):
 
 
 
-class  MonthSalaryStructureCleanerSerializer(serializers.ModelSerializer):
+class  MonthSalaryStructureCleanerSerializer(serializers.ModelSerializer, EagerLoadingMixin):
 
     employee_receivables = serializers.SerializerMethodField()
     employee_regulatory_recievables = serializers.SerializerMethodField()
@@ -209,30 +210,46 @@ class  MonthSalaryStructureCleanerSerializer(serializers.ModelSerializer):
     employee_other_deductables = serializers.SerializerMethodField()
     employee_other_receivables = serializers.SerializerMethodField()
 
+    # the elements of every structure are read from these prefetches, the
+    # list runs the same number of queries whatever the number of structures
+    prefetch_related_fields = (
+        "employeeotherreceivables_set",
+        "employeereceivables_set",
+        "employeeregulatoryrecievables_set",
+        "employeeregulatorydeductables_set",
+        "employeeotherdeductables_set",
+    )
+
+    @staticmethod
+    def _values(related_manager, *fields):
+        return [
+            {field: getattr(obj, field) for field in fields}
+            for obj in related_manager.all()
+        ]
 
     def get_employee_other_receivables(self,MonthlySalaryInstance):
-        return models.EmployeeOtherReceivables.objects.filter(monthly_salary_structure=MonthlySalaryInstance).values(
+        return self._values(MonthlySalaryInstance.employeeotherreceivables_set,
             'other_receivables_element',
             'other_receivables_element_gross_percent','value')
     def get_employee_receivables(self,MonthlySalaryInstance):
-        return models.EmployeeReceivables.objects.filter(monthly_salary_structure=MonthlySalaryInstance).values(
+        return self._values(MonthlySalaryInstance.employeereceivables_set,
             'fixed_receivables_element','fixed_receivables_element_gross_percent','value'
         )
 
     def get_employee_regulatory_recievables(self,MonthlySalaryInstance):
-        return models.EmployeeRegulatoryRecievables.objects.filter(monthly_salary_structure=MonthlySalaryInstance).values(
+        return self._values(MonthlySalaryInstance.employeeregulatoryrecievables_set,
             'Employee_regulatory_recievables','Employee_regulatory_recievables_gross_percent','regulatory_rates',
             'value'
         )
 
     def get_employee_regulatory_deductables(self,MonthlySalaryInstance):
-        return models.EmployeeRegulatoryDeductables.objects.filter(monthly_salary_structure=MonthlySalaryInstance).values(
+        return self._values(MonthlySalaryInstance.employeeregulatorydeductables_set,
             'Employee_regulatory_deductables','Employee_regulatory_deductables_gross_percent','regulatory_rates',
             'value'
         )
 
     def get_employee_other_deductables(self,MonthlySalaryInstance):
-        return models.EmployeeOtherDeductables.objects.filter(monthly_salary_structure=MonthlySalaryInstance).values(
+        return self._values(MonthlySalaryInstance.employeeotherdeductables_set,
             'Employee_other_deductables','Employee_other_deductables_gross_percent','value',
         )
     class Meta:
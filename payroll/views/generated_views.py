@@ -1,3 +1,4 @@
+from django.utils.decorators import method_decorator
 from payroll.models import generated_employee_montly_structure  as gen_models
 from rest_framework import viewsets,status,mixins
 from rest_framework.response import Response
@@ -5,7 +6,9 @@ from ..serializers import generated_payroll_serializer
 from core.utils import CustomPagination,response_data,helper_function
 from rest_framework.decorators import action
 import payroll.filter as customfilter
+from core.utils.replicas import replica_reads
 
+@method_decorator(replica_reads(), name="list")
 class generatedMonthlyStructureViewSet( mixins.ListModelMixin,mixins.CreateModelMixin,viewsets.GenericViewSet):
     serializer_class = generated_payroll_serializer.generatedMonthlyStructureSerializer
     queryset=gen_models.EmployeeSavedMonthlySalaryStructure.objects.all()
@@ -20,8 +23,9 @@ class generatedMonthlyStructureViewSet( mixins.ListModelMixin,mixins.CreateModel
 
     def list(self,request,*args,**kwargs):
         'this will return  the generatedMonthlyStructureSerializer by date selected'
-        queryset =self.filter_queryset(self.get_queryset().order_by('grade_level'))
-        clean_data = generated_payroll_serializer.cleanGeneratedEmployeeSavedMonthlySalaryStructure(queryset,many=True)
+        serializer_class = generated_payroll_serializer.cleanGeneratedEmployeeSavedMonthlySalaryStructure
+        queryset =self.filter_queryset(serializer_class.setup_eager_loading(self.get_queryset().order_by('grade_level')))
+        clean_data = serializer_class(queryset,many=True)
         data = response_data(200, "Generated Successfull",clean_data.data)
         return Response(data,status=status.HTTP_200_OK)
  
@@ -1,12 +1,15 @@
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets,mixins,status
 from rest_framework.response import Response
 
 from core.utils.exception import CustomValidation
 from ..serializers import monthly_salary_structure as monthly_salary_structure_serializer
 from core.utils import CustomPagination,response_data,helper_function
+from core.utils.replicas import replica_reads
 from ..models import monthly_salary_structure as monthly_salary_structure_models
 
 
+@method_decorator(replica_reads(), name="list")
 class CreateMonthlySalaryView(mixins.ListModelMixin,mixins.CreateModelMixin,mixins.DestroyModelMixin,viewsets.GenericViewSet):
     serializer_class= monthly_salary_structure_serializer.MonthSalaryStructureCreationSerializer
 
@@ -21,9 +24,10 @@ class CreateMonthlySalaryView(mixins.ListModelMixin,mixins.CreateModelMixin,mixi
 
     def list(self, request, *args, **kwargs):
         structure_type= request.query_params.get('structure_type','monthly')
-        datalist = monthly_salary_structure_models.MonthlySalaryStructure.objects.filter(structure_type=structure_type)
+        serializer_class = monthly_salary_structure_serializer.MonthSalaryStructureCleanerSerializer
+        datalist = serializer_class.setup_eager_loading(monthly_salary_structure_models.MonthlySalaryStructure.objects.filter(structure_type=structure_type))
 
-        serialized = monthly_salary_structure_serializer.MonthSalaryStructureCleanerSerializer(datalist,many=True)
+        serialized = serializer_class(datalist,many=True)
         data = response_data(200, "Created Successfull",serialized.data)
         return Response(data, status=status.HTTP_200_OK)
 
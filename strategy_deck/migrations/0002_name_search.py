@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.utils.search import add_trigram_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strategy_deck', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='initiative',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='simple'), name='initiative_name_search'),
+        ),
+        migrations.AddIndex(
+            model_name='objective',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='simple'), name='objective_name_search'),
+        ),
+        add_trigram_index('strategy_deck_initiative', 'name', 'initiative_name_trgm'),
+        add_trigram_index('strategy_deck_objective', 'name', 'objective_name_trgm'),
+    ]
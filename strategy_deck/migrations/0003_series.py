@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strategy_deck', '0002_name_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='initiative',
+            name='series_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='objective',
+            name='series_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='initiative',
+            index=models.Index(fields=['series_id', 'start_date'], name='initiative_series'),
+        ),
+        migrations.AddIndex(
+            model_name='objective',
+            index=models.Index(fields=['series_id', 'start_date'], name='objective_series'),
+        ),
+    ]
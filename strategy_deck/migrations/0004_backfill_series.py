@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:05
+
+import uuid
+
+from django.db import migrations
+
+
+# occurrences of a series share these, same named rows of other owners or
+# uplines are other series
+SERIES_FIELDS = {
+    "Initiative": (
+        "name",
+        "routine_option",
+        "owner_id",
+        "upline_initiative_id",
+        "upline_objective_id",
+    ),
+    "Objective": ("name", "routine_option", "corporate_level_id"),
+}
+
+
+def backfill_series(apps, schema_editor):
+    """
+    Gives the recurring initiatives and objectives created before the
+    series id the series they were matched on, every occurrence of the
+    same name with the same owner and upline
+    """
+    for model_name, fields in SERIES_FIELDS.items():
+        model = apps.get_model("strategy_deck", model_name)
+        rows = model.objects.filter(series_id__isnull=True).exclude(
+            routine_option="once"
+        )
+        for series in rows.values(*fields).distinct().order_by():
+            rows.filter(**series).update(series_id=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strategy_deck', '0003_series'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_series, migrations.RunPython.noop),
+    ]
@@ -4,13 +4,15 @@ import json
 
 from celery import current_app
 from datetime import datetime
-from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
 from django.db import connection, models
 from django_celery_beat.models import ClockedSchedule, PeriodicTask
 from cloudinary_storage.storage import RawMediaCloudinaryStorage
 
+from core.utils.change_versions import invalidate
 from core.utils import Upload
+from core.utils.search import name_search_document
 from core.utils.process_durations import get_localized_time
 from organization.models import (
     Unit,
@@ -29,7 +31,7 @@ BASE_FILE_PATH = "initiative_brief/"
 class InitiativeManager(models.Manager):
     def bulk_create(self, objs, **kwargs):
         result = super().bulk_create(objs, **kwargs)
-        cache.delete("initiative_queryset")
+        invalidate("initiative_queryset")
         # manually send signals for initiatives
         for obj in objs:
             obj.create_change_to_active_task()
@@ -151,6 +153,8 @@ class Initiative(models.Model):
         max_length=255, choices=ROUTINE_TYPE_CHOICES
     )
     routine_round = models.PositiveIntegerField(default=1)
+    # shared by the occurrences of a recurring initiative
+    series_id = models.UUIDField(null=True, blank=True, editable=False)
     start_date = models.DateField(blank=True, null=True)
     end_date = models.DateField(blank=True, null=True)
     after_occurrence = models.PositiveSmallIntegerField(null=True, blank=True)
@@ -184,6 +188,12 @@ class Initiative(models.Model):
 
     class Meta:
         ordering = ["start_date", "-id"]
+        indexes = [
+            GinIndex(name_search_document(), name="initiative_name_search"),
+            models.Index(
+                fields=["series_id", "start_date"], name="initiative_series"
+            ),
+        ]
 
     def __str__(self):
         return self.name
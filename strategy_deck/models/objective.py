@@ -4,10 +4,12 @@ import json
 
 from datetime import datetime
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+from django.contrib.postgres.indexes import GinIndex
 from django.db import connection, models
 from django_celery_beat.models import ClockedSchedule, PeriodicTask
 
+from core.utils.change_versions import invalidate
+from core.utils.search import name_search_document
 from core.utils.process_durations import get_localized_time
 from organization.models import CorporateLevel
 
@@ -17,7 +19,7 @@ User = get_user_model()
 class ObjectiveManager(models.Manager):
     def bulk_create(self, objs, **kwargs):
         result = super().bulk_create(objs, **kwargs)
-        cache.delete("objective_queryset")
+        invalidate("objective_queryset")
         # manually send signals for objectives
         for obj in objs:
             obj.create_change_to_active_task()
@@ -71,6 +73,8 @@ class Objective(models.Model):
         max_length=255, choices=ROUTINE_TYPE_CHOICES
     )
     routine_round = models.PositiveIntegerField(default=1)
+    # shared by the occurrences of a recurring objective
+    series_id = models.UUIDField(null=True, blank=True, editable=False)
     start_date = models.DateField(blank=True, null=True)
     end_date = models.DateField(blank=True, null=True)
     after_occurrence = models.PositiveSmallIntegerField(null=True, blank=True)
@@ -89,6 +93,12 @@ class Objective(models.Model):
 
     class Meta:
         ordering = ["start_date", "-id"]
+        indexes = [
+            GinIndex(name_search_document(), name="objective_name_search"),
+            models.Index(
+                fields=["series_id", "start_date"], name="objective_series"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -1,13 +1,13 @@
 from decimal import Decimal
 import uuid
-from django.core.cache import cache
 from django.db import models
+from core.utils.change_versions import invalidate
 
 
 class PerspectiveManager(models.Manager):
     def bulk_create(self, objs, **kwargs):
         result = super().bulk_create(objs, **kwargs)
-        cache.delete("perspective_queryset")
+        invalidate("perspective_queryset")
         return result
 
 
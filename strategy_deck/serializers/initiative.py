@@ -1,3 +1,4 @@
+import uuid
 from typing import Dict, List
 from django.contrib.auth import get_user_model
 from pyexcel_xlsx import get_data
@@ -5,6 +6,7 @@ from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
 
 from core.serializers.nested import OwnerOrAssignorSerializer
+from core.utils.bulk_slug_field import BulkSlugRelatedField
 from core.utils.bulk_upload import extract_key_message
 from core.utils.eager_loading import EagerLoadingMixin
 from core.utils.exception import CustomValidation
@@ -225,6 +227,7 @@ class InitiativeSerializer(serializers.ModelSerializer, EagerLoadingMixin):
         end_date = validated_data.get("end_date", None)
         routine_option = validated_data.get("routine_option")
         initiatives_array = []
+        series_id = uuid.uuid4()
 
         for routine_round, start_date in enumerate(start_date_list):
             end_date = process_end_date(start_date, routine_option, end_date)
@@ -232,6 +235,7 @@ class InitiativeSerializer(serializers.ModelSerializer, EagerLoadingMixin):
                 {
                     "start_date": start_date,
                     "routine_round": routine_round + 1,
+                    "series_id": series_id,
                     "end_date": end_date,
                 }
             )
@@ -522,7 +526,7 @@ class InitiativeImportSerializer(serializers.Serializer):
 
 
 class MultipleInitiativeSerializer(serializers.Serializer):
-    initiative = serializers.SlugRelatedField(
+    initiative = BulkSlugRelatedField(
         slug_field="initiative_id",
         queryset=Initiative.objects.all(),
         required=True,
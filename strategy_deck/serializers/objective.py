@@ -1,3 +1,4 @@
+import uuid
 from typing import Dict, List
 from django.contrib.auth import get_user_model
 from pyexcel_xlsx import get_data
@@ -8,6 +9,7 @@ from core.serializers.nested import (
     NestedCorporateLevelSerializer,
     OwnerOrAssignorSerializer,
 )
+from core.utils.bulk_slug_field import BulkSlugRelatedField
 from core.utils.bulk_upload import extract_key_message
 from core.utils.eager_loading import EagerLoadingMixin
 from core.utils.exception import CustomValidation
@@ -212,6 +214,7 @@ class ObjectiveSerializer(serializers.ModelSerializer, EagerLoadingMixin):
         routine_option = validated_data.get("routine_option")
 
         objectives_array = []
+        series_id = uuid.uuid4()
 
         for routine_round, start_date in enumerate(start_date_list):
             end_date = process_end_date(start_date, routine_option, end_date)
@@ -219,6 +222,7 @@ class ObjectiveSerializer(serializers.ModelSerializer, EagerLoadingMixin):
                 {
                     "start_date": start_date,
                     "routine_round": routine_round + 1,
+                    "series_id": series_id,
                     "end_date": end_date,
                 }
             )
@@ -489,7 +493,7 @@ class ObjectiveImportSerializer(serializers.Serializer):
 
 
 class MultipleObjectiveSerializer(serializers.Serializer):
-    objective = serializers.SlugRelatedField(
+    objective = BulkSlugRelatedField(
         slug_field="objective_id",
         queryset=Objective.objects.all(),
         required=True,
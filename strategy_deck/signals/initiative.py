@@ -1,23 +1,31 @@
 from typing import Dict
-from celery import current_app
-from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django_celery_beat.models import PeriodicTask
 
+from core.utils.bulk_delete import get_delete_cleanup
+from core.utils.change_versions import invalidate
+from core.utils.outbox import publish
+from emetric_calendar.models import UserScheduledEventCalendar
 from strategy_deck.models import Initiative
 from strategy_deck.models.objective import Objective
 
 
 
 def post_save_initiative_receiver(
-    sender, instance: Initiative, created, **kwargs
+    sender, instance: Initiative, created, update_fields=None, **kwargs
 ):
     """Signal for Initiative post save"""
     if created:
         instance.create_change_to_active_task()
         instance.create_change_to_closed_task()
-
-    cache.delete("initiative_queryset")
+    elif getattr(instance, "_team_changed", False):
+        # the calendar events of its tasks follow the initiative's team
+        instance._team_changed = False
+        if UserScheduledEventCalendar.update_team(instance):
+            # the team calendars are cached on the task versions
+            invalidate("task_queryset")
+
+    invalidate("initiative_queryset")
     return None
 
 
@@ -29,6 +37,15 @@ def pre_save_initiative_receiver(sender, instance: Initiative, **kwargs: Dict):
         previous_initiative_obj: Initiative = Initiative.objects.get(
             id=instance.id
         )
+        # the calendar events follow a team change after the save
+        update_fields = kwargs.get("update_fields")
+        team_fields = set(UserScheduledEventCalendar.TEAM_FIELDS)
+        instance._team_changed = (
+            update_fields is None or bool(team_fields & set(update_fields))
+        ) and (
+            UserScheduledEventCalendar.get_team(instance)
+            != UserScheduledEventCalendar.get_team(previous_initiative_obj)
+        )
         if instance.upline_initiative:
             update_connected_initiative_target_point_for_update(
                 instance, previous_initiative_obj
@@ -41,6 +58,28 @@ def pre_save_initiative_receiver(sender, instance: Initiative, **kwargs: Dict):
 
 def post_delete_initiative_receiver(sender, instance: Initiative, **kwargs):
     """Delete all connected elements"""
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        cleanup.delete_periodic_tasks(
+            f"{str(instance.initiative_id)} active",
+            f"{str(instance.initiative_id)} closed",
+        )
+        if instance.upline_initiative_id:
+            cleanup.adjust_target_point(
+                Initiative,
+                "initiative_id",
+                instance.upline_initiative_id,
+                -instance.target_point,
+            )
+        else:
+            cleanup.adjust_target_point(
+                Objective,
+                "objective_id",
+                instance.upline_objective_id,
+                -instance.target_point,
+            )
+        cleanup.invalidate("initiative_queryset")
+        return
 
     PeriodicTask.objects.filter(
         name__in=[
@@ -51,19 +90,21 @@ def post_delete_initiative_receiver(sender, instance: Initiative, **kwargs):
 
     try:
         if instance.upline_initiative:
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
                 (instance.upline_initiative.pk, -instance.target_point),
+                collapsible=True,
             )
         else:
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.objective.update_upline_objective_target_point",
                 (instance.upline_objective.pk, -instance.target_point),
+                collapsible=True,
             )
     except ObjectDoesNotExist:
         pass
 
-    cache.delete("initiative_queryset")
+    invalidate("initiative_queryset")
 
 
 def update_connected_initiative_target_point_for_update(
@@ -74,16 +115,18 @@ def update_connected_initiative_target_point_for_update(
     update
     """
     if previous_initiative_obj.upline_initiative != instance.upline_initiative:
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
             (
                 previous_initiative_obj.upline_initiative.pk,
                 -previous_initiative_obj.target_point,
             ),
+            collapsible=True,
         )
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
             (instance.upline_initiative.pk, instance.target_point),
+            collapsible=True,
         )
 
     else:
@@ -91,9 +134,10 @@ def update_connected_initiative_target_point_for_update(
             target_point_diff = (
                 instance.target_point - previous_initiative_obj.target_point
             )
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
                 (instance.upline_initiative.pk, target_point_diff),
+                collapsible=True,
             )
 
 
@@ -105,16 +149,18 @@ def update_connected_objective_target_point_for_update(
     update
     """
     if previous_initiative_obj.upline_objective != instance.upline_objective:
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.objective.update_upline_objective_target_point",
             (
                 previous_initiative_obj.upline_objective.pk,
                 -previous_initiative_obj.target_point,
             ),
+            collapsible=True,
         )
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.objective.update_upline_objective_target_point",
             (instance.upline_objective.pk, instance.target_point),
+            collapsible=True,
         )
 
     else:
@@ -122,7 +168,8 @@ def update_connected_objective_target_point_for_update(
             target_point_diff = (
                 instance.target_point - previous_initiative_obj.target_point
             )
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.objective.update_upline_objective_target_point",
                 (instance.upline_objective.pk, target_point_diff),
+                collapsible=True,
             )
@@ -1,9 +1,10 @@
 from typing import List
-from celery import current_app
-from django.core.cache import cache
 from django.db.models import Sum
 from django_celery_beat.models import PeriodicTask
 
+from core.utils.bulk_delete import get_delete_cleanup
+from core.utils.change_versions import invalidate
+from core.utils.outbox import publish
 from strategy_deck.models import Objective, ObjectivePerspectiveSpread
 from strategy_deck.models.perspective import Perspective
 
@@ -14,7 +15,7 @@ def post_save_objective_receiver(
     """Signal for objective post save"""
     if created:
         pass
-    cache.delete("objective_queryset")
+    invalidate("objective_queryset")
     return None
 
 
@@ -33,7 +34,17 @@ def pre_save_objective_receiver(sender, instance: Objective, **kwargs):
 
 def post_delete_objective_receiver(sender, instance: Objective, **kwargs):
     """Delete all connected elements"""
-    
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        # the spreads are deleted first, their receiver adjusts the
+        # perspective target points
+        cleanup.delete_periodic_tasks(
+            f"{str(instance.objective_id)} active",
+            f"{str(instance.objective_id)} closed",
+        )
+        cleanup.invalidate("objective_queryset")
+        return
+
     PeriodicTask.objects.filter(
         name__in=[
             f"{str(instance.objective_id)} active",
@@ -56,14 +67,15 @@ def post_delete_objective_receiver(sender, instance: Objective, **kwargs):
             * instance.target_point
         )
         try:
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.perspective.update_connected_perspective_target_point",
                 (spread.perspective.pk, -target_point),
+                collapsible=True,
             )
         except Perspective.DoesNotExist:
             pass
 
-    cache.delete("objective_queryset")
+    invalidate("objective_queryset")
 
 
 def update_connected_perspectives_target_point_for_update(
@@ -95,9 +107,10 @@ def update_connected_perspectives_target_point_for_update(
             )
 
             spread.objective_perspective_point = target_point
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.perspective.update_connected_perspective_target_point",
                 (spread.perspective.pk, target_point),
+                collapsible=True,
             )
 
         ObjectivePerspectiveSpread.objects.bulk_update(
@@ -1,5 +1,6 @@
 from typing import Dict
 
+from core.utils.bulk_delete import get_delete_cleanup
 from strategy_deck.models import ObjectivePerspectiveSpread
 from strategy_deck.models.objective import Objective
 from strategy_deck.models.perspective import Perspective
@@ -9,6 +10,21 @@ def post_delete_objective_perspective_spread_receiver(
     sender, instance: ObjectivePerspectiveSpread, **kwargs: Dict
 ):
     """Reduce target point for perspective and objective"""
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        cleanup.adjust_target_point(
+            Perspective,
+            "perspective_id",
+            instance.perspective_id,
+            -instance.objective_perspective_point,
+        )
+        cleanup.adjust_target_point(
+            Objective,
+            "objective_id",
+            instance.objective_id,
+            -instance.objective_perspective_point,
+        )
+        return
 
     try:
         instance.perspective.target_point -= (
@@ -1,5 +1,4 @@
-from django.core.cache import cache
-
+from core.utils.change_versions import invalidate
 from strategy_deck.models import Perspective
 
 
@@ -7,7 +6,7 @@ def post_save_perspective_receiver(
     sender, instance: Perspective, created, **kwargs
 ):
     """Signal for Perspective post save"""
-    cache.delete("perspective_queryset")
+    invalidate("perspective_queryset")
 
 
 def post_delete_perspective_receiver(
@@ -15,4 +14,4 @@ def post_delete_perspective_receiver(
 ):
     """Delete all connected elements"""
 
-    cache.delete("perspective_queryset")
+    invalidate("perspective_queryset")
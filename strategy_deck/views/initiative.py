@@ -1,15 +1,21 @@
 import django_filters
 from django.core.cache import cache
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from rest_framework import generics, status, filters
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from core.utils import CustomPagination, response_data, NestedMultipartParser
+from core.utils.bulk_delete import bulk_delete
+from core.utils.change_versions import conditional_get
 from core.utils.permissions import (
     IsAdminOrSuperAdminOrReadOnly,
     IsAdminOrHRAdminOrReadOnly,
 )
+from core.utils.recurrence import get_future_occurrences
+from core.utils.search import DocumentSearchFilter, name_search_document
 from strategy_deck.models import Initiative
 from strategy_deck.serializers import (
     InitiativeSerializer,
@@ -72,6 +78,10 @@ class InitiativeFilter(django_filters.FilterSet):
         return queryset.filter(upline_objective__isnull=not (value))
 
 
+@method_decorator(
+    conditional_get("initiative_queryset", "objective_queryset"),
+    name="get",
+)
 class InitiativeListCreateView(generics.ListCreateAPIView):
     serializer_class = InitiativeSerializer
     permission_classes = [IsAuthenticated]
@@ -80,10 +90,13 @@ class InitiativeListCreateView(generics.ListCreateAPIView):
     parser_classes = (NestedMultipartParser, JSONParser)
     filter_backends = [
         django_filters.rest_framework.DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        DocumentSearchFilter,
     ]
     filterset_class = InitiativeFilter
+    search_document = name_search_document()
+    search_text = "name"
+    search_document_fields = ("name",)
     # filter_fields = {
     #     "initiative_status": ["in", "exact"],
     # }
@@ -158,8 +171,10 @@ class InitiativeDetailView(generics.RetrieveUpdateDestroyAPIView):
         if recurring:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            self.perform_destroy_all(instance)
-            serializer.save()
+            # the series is replaced by the new one or left as it was
+            with transaction.atomic():
+                self.perform_destroy_all(instance)
+                serializer.save()
             data = response_data(
                 200,
                 "Initiative and recurring Initiatives updated successfully",
@@ -198,12 +213,10 @@ class InitiativeDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy_all(self, instance):
         """Perform delete all recurring initiatives"""
-        initiatives = Initiative.objects.filter(
-            name=instance.name,
-            start_date__gte=instance.start_date,
-            initiative_status=Initiative.PENDING,
+        occurrences = get_future_occurrences(
+            instance, initiative_status=Initiative.PENDING
         )
-        initiatives.delete()
+        bulk_delete(occurrences)
 
     def get_queryset(self):
         initiative_queryset = cache.get("initiative_queryset")
@@ -249,5 +262,6 @@ class MultipleInitiativeDeleteView(generics.GenericAPIView):
 
     def perform_multiple_delete(self, serializer):
         initiatives = serializer.validated_data["initiative"]
-        for initiative in initiatives:
-            initiative.delete()
+        bulk_delete(
+            Initiative.objects.filter(pk__in=[obj.pk for obj in initiatives])
+        )
@@ -1,16 +1,22 @@
 import django_filters
 from django.core.cache import cache
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from rest_framework import generics, status, filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 
 from core.utils import CustomPagination, response_data
+from core.utils.bulk_delete import bulk_delete
+from core.utils.change_versions import conditional_get
 from core.utils.permissions import (
     IsSuperAdminUserOnly,
     IsAdminUserOnly,
     IsAdminOrSuperAdminOrReadOnly,
 )
+from core.utils.recurrence import get_future_occurrences
+from core.utils.search import DocumentSearchFilter, name_search_document
 from strategy_deck.models import Objective
 from strategy_deck.serializers import ObjectiveSerializer
 from strategy_deck.serializers.objective import (
@@ -31,6 +37,10 @@ class ObjectiveFilter(django_filters.FilterSet):
         fields = ["objective_status", "start_date"]
 
 
+@method_decorator(
+    conditional_get("objective_queryset", "perspective_queryset"),
+    name="get",
+)
 class ObjectiveListCreateView(generics.ListCreateAPIView):
     serializer_class = ObjectiveSerializer
     permission_classes = [IsAuthenticated, IsAdminOrSuperAdminOrReadOnly]
@@ -38,10 +48,13 @@ class ObjectiveListCreateView(generics.ListCreateAPIView):
     pagination_class = CustomPagination
     filter_backends = [
         django_filters.rest_framework.DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        DocumentSearchFilter,
     ]
     filterset_class = ObjectiveFilter
+    search_document = name_search_document()
+    search_text = "name"
+    search_document_fields = ("name",)
     search_fields = ("name",)
     ordering_fields = (
         "name",
@@ -108,8 +121,10 @@ class ObjectiveDetailView(generics.RetrieveUpdateDestroyAPIView):
         if recurring:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            self.perform_destroy_all(instance)
-            serializer.save()
+            # the series is replaced by the new one or left as it was
+            with transaction.atomic():
+                self.perform_destroy_all(instance)
+                serializer.save()
             data = response_data(
                 200,
                 "Objective and recurring Objectives updated successfully",
@@ -148,12 +163,10 @@ class ObjectiveDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy_all(self, instance):
         """Perform delete all recurring objectives"""
-        objectives = Objective.objects.filter(
-            name=instance.name,
-            start_date__gte=instance.start_date,
-            objective_status=Objective.PENDING,
+        occurrences = get_future_occurrences(
+            instance, objective_status=Objective.PENDING
         )
-        objectives.delete()
+        bulk_delete(occurrences)
 
 
 class ObjectiveImportView(generics.CreateAPIView):
@@ -203,5 +216,6 @@ class MultipleObjectiveDeleteView(generics.GenericAPIView):
 
     def perform_multiple_delete(self, serializer):
         objectives = serializer.validated_data["objective"]
-        for objective in objectives:
-            objective.delete()
+        bulk_delete(
+            Objective.objects.filter(pk__in=[obj.pk for obj in objectives])
+        )
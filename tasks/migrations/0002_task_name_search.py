@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.utils.search import add_trigram_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='simple'), name='task_name_search'),
+        ),
+        add_trigram_index('tasks_task', 'name', 'task_name_trgm'),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_name_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='series_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['series_id', 'start_date'], name='task_series'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:00
+
+import django.core.serializers.json
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskExpansion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, unique=True)),
+                ('series_id', models.UUIDField(db_index=True)),
+                ('template', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('next_date', models.DateField()),
+                ('next_round', models.PositiveIntegerField(default=1)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('done', 'done'), ('cancelled', 'cancelled')], default='pending', max_length=255)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('conflicts', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='taskexpansion',
+            index=models.Index(fields=['status', 'next_date'], name='task_expansion_due'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:05
+
+import uuid
+
+from django.db import migrations
+
+
+# occurrences of a series share these, same named tasks of other
+# initiatives are other series
+SERIES_FIELDS = ("name", "routine_option", "upline_initiative_id")
+
+
+def backfill_series(apps, schema_editor):
+    """
+    Gives the recurring tasks created before the series id the series they
+    were matched on, every occurrence of the same name in the same
+    initiative
+    """
+    Task = apps.get_model("tasks", "Task")
+    tasks = Task.objects.filter(series_id__isnull=True).exclude(
+        routine_option="once"
+    )
+    for series in tasks.values(*SERIES_FIELDS).distinct().order_by():
+        tasks.filter(**series).update(series_id=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_expansion'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_series, migrations.RunPython.noop),
+    ]
@@ -1,2 +1,3 @@
 from .detail import Task
+from .expansion import TaskExpansion
 from .submission import TaskSubmission
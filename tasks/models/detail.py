@@ -1,12 +1,12 @@
 from decimal import Decimal
 import uuid
 import json
+from collections import defaultdict
 
-from celery import current_app
 from datetime import timedelta
 from django.utils import timezone
-from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models, connection
 from django.apps import apps
 from django_celery_beat.models import ClockedSchedule, PeriodicTask
@@ -16,7 +16,10 @@ from textblob import TextBlob
 from pdfminer import high_level
 from pysimilar import compare
 
+from core.utils.change_versions import invalidate
+from core.utils.outbox import publish_many
 from core.utils.base_upload import Upload
+from core.utils.search import name_search_document
 from core.utils.process_durations import (
     get_localized_time,
     process_end_date_time,
@@ -31,17 +34,24 @@ BASE_FILE_PATH = "task_brief/"
 class TaskManager(models.Manager):
     def bulk_create(self, objs, **kwargs):
         result = super().bulk_create(objs, **kwargs)
-        cache.delete("task_queryset")
+        invalidate("task_queryset")
 
         # manually send signals for task
+        target_points = defaultdict(Decimal)
         for obj in objs:
             obj.create_scheduled_event_for_task()
             obj.create_change_to_active_task()
             obj.create_change_to_over_due()
-            current_app.send_task(
-                "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
-                (obj.upline_initiative.pk, obj.target_point),
+            target_points[obj.upline_initiative.pk] += Decimal(
+                obj.target_point
             )
+
+        # one target point update per initiative for the whole series
+        publish_many(
+            "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
+            target_points.items(),
+            collapsible=True,
+        )
         return result
 
 
@@ -136,6 +146,8 @@ class Task(models.Model):
     task_type = models.CharField(max_length=255, choices=TASK_TYPE_CHOICES)
 
     routine_round = models.PositiveIntegerField(default=1)
+    # shared by the occurrences of a recurring task
+    series_id = models.UUIDField(null=True, blank=True, editable=False)
 
     start_date = models.DateField(null=True, blank=True)
     start_time = models.TimeField(null=True, blank=True)
@@ -230,6 +242,12 @@ class Task(models.Model):
 
     class Meta:
         ordering = ["start_date", "start_time", "-id"]
+        indexes = [
+            GinIndex(name_search_document(), name="task_name_search"),
+            models.Index(
+                fields=["series_id", "start_date"], name="task_series"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -543,6 +561,7 @@ class Task(models.Model):
             start_time=start_date_time,
             end_time=end_date_time,
             task=self,
+            **UserScheduledEventCalendar.get_team(upline_initiative),
         )
 
     def modify_scheduled_event_for_task(self):
@@ -570,6 +589,7 @@ class Task(models.Model):
             user=owner,
             start_time=start_date_time,
             end_time=end_date_time,
+            **UserScheduledEventCalendar.get_team(upline_initiative),
         )
 
     def generate_system_based_rating_for_task(self):
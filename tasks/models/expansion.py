@@ -0,0 +1,58 @@
+import uuid
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class TaskExpansion(models.Model):
+    """
+    The occurrences of a recurring task left to create after the preview,
+    created by a worker up to a rolling horizon, see
+    core.utils.task_expansion
+    """
+
+    PENDING = "pending"
+    DONE = "done"
+    CANCELLED = "cancelled"
+
+    STATUS_CHOICES = (
+        (PENDING, "pending"),
+        (DONE, "done"),
+        (CANCELLED, "cancelled"),
+    )
+
+    job_id = models.UUIDField(
+        default=uuid.uuid4, editable=False, unique=True, db_index=True
+    )
+    series_id = models.UUIDField(db_index=True)
+    # field values of the occurrences, bar their start date and round
+    template = models.JSONField(encoder=DjangoJSONEncoder)
+
+    # the rule starts on start date, occurrences start until end date
+    start_date = models.DateField()
+    end_date = models.DateField()
+    # first date and round left to create
+    next_date = models.DateField()
+    next_round = models.PositiveIntegerField(default=1)
+
+    status = models.CharField(
+        max_length=255, choices=STATUS_CHOICES, default=PENDING
+    )
+    created_count = models.PositiveIntegerField(default=0)
+    # dates skipped as the owner is not free
+    conflicts = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_date"], name="task_expansion_due"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} {self.status}"
@@ -1,4 +1,5 @@
 from .detail import TaskSerializer, TaskImportSerializer, MultipleTaskSerializer
+from .expansion import TaskExpansionSerializer, TaskPreviewSerializer
 from .submission import TaskSubmissionSerializer
 from .rate import TaskRatingSerializer, TaskReworkSerializer
-from .report import TaskReportSerializer, InitiativeReportSerializer, ObjectiveReportSerializer
+from .report import TaskReportSerializer, TaskReportEncoder, InitiativeReportSerializer, ObjectiveReportSerializer
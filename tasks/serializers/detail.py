@@ -1,10 +1,13 @@
+import uuid
 from datetime import timedelta, date
 from typing import Dict, List
+from django.conf import settings
 from django.db import connection
 from django.contrib.auth import get_user_model
 from pyexcel_xlsx import get_data
 from rest_framework import serializers, fields
 from rest_framework.exceptions import PermissionDenied
+from core.utils.bulk_slug_field import BulkSlugRelatedField
 from core.utils.bulk_upload import extract_key_message
 from core.utils.eager_loading import EagerLoadingMixin
 from core.utils.exception import CustomValidation
@@ -12,6 +15,7 @@ from core.utils.permissions import has_access_to_create_task
 from core.utils.process_durations import (
     try_parsing_date,
 )
+from core.utils.task_expansion import start_expansion
 from core.utils.task_process import (
     process_start_date_list_for_task,
     process_target_point,
@@ -333,18 +337,50 @@ class TaskSerializer(serializers.ModelSerializer, EagerLoadingMixin):
             )
 
     def create(self, validated_data):
-        validated_data = self._process_serialized_input(validated_data)
+        # only the first occurrences are created here, a worker creates
+        # the rest of the series
+        limit = None
+        if (
+            validated_data.pop("expand_in_background", False)
+            and validated_data.get("routine_option") != Task.ONCE
+        ):
+            limit = settings.TASK_EXPANSION_PREVIEW_SIZE
+
+        validated_data = self._process_serialized_input(
+            validated_data, limit=limit
+        )
         start_date_list = validated_data.pop("start_date_list", None)
+        start_date = validated_data.get("start_date")
         # return None
         tasks_array = []
+        series_id = uuid.uuid4()
 
         for index, start_date in enumerate(start_date_list):
             validated_data.update(
-                {"start_date": start_date, "routine_round": index + 1}
+                {
+                    "start_date": start_date,
+                    "routine_round": index + 1,
+                    "series_id": series_id,
+                }
             )
             tasks_array.append(Task(**validated_data))
         tasks = Task.objects.bulk_create(tasks_array)
 
+        self.preview = tasks
+        self.expansion = None
+        after_occurrence = validated_data.get("after_occurrence")
+        if (
+            limit
+            and len(tasks) == limit
+            and (not after_occurrence or after_occurrence > limit)
+        ):
+            self.expansion = start_expansion(
+                tasks,
+                start_date,
+                validated_data.get("end_date")
+                or validated_data["upline_initiative"].end_date,
+            )
+
         return tasks[0]
 
     def update(self, instance: Task, validated_data):
@@ -384,7 +420,9 @@ class TaskSerializer(serializers.ModelSerializer, EagerLoadingMixin):
 
         return instance
 
-    def _process_serialized_input(self, validated_data, instance=None):
+    def _process_serialized_input(
+        self, validated_data, instance=None, limit=None
+    ):
         upline_initiative_id = validated_data.pop("upline_initiative").get(
             "initiative_id"
         )
@@ -454,6 +492,7 @@ class TaskSerializer(serializers.ModelSerializer, EagerLoadingMixin):
                     end_date,
                     after_occurrence,
                     tenant,
+                    limit=limit,
                 )
             )
         except CustomValidation as _:
@@ -686,7 +725,7 @@ class TaskImportSerializer(serializers.Serializer):
 
 
 class MultipleTaskSerializer(serializers.Serializer):
-    task = serializers.SlugRelatedField(
+    task = BulkSlugRelatedField(
         slug_field="task_id",
         queryset=Task.objects.all(),
         required=True,
@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from tasks.models import Task, TaskExpansion
+
+
+class TaskPreviewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ["task_id", "start_date", "start_time", "routine_round"]
+        read_only_fields = fields
+
+
+class TaskExpansionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskExpansion
+        fields = [
+            "job_id",
+            "series_id",
+            "status",
+            "next_date",
+            "end_date",
+            "created_count",
+            "conflicts",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
@@ -1,9 +1,12 @@
+from collections import OrderedDict, defaultdict
 from decimal import Decimal
+from typing import Dict, List
+
 from rest_framework import serializers
 from django_filters.utils import translate_validation
 
 from core.serializers.nested import OwnerOrAssignorSerializer
-from core.utils.process_report import get_initiatives, process_tasks_for_report
+from core.utils.process_report import get_initiative_ids
 from strategy_deck.models.initiative import Initiative
 from strategy_deck.models.objective import Objective
 from tasks.filter import TaskFilter
@@ -207,24 +210,178 @@ class TaskReportSerializer(serializers.ModelSerializer):
         ]
 
 
-class InitiativeReportSerializer(serializers.ModelSerializer):
-    owner = OwnerOrAssignorSerializer(many=False)
-    cumulative_report = serializers.SerializerMethodField(read_only=True)
+REPORT_POINTS = (
+    "turn_around_time_target_point",
+    "quantity_target_point",
+    "quality_target_point",
+    "target_point",
+)
+
+
+def percentage(achieved, target):
+    if target != 0:
+        return round(achieved / target * 100, 2)
+    return Decimal(0)
+
+
+class TaskReportEncoder:
+    """
+    Produces the output of ``TaskReportSerializer`` from ``values_list``
+    tuples. The cumulative points are summed in one pass over every row,
+    the report fields are only formatted for the rows that are returned,
+    with the field instances of the serializer built once per process.
+
+        rows = TaskReportEncoder.get_rows(queryset)
+        data = TaskReportEncoder.encode(rows[-1:])
+    """
+
+    _plan = None
+
+    @classmethod
+    def get_plan(cls):
+        """
+        (field, row index, percentage indexes, to_representation) for every
+        field of the serializer in order
+        """
+        if cls._plan is not None:
+            return cls._plan
+
+        serializer_fields = TaskReportSerializer().fields
+        columns = cls.get_columns()
+        positions = {field: index for index, field in enumerate(columns)}
+        for point in REPORT_POINTS:
+            for suffix in ("", "_achieved"):
+                positions[f"cumulative_{point}{suffix}"] = len(positions)
+
+        plan = []
+        for field in TaskReportSerializer.Meta.fields:
+            if field in columns:
+                plan.append(
+                    (
+                        field,
+                        positions[field],
+                        None,
+                        serializer_fields[field].to_representation,
+                    )
+                )
+            elif field in positions:
+                plan.append((field, positions[field], None, None))
+            else:
+                # percentage_<point>_achieved
+                point = field[len("percentage_") : -len("_achieved")]
+                indexes = (positions[f"{point}_achieved"], positions[point])
+                plan.append((field, None, indexes, None))
+        cls._plan = plan
+        return plan
+
+    @staticmethod
+    def get_columns():
+        return [
+            field
+            for field in TaskReportSerializer.Meta.fields
+            if not field.startswith(("percentage_", "cumulative_"))
+        ]
 
-    def get_cumulative_report(self, obj: Initiative):
-        initiatives = get_initiatives(obj)  # gets all connected initiatives
+    @classmethod
+    def get_rows(cls, queryset) -> List[tuple]:
+        """Report columns of the tasks followed by the cumulative points"""
+        return cls.accumulate(queryset.values_list(*cls.get_columns()))
+
+    @classmethod
+    def accumulate(cls, values_list) -> List[tuple]:
+        """
+        ``values_list`` tuples of the report columns followed by the
+        cumulative points
+        """
+        columns = cls.get_columns()
+        point_indexes = [
+            (columns.index(point), columns.index(f"{point}_achieved"))
+            for point in REPORT_POINTS
+        ]
+        totals = [0] * (len(REPORT_POINTS) * 2)
+        rows = []
+        for values in values_list:
+            for index, (point, achieved) in enumerate(point_indexes):
+                totals[index * 2] += values[point]
+                totals[index * 2 + 1] += values[achieved]
+            rows.append(values + tuple(totals))
+        return rows
+
+    @classmethod
+    def encode(cls, rows) -> List[OrderedDict]:
+        plan = cls.get_plan()
+        data = []
+        for row in rows:
+            item = OrderedDict()
+            for field, index, indexes, to_representation in plan:
+                if indexes is not None:
+                    item[field] = percentage(row[indexes[0]], row[indexes[1]])
+                elif to_representation is None or row[index] is None:
+                    item[field] = row[index]
+                else:
+                    item[field] = to_representation(row[index])
+            data.append(item)
+        return data
+
+
+def get_cumulative_report(request, upline_obj) -> list:
+    """
+    The last report row of the closed tasks of ``upline_obj``, an objective
+    or initiative, and of its downline initiatives
+    """
+    return get_cumulative_reports(request, [upline_obj])[upline_obj.pk]
+
+
+def get_cumulative_reports(request, upline_objs) -> Dict[int, list]:
+    """
+    The cumulative reports of ``upline_objs`` by primary key, the closed
+    tasks of all of them are read in a single query
+    """
+    initiative_ids = get_initiative_ids(upline_objs)
+    tasks = Task.objects.filter(
+        task_status=Task.CLOSED,
+        upline_initiative__in=set().union(*initiative_ids.values()),
+    )
+    filterset = TaskFilter(request.GET, queryset=tasks)
 
-        tasks = Task.objects.filter(
-            task_status=Task.CLOSED, upline_initiative__in=initiatives
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+
+    # positions of the tasks of every initiative in the report order
+    values = list(
+        filterset.qs.values_list(
+            *TaskReportEncoder.get_columns(), "upline_initiative_id"
+        )
+    )
+    positions = defaultdict(list)
+    for position, row in enumerate(values):
+        positions[row[-1]].append(position)
+
+    reports = {}
+    for pk, upline_initiative_ids in initiative_ids.items():
+        rows = TaskReportEncoder.accumulate(
+            values[position][:-1]
+            for position in sorted(
+                position
+                for initiative_id in upline_initiative_ids
+                for position in positions[initiative_id]
+            )
         )
-        filterset = TaskFilter(self.context["request"].GET, queryset=tasks)
+        # returns last task with the report details
+        reports[pk] = TaskReportEncoder.encode(rows[-1:])
+    return reports
 
-        if not filterset.is_valid():
-            raise translate_validation(filterset.errors)
 
-        processed_tasks = process_tasks_for_report(filterset.qs)
-        # returns last task with the report details
-        return TaskReportSerializer(processed_tasks, many=True).data[-1:]
+class InitiativeReportSerializer(serializers.ModelSerializer):
+    owner = OwnerOrAssignorSerializer(many=False)
+    cumulative_report = serializers.SerializerMethodField(read_only=True)
+
+    def get_cumulative_report(self, obj: Initiative):
+        # computed for the whole page at once by the list views
+        reports = self.context.get("cumulative_reports")
+        if reports is not None and obj.pk in reports:
+            return reports[obj.pk]
+        return get_cumulative_report(self.context["request"], obj)
 
     class Meta:
         model = Initiative
@@ -245,19 +402,11 @@ class ObjectiveReportSerializer(serializers.ModelSerializer):
     cumulative_report = serializers.SerializerMethodField(read_only=True)
 
     def get_cumulative_report(self, obj: Initiative):
-        initiatives = get_initiatives(obj)  # gets all connected initiatives
-
-        tasks = Task.objects.filter(
-            task_status=Task.CLOSED, upline_initiative__in=initiatives
-        )
-        filterset = TaskFilter(self.context["request"].GET, queryset=tasks)
-
-        if not filterset.is_valid():
-            raise translate_validation(filterset.errors)
-
-        processed_tasks = process_tasks_for_report(filterset.qs)
-        # returns last task with the report details
-        return TaskReportSerializer(processed_tasks, many=True).data[-1:]
+        # computed for the whole page at once by the list views
+        reports = self.context.get("cumulative_reports")
+        if reports is not None and obj.pk in reports:
+            return reports[obj.pk]
+        return get_cumulative_report(self.context["request"], obj)
 
     class Meta:
         model = Objective
@@ -271,18 +420,3 @@ class ObjectiveReportSerializer(serializers.ModelSerializer):
             "target_point",
             "cumulative_report",
         ]
-
-    def get_cumulative_report(self, obj: Initiative):
-        initiatives = get_initiatives(obj)  # gets all connected initiatives
-
-        tasks = Task.objects.filter(
-            task_status=Task.CLOSED, upline_initiative__in=initiatives
-        )
-        filterset = TaskFilter(self.context["request"].GET, queryset=tasks)
-
-        if not filterset.is_valid():
-            raise translate_validation(filterset.errors)
-
-        processed_tasks = process_tasks_for_report(filterset.qs)
-        # returns last task with the report details
-        return TaskReportSerializer(processed_tasks, many=True).data[-1:]
@@ -1,11 +1,11 @@
 from typing import Dict
-from celery import current_app
-from django.core.cache import cache
 from django_celery_beat.models import PeriodicTask
+from core.utils.bulk_delete import get_delete_cleanup
+from core.utils.change_versions import invalidate
+from core.utils.outbox import publish
 from strategy_deck.models.initiative import Initiative
 
 from tasks.models import Task, TaskSubmission
-from tasks.tasks.detail import generate_system_based_rating
 
 
 def post_save_task_created_receiver(
@@ -17,15 +17,16 @@ def post_save_task_created_receiver(
         instance.create_scheduled_event_for_task()
         instance.create_change_to_active_task()
         instance.create_change_to_over_due()
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
             (instance.upline_initiative.pk, instance.target_point),
+            collapsible=True,
         )
 
     if instance.task_status == Task.REWORK:
         instance.create_change_to_rework_over_due_task()
 
-    cache.delete("task_queryset")
+    invalidate("task_queryset")
 
 
 def pre_save_task_receiver(sender, instance: Task, **kwargs: Dict):
@@ -53,11 +54,28 @@ def post_save_task_submission_created_receiver(
 
         task.save()
 
-        generate_system_based_rating.delay(task.pk)
+        publish(
+            "tasks.tasks.detail.generate_system_based_rating", (task.pk,)
+        )
 
 
 def post_delete_task_receiver(sender, instance: Task, **kwargs: Dict):
     """Delete all connected elements"""
+    cleanup = get_delete_cleanup()
+    if cleanup is not None:
+        cleanup.delete_periodic_tasks(
+            f"{str(instance.task_id)} active",
+            f"{str(instance.task_id)} over_due",
+        )
+        cleanup.adjust_target_point(
+            Initiative,
+            "initiative_id",
+            instance.upline_initiative_id,
+            -instance.target_point,
+        )
+        cleanup.invalidate("task_queryset")
+        return
+
     PeriodicTask.objects.filter(
         name=f"{str(instance.task_id)} active"
     ).delete()
@@ -66,14 +84,15 @@ def post_delete_task_receiver(sender, instance: Task, **kwargs: Dict):
         name=f"{str(instance.task_id)} over_due"
     ).delete()
     try:
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
             (instance.upline_initiative.pk, -instance.target_point),
+            collapsible=True,
         )
     except Initiative.DoesNotExist:
         pass
 
-    cache.delete("task_queryset")
+    invalidate("task_queryset")
 
 
 def update_connected_initiative_target_point_for_update(
@@ -84,23 +103,26 @@ def update_connected_initiative_target_point_for_update(
     update
     """
     if previous_task_obj.upline_initiative != instance.upline_initiative:
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
             (
                 previous_task_obj.upline_initiative.pk,
                 -previous_task_obj.target_point,
             ),
+            collapsible=True,
         )
-        current_app.send_task(
+        publish(
             "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
             (instance.upline_initiative.pk, instance.target_point),
+            collapsible=True,
         )
     else:
         if previous_task_obj.target_point != instance.target_point:
             target_point_diff = (
                 instance.target_point - previous_task_obj.target_point
             )
-            current_app.send_task(
+            publish(
                 "strategy_deck.tasks.initiative.update_upline_initiative_target_point",
                 (instance.upline_initiative.pk, target_point_diff),
+                collapsible=True,
             )
@@ -49,3 +49,17 @@ def generate_system_based_rating(task_id: int):
     task_obj.generate_system_based_rating_for_task()
 
     return f"System based rating for task {task_obj.name} has been generated"
+
+
+@app.task()
+def bulk_expand_recurring_task(job_id: int):
+    """
+    Creates the occurrences of a recurring task left after its preview,
+    see core.utils.task_expansion
+    """
+    from core.utils.task_expansion import expand
+    from tasks.models import TaskExpansion
+
+    job = TaskExpansion.objects.get(pk=job_id)
+    created = expand(job)
+    return f"task expansion {job.job_id} created {created} occurrences"
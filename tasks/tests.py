@@ -1,3 +1,965 @@
-from django.test import TestCase
+import uuid
+from datetime import date, time, timedelta
+from importlib import import_module
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.apps import apps
+from django.db import connection
+from django.http import QueryDict
+from django.test import override_settings
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.utils import (
+    get_subfolder_prefix,
+    get_tenant_domain_model,
+    get_tenant_model,
+)
+
+from account.models import Role, User
+from core.utils.generate_token import gen_token
+from core.utils.process_report import get_initiatives
+from core.utils.task_expansion import (
+    cancel_expansions,
+    expand,
+    expand_tenant_tasks,
+    start_expansion,
+)
+from core.utils.task_process import (
+    iter_task_start_dates,
+    process_start_date_list_for_task,
+)
+from emetric_calendar.models import Holiday
+from employee.models import Employee
+from employee_profile.models import EmploymentInformation
+from strategy_deck.models import Initiative
+from tasks.models import Task, TaskExpansion
+from tasks.serializers.report import TaskReportEncoder, get_cumulative_reports
+
+# the views cache querysets in redis, the tests only need postgres
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "KEY_FUNCTION": "django_tenants.cache.make_key",
+        "REVERSE_KEY_FUNCTION": "django_tenants.cache.reverse_key",
+    }
+}
+
+# 2040-01-01 is a sunday, the tenant works monday to friday
+HOLIDAYS = [
+    date(2040, 1, 5),
+    date(2040, 1, 18),
+    date(2040, 3, 15),
+    date(2040, 5, 8),
+    date(2040, 7, 10),
+]
+
+
+def dates(*values):
+    return [date.fromisoformat(value) for value in values]
+
+
+class TaskTenantTestCase(TenantTestCase):
+    @classmethod
+    def get_test_schema_name(cls):
+        return "tasks"
+
+    @classmethod
+    def get_test_tenant_domain(cls):
+        # subfolder routing looks tenants up by their domain
+        return "tasks"
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.company_name = "tasks"
+        tenant.owner_email = "admin@tasks.test"
+        tenant.work_days = ["0", "1", "2", "3", "4"]
+        tenant.work_start_time = time(hour=8)
+        tenant.work_stop_time = time(hour=17)
+        tenant.work_break_start_time = time(hour=12)
+        tenant.work_break_stop_time = time(hour=13)
+        tenant.employee_limit = 10
+
+    @classmethod
+    def setUpClass(cls):
+        # TenantTestCase does not apply class level override_settings
+        cls.settings_override = override_settings(CACHES=TEST_CACHES)
+        cls.settings_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        # the tenant delete collects rows from tables of the public schema
+        # that only exist in tenant schemas, drop the schema instead
+        connection.set_schema_to_public()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA "{cls.tenant.schema_name}" CASCADE')
+            cursor.execute(
+                f"DELETE FROM {get_tenant_domain_model()._meta.db_table} "
+                "WHERE tenant_id = %s",
+                [cls.tenant.pk],
+            )
+            cursor.execute(
+                f"DELETE FROM {get_tenant_model()._meta.db_table} "
+                "WHERE id = %s",
+                [cls.tenant.pk],
+            )
+        cls.remove_allowed_test_domain()
+        cls.settings_override.disable()
+
+
+class TaskStartDateTests(TaskTenantTestCase):
+    """
+    Pins the start dates a recurring task is expanded to, the lists were
+    produced by the implementation before it became a generator
+    """
+
+    def setUp(self):
+        # bulk_create skips the signal moving tasks off new holidays
+        Holiday.objects.bulk_create(
+            [Holiday(name=str(day), date=day) for day in HOLIDAYS]
+        )
+        # an owner without events is free on every day
+        self.upline_initiative = SimpleNamespace(
+            owner=None,
+            start_date=date(2040, 1, 1),
+            end_date=date(2040, 12, 31),
+        )
+
+    def get_dates(
+        self,
+        routine_option,
+        start_date,
+        end_date=None,
+        repeat_every=1,
+        occurs_days=None,
+        occurs_month_day_number=None,
+        occurs_month_day_position=None,
+        occurs_month_day=None,
+        after_occurrence=None,
+        limit=None,
+    ):
+        return process_start_date_list_for_task(
+            self.upline_initiative,
+            routine_option=routine_option,
+            start_date=start_date,
+            start_time=time(hour=9),
+            duration=timedelta(hours=1),
+            repeat_every=repeat_every,
+            occurs_days=occurs_days,
+            occurs_month_day_number=occurs_month_day_number,
+            occurs_month_day_position=occurs_month_day_position,
+            occurs_month_day=occurs_month_day,
+            end_date=end_date,
+            after_occurrence=after_occurrence,
+            tenant=self.tenant,
+            limit=limit,
+        )
+
+    def test_once(self):
+        self.assertEqual(
+            self.get_dates(Task.ONCE, date(2040, 1, 9)),
+            dates("2040-01-09"),
+        )
+
+    def test_daily_skips_holidays_and_non_work_days(self):
+        self.assertEqual(
+            self.get_dates(Task.DAILY, date(2040, 1, 2), date(2040, 1, 13)),
+            dates(
+                "2040-01-02",
+                "2040-01-03",
+                "2040-01-04",
+                "2040-01-06",
+                "2040-01-09",
+                "2040-01-10",
+                "2040-01-11",
+                "2040-01-12",
+                "2040-01-13",
+            ),
+        )
+
+    def test_daily_repeat_every_counts_work_days(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.DAILY,
+                date(2040, 1, 2),
+                date(2040, 1, 24),
+                repeat_every=3,
+            ),
+            dates("2040-01-02", "2040-01-10", "2040-01-13", "2040-01-23"),
+        )
+
+    def test_daily_after_occurrence(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.DAILY,
+                date(2040, 1, 3),
+                date(2040, 1, 31),
+                repeat_every=2,
+                after_occurrence=4,
+            ),
+            dates("2040-01-03", "2040-01-09", "2040-01-11", "2040-01-13"),
+        )
+
+    def test_weekly_skips_holidays_and_non_work_days(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.WEEKLY,
+                date(2040, 1, 2),
+                date(2040, 1, 31),
+                occurs_days=[0, 2, 5],
+            ),
+            dates(
+                "2040-01-02",
+                "2040-01-04",
+                "2040-01-09",
+                "2040-01-11",
+                "2040-01-16",
+                "2040-01-23",
+                "2040-01-25",
+                "2040-01-30",
+            ),
+        )
+
+    def test_weekly_repeat_every(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.WEEKLY,
+                date(2040, 1, 2),
+                date(2040, 2, 29),
+                repeat_every=2,
+                occurs_days=[2, 3],
+            ),
+            dates(
+                "2040-01-04",
+                "2040-01-19",
+                "2040-02-01",
+                "2040-02-02",
+                "2040-02-15",
+                "2040-02-16",
+                "2040-02-29",
+            ),
+        )
+
+    def test_weekly_after_occurrence_without_end_date(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.WEEKLY,
+                date(2040, 1, 2),
+                occurs_days=[1, 4],
+                after_occurrence=5,
+            ),
+            dates(
+                "2040-01-03",
+                "2040-01-06",
+                "2040-01-10",
+                "2040-01-13",
+                "2040-01-17",
+            ),
+        )
+
+    def test_monthly_day_number_skips_holidays_and_non_work_days(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                date(2040, 12, 31),
+                occurs_month_day_number=15,
+            ),
+            dates(
+                "2040-02-15",
+                "2040-05-15",
+                "2040-06-15",
+                "2040-08-15",
+                "2040-10-15",
+                "2040-11-15",
+            ),
+        )
+
+    def test_monthly_day_number_repeat_every(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                date(2040, 12, 31),
+                repeat_every=2,
+                occurs_month_day_number=8,
+            ),
+            dates("2040-03-08", "2040-11-08"),
+        )
+
+    def test_monthly_day_number_after_occurrence(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                occurs_month_day_number=10,
+                after_occurrence=4,
+            ),
+            dates("2040-01-10", "2040-02-10", "2040-04-10", "2040-05-10"),
+        )
+
+    def test_monthly_day_position(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                date(2040, 12, 31),
+                occurs_month_day_position="second",
+                occurs_month_day=3,
+            ),
+            dates("2040-01-12"),
+        )
+
+    def test_monthly_day_position_repeat_every(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                date(2040, 12, 31),
+                repeat_every=2,
+                occurs_month_day_position="last",
+                occurs_month_day=4,
+            ),
+            dates(
+                "2040-01-27",
+                "2040-02-24",
+                "2040-03-30",
+                "2040-04-27",
+                "2040-05-25",
+                "2040-06-29",
+                "2040-07-27",
+                "2040-08-31",
+                "2040-09-28",
+                "2040-10-26",
+                "2040-11-30",
+                "2040-12-28",
+            ),
+        )
+
+    def test_monthly_day_position_after_occurrence(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                date(2040, 12, 31),
+                occurs_month_day_position="first",
+                occurs_month_day=1,
+                after_occurrence=3,
+            ),
+            dates("2040-01-03"),
+        )
+
+    def test_monthly_day_position_on_non_work_day(self):
+        self.assertEqual(
+            self.get_dates(
+                Task.MONTHLY,
+                date(2040, 1, 2),
+                date(2040, 6, 30),
+                occurs_month_day_position="first",
+                occurs_month_day=5,
+            ),
+            dates("2040-01-07"),
+        )
+
+    def test_limit_stops_before_the_occurrences_after_it(self):
+        # the weekly series of test_weekly_skips_holidays_and_non_work_days
+        self.assertEqual(
+            self.get_dates(
+                Task.WEEKLY,
+                date(2040, 1, 2),
+                date(2040, 1, 31),
+                occurs_days=[0, 2, 5],
+                limit=3,
+            ),
+            dates("2040-01-02", "2040-01-04", "2040-01-09"),
+        )
+        self.assertEqual(
+            self.get_dates(
+                Task.DAILY,
+                date(2040, 1, 2),
+                date(2040, 1, 31),
+                after_occurrence=2,
+                limit=3,
+            ),
+            dates("2040-01-02", "2040-01-03"),
+        )
+
+
+class TaskStartDateGeneratorTests(TaskTenantTestCase):
+    """
+    iter_task_start_dates against the start dates the implementation before
+    it became a generator produced, over ranges with holidays and weekends
+    """
+
+    # (routine option, start date, end date, schedule), start dates
+    CASES = [
+        (
+            (Task.DAILY, "2040-01-02", "2040-01-31", {"repeat_every": 1}),
+            dates(
+                "2040-01-02", "2040-01-03", "2040-01-04", "2040-01-06",
+                "2040-01-09", "2040-01-10", "2040-01-11", "2040-01-12",
+                "2040-01-13", "2040-01-16", "2040-01-17", "2040-01-19",
+                "2040-01-20", "2040-01-23", "2040-01-24", "2040-01-25",
+                "2040-01-26", "2040-01-27", "2040-01-30", "2040-01-31",
+            ),
+        ),
+        (
+            (Task.DAILY, "2040-01-02", "2040-03-30", {"repeat_every": 4}),
+            dates(
+                "2040-01-02", "2040-01-06", "2040-01-12", "2040-01-24",
+                "2040-01-30", "2040-02-03", "2040-02-09", "2040-02-15",
+                "2040-02-21", "2040-02-27", "2040-03-02", "2040-03-08",
+                "2040-03-14", "2040-03-20", "2040-03-26", "2040-03-30",
+            ),
+        ),
+        (
+            (
+                Task.WEEKLY,
+                "2040-01-02",
+                "2040-01-31",
+                {"repeat_every": 1, "occurs_days": [0, 3, 4, 6]},
+            ),
+            dates(
+                "2040-01-02", "2040-01-06", "2040-01-09", "2040-01-12",
+                "2040-01-13", "2040-01-16", "2040-01-19", "2040-01-20",
+                "2040-01-23", "2040-01-26", "2040-01-27", "2040-01-30",
+            ),
+        ),
+        (
+            (
+                Task.WEEKLY,
+                "2040-01-02",
+                "2040-12-31",
+                {"repeat_every": 3, "occurs_days": [1, 3]},
+            ),
+            dates(
+                "2040-01-03", "2040-01-24", "2040-01-26", "2040-02-14",
+                "2040-02-16", "2040-03-06", "2040-03-08", "2040-03-27",
+                "2040-03-29", "2040-04-17", "2040-04-19", "2040-05-10",
+                "2040-05-29", "2040-05-31", "2040-06-19", "2040-06-21",
+                "2040-07-12", "2040-07-31", "2040-08-02", "2040-08-21",
+                "2040-08-23", "2040-09-11", "2040-09-13", "2040-10-02",
+                "2040-10-04", "2040-10-23", "2040-10-25", "2040-11-13",
+                "2040-11-15", "2040-12-04", "2040-12-06", "2040-12-25",
+                "2040-12-27",
+            ),
+        ),
+        (
+            (
+                Task.MONTHLY,
+                "2040-01-02",
+                "2040-12-31",
+                {"repeat_every": 1, "occurs_month_day_number": 5},
+            ),
+            dates(
+                "2040-03-05", "2040-04-05", "2040-06-05", "2040-07-05",
+                "2040-09-05", "2040-10-05", "2040-11-05", "2040-12-05",
+            ),
+        ),
+        (
+            (
+                Task.MONTHLY,
+                "2040-01-02",
+                "2040-12-31",
+                {"repeat_every": 2, "occurs_month_day_number": 18},
+            ),
+            dates("2040-05-18", "2040-07-18", "2040-09-18"),
+        ),
+        (
+            (
+                Task.MONTHLY,
+                "2040-01-02",
+                "2040-12-31",
+                {
+                    "repeat_every": 3,
+                    "occurs_month_day_position": "second",
+                    "occurs_month_day": 1,
+                },
+            ),
+            dates(
+                "2040-01-10", "2040-03-13", "2040-08-14", "2040-10-09",
+                "2040-12-11",
+            ),
+        ),
+    ]
+
+    def test_start_dates(self):
+        for (routine_option, start_date, end_date, schedule), expected in (
+            self.CASES
+        ):
+            with self.subTest(routine_option, **schedule):
+                start_dates = iter_task_start_dates(
+                    routine_option,
+                    date.fromisoformat(start_date),
+                    schedule["repeat_every"],
+                    schedule.get("occurs_days"),
+                    schedule.get("occurs_month_day_number"),
+                    schedule.get("occurs_month_day_position"),
+                    schedule.get("occurs_month_day"),
+                    date.fromisoformat(end_date),
+                    set(HOLIDAYS),
+                    self.tenant,
+                )
+                self.assertEqual(list(start_dates), expected)
+
+
+# the mondays of the weekly series the expansion tests create, none of
+# them is a holiday
+SERIES_END_DATE = date(2040, 6, 29)
+MONDAYS = [date(2040, 1, 2) + timedelta(weeks=week) for week in range(26)]
+
+
+class TaskExpansionTests(TaskTenantTestCase):
+    """Background expansion of recurring tasks, see core.utils.task_expansion"""
+
+    def setUp(self):
+        Holiday.objects.bulk_create(
+            [Holiday(name=str(day), date=day) for day in HOLIDAYS]
+        )
+        # the base managers skip the signals sending invitations
+        roles = {
+            role: Role._base_manager.get_or_create(role=role)[0]
+            for role in (Role.ADMIN, Role.EMPLOYEE)
+        }
+        self.admin, self.owner = User._base_manager.bulk_create(
+            [
+                User(
+                    email=f"{role}@tasks.test",
+                    first_name=role,
+                    last_name="tasks",
+                    phone_number=f"+23480000000{number}",
+                    user_role=roles[role],
+                    is_active=True,
+                )
+                for number, role in enumerate((Role.ADMIN, Role.EMPLOYEE))
+            ]
+        )
+        employee = Employee._base_manager.bulk_create(
+            [
+                Employee(
+                    uuid=uuid.uuid4(),
+                    user=self.owner,
+                    organisation_short_name=self.tenant,
+                )
+            ]
+        )[0]
+        EmploymentInformation._base_manager.bulk_create(
+            [
+                EmploymentInformation(
+                    employee=employee, status=EmploymentInformation.ACTIVE
+                )
+            ]
+        )
+        self.initiative = Initiative._base_manager.bulk_create(
+            [
+                Initiative(
+                    name="initiative",
+                    owner=self.owner,
+                    assignor=self.admin,
+                    routine_option=Initiative.ONCE,
+                    start_date=date(2040, 1, 1),
+                    end_date=date(2040, 12, 31),
+                    initiative_status=Initiative.ACTIVE,
+                )
+            ]
+        )[0]
+
+    def task(self, start_date, **kwargs) -> Task:
+        kwargs.setdefault("name", f"weekly report - {self.owner.email}")
+        kwargs.setdefault("routine_option", Task.WEEKLY)
+        return Task(
+            upline_initiative=self.initiative,
+            task_type=Task.QUANTITATIVE,
+            start_date=start_date,
+            start_time=time(hour=9),
+            duration=timedelta(hours=1) - timedelta(seconds=1),
+            repeat_every=1,
+            occurs_days=[Task.MONDAY],
+            turn_around_time_target_point=1,
+            quantity_target_unit=2,
+            quantity_target_point=2,
+            target_point=3,
+            **kwargs,
+        )
+
+    def start_series(self, preview_size=4, **kwargs) -> TaskExpansion:
+        """Creates the preview of the weekly series and its expansion job"""
+        series_id = uuid.uuid4()
+        preview = Task.objects.bulk_create(
+            [
+                self.task(
+                    current,
+                    routine_round=number,
+                    series_id=series_id,
+                    end_date=SERIES_END_DATE,
+                    **kwargs,
+                )
+                for number, current in enumerate(
+                    MONDAYS[:preview_size], start=1
+                )
+            ]
+        )
+        return start_expansion(preview, MONDAYS[0], SERIES_END_DATE)
+
+    def book(self, day: date):
+        """Fills the hour of the series on ``day`` in the owner's calendar"""
+        Task.objects.bulk_create(
+            [self.task(day, name="meeting", routine_option=Task.ONCE)]
+        )
+
+    def get_series(self, job: TaskExpansion):
+        return list(
+            Task.objects.filter(series_id=job.series_id)
+            .order_by("routine_round")
+            .values_list("routine_round", "start_date")
+        )
+
+    def tenant_url(self, path: str) -> str:
+        return f"/{get_subfolder_prefix()}/{self.tenant.schema_name}/{path}"
+
+    def post_series(self):
+        return self.client.post(
+            self.tenant_url("task/?expand=background"),
+            {
+                "name": "weekly report",
+                "upline_initiative": {
+                    "initiative_id": str(self.initiative.initiative_id)
+                },
+                "task_type": Task.QUANTITATIVE,
+                "start_date": "2040-01-02",
+                "start_time": "09:00:00",
+                "duration": "01:00:00",
+                "routine_option": Task.WEEKLY,
+                "repeat_every": 1,
+                "occurs_days": [Task.MONDAY],
+                "end_date": SERIES_END_DATE.isoformat(),
+                "turn_around_time_target_point": "1",
+                "quantity_target_unit": "2",
+                "quantity_target_point": "2",
+            },
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {gen_token(self.admin).access_token}",
+        )
+
+    def test_start_expansion_continues_after_the_preview(self):
+        job = self.start_series()
+
+        self.assertEqual(job.status, TaskExpansion.PENDING)
+        self.assertEqual(job.next_date, MONDAYS[3] + timedelta(days=1))
+        self.assertEqual(job.next_round, 5)
+        self.assertEqual(job.start_date, MONDAYS[0])
+        self.assertEqual(job.end_date, SERIES_END_DATE)
+
+    def test_expand_stops_at_the_horizon_a_chunk_at_a_time(self):
+        job = self.start_series()
+
+        created = expand(job, horizon=date(2040, 2, 29), chunk_size=3)
+
+        job.refresh_from_db()
+        self.assertEqual(created, 5)
+        self.assertEqual(job.status, TaskExpansion.PENDING)
+        self.assertEqual(job.created_count, 5)
+        self.assertEqual(job.next_date, date(2040, 3, 5))
+        self.assertEqual(job.next_round, 10)
+        self.assertEqual(
+            self.get_series(job),
+            list(enumerate(MONDAYS[:9], start=1)),
+        )
+
+    def test_expand_is_done_at_the_end_of_the_schedule(self):
+        job = self.start_series()
+
+        created = expand(job, horizon=date(2040, 12, 31), chunk_size=7)
+
+        job.refresh_from_db()
+        self.assertEqual(created, len(MONDAYS) - 4)
+        self.assertEqual(job.status, TaskExpansion.DONE)
+        self.assertEqual(
+            self.get_series(job), list(enumerate(MONDAYS, start=1))
+        )
+        # a done job creates nothing more
+        self.assertEqual(expand(job, horizon=date(2040, 12, 31)), 0)
+
+    def test_expand_stops_after_the_occurrences(self):
+        job = self.start_series(after_occurrence=6)
+
+        created = expand(job, horizon=date(2040, 12, 31))
+
+        job.refresh_from_db()
+        self.assertEqual(created, 2)
+        self.assertEqual(job.status, TaskExpansion.DONE)
+        self.assertEqual(
+            self.get_series(job), list(enumerate(MONDAYS[:6], start=1))
+        )
+
+    def test_expand_skips_occurrences_booked_since_with_contiguous_rounds(
+        self,
+    ):
+        job = self.start_series()
+        self.book(MONDAYS[5])
+
+        created = expand(job, horizon=date(2040, 2, 29))
+
+        job.refresh_from_db()
+        self.assertEqual(created, 4)
+        self.assertEqual(job.conflicts, [MONDAYS[5].isoformat()])
+        self.assertEqual(job.next_round, 9)
+        self.assertEqual(
+            self.get_series(job),
+            list(enumerate(MONDAYS[:5] + MONDAYS[6:9], start=1)),
+        )
+
+    def test_cancelled_expansion_creates_nothing(self):
+        job = self.start_series()
+
+        self.assertEqual(cancel_expansions(job.series_id), 1)
+        self.assertEqual(cancel_expansions(None), 0)
+
+        self.assertEqual(expand(job, horizon=date(2040, 12, 31)), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, TaskExpansion.CANCELLED)
+        self.assertEqual(len(self.get_series(job)), 4)
+
+    def test_expand_tenant_tasks_moves_the_horizon(self):
+        job = self.start_series()
+        horizon_days = (date(2040, 2, 29) - timezone.localdate()).days
+
+        created = expand_tenant_tasks(self.tenant, horizon_days=horizon_days)
+
+        job.refresh_from_db()
+        self.assertEqual(created, 5)
+        self.assertEqual(job.next_date, date(2040, 3, 5))
+
+    @override_settings(TASK_EXPANSION_PREVIEW_SIZE=4)
+    def test_background_create_answers_with_the_preview(self):
+        response = self.post_series()
+
+        self.assertEqual(response.status_code, 202, response.content)
+        data = response.json()["data"]
+        self.assertEqual(
+            [task["routine_round"] for task in data["preview"]], [1, 2, 3, 4]
+        )
+        self.assertEqual(data["expansion"]["status"], TaskExpansion.PENDING)
+        self.assertEqual(data["expansion"]["next_date"], "2040-01-24")
+
+        job = TaskExpansion.objects.get(job_id=data["expansion"]["job_id"])
+        self.assertEqual(job.next_round, 5)
+        self.assertEqual(len(self.get_series(job)), 4)
+
+        response = self.client.get(
+            self.tenant_url(f"task/expansion/{job.job_id}/"),
+            HTTP_AUTHORIZATION=f"Bearer {gen_token(self.admin).access_token}",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["data"]["job_id"], str(job.job_id))
+
+    @override_settings(TASK_EXPANSION_PREVIEW_SIZE=4)
+    def test_background_create_validates_the_preview_only(self):
+        # an occurrence after the preview is left to the worker, which
+        # skips it
+        self.book(MONDAYS[10])
+
+        response = self.post_series()
+
+        self.assertEqual(response.status_code, 202, response.content)
+        job = TaskExpansion.objects.get()
+        expand(job, horizon=date(2040, 12, 31))
+        job.refresh_from_db()
+        self.assertEqual(job.conflicts, [MONDAYS[10].isoformat()])
+
+    @override_settings(TASK_EXPANSION_PREVIEW_SIZE=4)
+    def test_background_create_rejects_a_preview_conflict(self):
+        self.book(MONDAYS[2])
+
+        response = self.post_series()
+
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn("start_time", response.content.decode())
+        self.assertFalse(TaskExpansion.objects.exists())
+
+
+class SeriesBackfillTests(TaskTenantTestCase):
+    """
+    The series given to the recurring rows created before the series id,
+    see tasks migration 0005 and strategy_deck migration 0004
+    """
+
+    def setUp(self):
+        self.owners = User._base_manager.bulk_create(
+            [
+                User(
+                    email=f"owner{number}@tasks.test",
+                    first_name="owner",
+                    last_name=str(number),
+                    phone_number=f"+23480000001{number}",
+                    is_active=True,
+                )
+                for number in range(2)
+            ]
+        )
+
+    def backfill(self, app_label, migration_name):
+        migration = import_module(f"{app_label}.migrations.{migration_name}")
+        migration.backfill_series(apps, connection.schema_editor())
+
+    def initiatives(self, owner, name="monthly review", count=2):
+        return Initiative._base_manager.bulk_create(
+            [
+                Initiative(
+                    name=name,
+                    owner=owner,
+                    routine_option=Initiative.MONTHLY,
+                    routine_round=number,
+                    start_date=date(2040, number, 1),
+                    end_date=date(2040, number, 28),
+                    initiative_status=Initiative.ACTIVE,
+                )
+                for number in range(1, count + 1)
+            ]
+        )
+
+    def assertSeries(self, *groups):
+        """Each group of rows is one series of its own"""
+        series = []
+        for rows in groups:
+            ids = {row.series_id for row in rows}
+            self.assertEqual(len(ids), 1)
+            self.assertNotIn(None, ids)
+            series.extend(ids)
+        self.assertEqual(len(set(series)), len(groups))
+
+    def test_same_named_initiatives_of_other_owners_are_other_series(self):
+        first = self.initiatives(self.owners[0])
+        second = self.initiatives(self.owners[1])
+        other_name = self.initiatives(self.owners[0], name="other")
+
+        self.backfill("strategy_deck", "0004_backfill_series")
+
+        for rows in (first, second, other_name):
+            for row in rows:
+                row.refresh_from_db()
+        self.assertSeries(first, second, other_name)
+
+    def test_same_named_tasks_of_other_initiatives_are_other_series(self):
+        initiatives = [
+            self.initiatives(owner, count=1)[0] for owner in self.owners
+        ]
+        series = [
+            Task.objects.bulk_create(
+                [
+                    Task(
+                        name="weekly report",
+                        upline_initiative=initiative,
+                        task_type=Task.QUANTITATIVE,
+                        routine_option=Task.WEEKLY,
+                        routine_round=number,
+                        start_date=monday,
+                        start_time=time(hour=9),
+                    )
+                    for number, monday in enumerate(MONDAYS[:3], start=1)
+                ]
+            )
+            for initiative in initiatives
+        ]
+        once = Task.objects.bulk_create(
+            [
+                Task(
+                    name="weekly report",
+                    upline_initiative=initiatives[0],
+                    task_type=Task.QUANTITATIVE,
+                    routine_option=Task.ONCE,
+                    start_date=MONDAYS[5],
+                    start_time=time(hour=9),
+                )
+            ]
+        )[0]
+
+        self.backfill("tasks", "0005_backfill_series")
+
+        for rows in series:
+            for row in rows:
+                row.refresh_from_db()
+        self.assertSeries(*series)
+        once.refresh_from_db()
+        self.assertIsNone(once.series_id)
+
+
+class CumulativeReportTests(TaskTenantTestCase):
+    """Cumulative reports of a page of initiatives, computed together"""
+
+    def setUp(self):
+        owner = User._base_manager.create(
+            email="owner@tasks.test",
+            first_name="owner",
+            last_name="tasks",
+            phone_number="+2348000000200",
+            is_active=True,
+        )
+        # a > b > c, b > d and e on its own
+        self.initiatives = {}
+        for name, upline in (
+            ("a", None),
+            ("b", "a"),
+            ("c", "b"),
+            ("d", "b"),
+            ("e", None),
+        ):
+            self.initiatives[name] = Initiative._base_manager.bulk_create(
+                [
+                    Initiative(
+                        name=name,
+                        upline_initiative=self.initiatives.get(upline),
+                        owner=owner,
+                        routine_option=Initiative.ONCE,
+                        start_date=date(2040, 1, 1),
+                        end_date=date(2040, 12, 31),
+                        initiative_status=Initiative.ACTIVE,
+                    )
+                ]
+            )[0]
+        Task.objects.bulk_create(
+            [
+                Task(
+                    name=f"{name} {number}",
+                    upline_initiative=self.initiatives[name],
+                    task_type=Task.QUANTITATIVE,
+                    task_status=Task.CLOSED,
+                    routine_option=Task.ONCE,
+                    start_date=MONDAYS[number],
+                    start_time=time(hour=9),
+                    target_point=number + 1,
+                    target_point_achieved=number,
+                )
+                for number, name in enumerate("abcdeabcd")
+            ]
+        )
+
+    def get_report(self, initiative):
+        tasks = Task.objects.filter(
+            task_status=Task.CLOSED,
+            upline_initiative__in=get_initiatives(initiative),
+        )
+        rows = TaskReportEncoder.get_rows(tasks)
+        return TaskReportEncoder.encode(rows[-1:])
+
+    def test_reports_match_the_report_of_each_initiative(self):
+        initiatives = list(self.initiatives.values())
+
+        reports = get_cumulative_reports(
+            SimpleNamespace(GET=QueryDict()), initiatives
+        )
+
+        for initiative in initiatives:
+            with self.subTest(initiative.name):
+                self.assertEqual(
+                    reports[initiative.pk], self.get_report(initiative)
+                )
+        # the downlines are counted in the upline's cumulative points
+        self.assertEqual(
+            reports[self.initiatives["a"].pk][0]["cumulative_target_point"],
+            sum(
+                number + 1
+                for number, name in enumerate("abcdeabcd")
+                if name != "e"
+            ),
+        )
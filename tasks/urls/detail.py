@@ -14,9 +14,12 @@ from tasks.views import (
     team_task_report,
     initiative_task_report,
     objective_task_report,
+    user_dashboard_bundle,
+    team_dashboard_bundle,
     ObjectiveReport,
     TeamInitiativeReport,
     MultipleTaskDeleteView,
+    TaskExpansionDetailView,
 )
 
 
@@ -45,6 +48,16 @@ urlpatterns = [
         objective_task_report,
         name="task-report-objective",
     ),
+    path(
+        "report/dashboard/user/<str:user_id>/",
+        user_dashboard_bundle,
+        name="dashboard-bundle-user",
+    ),
+    path(
+        "report/dashboard/team/<str:team_id>/",
+        team_dashboard_bundle,
+        name="dashboard-bundle-team",
+    ),
     path(
         "report/objective/",
         ObjectiveReport.as_view(),
@@ -56,6 +69,11 @@ urlpatterns = [
         MultipleTaskDeleteView.as_view(),
         name="task-bulk-delete",
     ),
+    path(
+        "expansion/<str:job_id>/",
+        TaskExpansionDetailView.as_view(),
+        name="task-expansion-detail",
+    ),
     path("<str:task_id>/", TaskDetailView.as_view(), name="task-detail"),
     path(
         "<str:task_id>/task-submission/",
@@ -1,4 +1,10 @@
-from .detail import TaskDetailView, TaskListCreateView, TaskImportView, MultipleTaskDeleteView
+from .detail import (
+    TaskDetailView,
+    TaskListCreateView,
+    TaskImportView,
+    MultipleTaskDeleteView,
+    TaskExpansionDetailView,
+)
 from .submission import TaskSubmissionCreateView, TaskSubmissionListView
 from .rate import TaskRateView, TaskReworkView
 from .report import (
@@ -6,6 +12,8 @@ from .report import (
     team_task_report,
     initiative_task_report,
     objective_task_report,
+    user_dashboard_bundle,
+    team_dashboard_bundle,
     TeamInitiativeReport,
     ObjectiveReport
 )
@@ -1,24 +1,36 @@
 import django_filters
-from django.core.cache import cache
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from core.utils import CustomPagination, response_data
+from core.utils.bulk_delete import bulk_delete
+from core.utils.change_versions import conditional_get
 from core.utils.custom_parser import NestedMultipartParser
 from core.utils.permissions import (
     IsTaskAssignorOrAdminOrReadOnly,
     IsTeamLeadOrAdminOrReadOnly,
 )
-from tasks.models import Task
+from core.utils.recurrence import get_future_occurrences
+from core.utils.search import DocumentSearchFilter, name_search_document
+from core.utils.task_expansion import cancel_expansions
+from tasks.models import Task, TaskExpansion
 from tasks.serializers import (
     TaskSerializer,
     TaskImportSerializer,
     MultipleTaskSerializer,
+    TaskExpansionSerializer,
+    TaskPreviewSerializer,
 )
 from tasks.filter import TaskFilter
 
 
+@method_decorator(
+    conditional_get("task_queryset", "initiative_queryset"),
+    name="get",
+)
 class TaskListCreateView(generics.ListCreateAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsTeamLeadOrAdminOrReadOnly]
@@ -26,11 +38,14 @@ class TaskListCreateView(generics.ListCreateAPIView):
     pagination_class = CustomPagination
     filter_backends = [
         django_filters.rest_framework.DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        DocumentSearchFilter,
     ]
     parser_classes = (NestedMultipartParser, JSONParser)
     filterset_class = TaskFilter
+    search_document = name_search_document()
+    search_text = "name"
+    search_document_fields = ("name",)
     search_fields = (
         "name",
         "upline_initiative__name",
@@ -58,19 +73,34 @@ class TaskListCreateView(generics.ListCreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        # ?expand=background creates the first occurrences only
+        serializer.save(
+            expand_in_background=request.query_params.get("expand")
+            == "background"
+        )
+
+        if serializer.expansion is not None:
+            data = response_data(
+                202,
+                "Task added, its remaining occurrences are being created",
+                {
+                    **serializer.data,
+                    "preview": TaskPreviewSerializer(
+                        serializer.preview, many=True
+                    ).data,
+                    "expansion": TaskExpansionSerializer(
+                        serializer.expansion
+                    ).data,
+                },
+            )
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+
         data = response_data(201, "Task added successfully", serializer.data)
         return Response(data, status=status.HTTP_201_CREATED)
 
     def get_queryset(self):
-        task_queryset = cache.get("task_queryset")
-
-        if task_queryset == None:
-            task_queryset = self.get_serializer_class().setup_eager_loading(
-                self.queryset
-            )
-            cache.set("task_queryset", task_queryset)
-        return task_queryset
+        # not cached, pickling a queryset fetches every task of the tenant
+        return self.get_serializer_class().setup_eager_loading(self.queryset)
 
 
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -104,8 +134,10 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         if recurring:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            self.perform_destroy_all(instance)
-            serializer.save()
+            # the series is replaced by the new one or left as it was
+            with transaction.atomic():
+                self.perform_destroy_all(instance)
+                serializer.save()
             data = response_data(
                 200,
                 "Task and recurring Tasks updated successfully",
@@ -140,22 +172,15 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy_all(self, instance):
         """Perform delete all recurring tasks"""
-        tasks = Task.objects.filter(
-            name=instance.name,
-            start_date__gte=instance.start_date,
-            task_status=Task.PENDING,
+        occurrences = get_future_occurrences(
+            instance, task_status=Task.PENDING
         )
-        tasks.delete()
+        bulk_delete(occurrences)
+        cancel_expansions(instance.series_id)
 
     def get_queryset(self):
-        task_queryset = cache.get("task_queryset")
-
-        if task_queryset == None:
-            task_queryset = self.get_serializer_class().setup_eager_loading(
-                self.queryset
-            )
-            cache.set("task_queryset", task_queryset)
-        return task_queryset
+        # not cached, pickling a queryset fetches every task of the tenant
+        return self.get_serializer_class().setup_eager_loading(self.queryset)
 
 
 class TaskImportView(generics.CreateAPIView):
@@ -189,5 +214,20 @@ class MultipleTaskDeleteView(generics.GenericAPIView):
 
     def perform_multiple_delete(self, serializer):
         tasks = serializer.validated_data["task"]
-        for task in tasks:
-            task.delete()
+        bulk_delete(
+            Task.objects.filter(pk__in=[obj.pk for obj in tasks])
+        )
+
+
+class TaskExpansionDetailView(generics.RetrieveAPIView):
+    """The progress of the background expansion of a recurring task"""
+
+    serializer_class = TaskExpansionSerializer
+    permission_classes = [IsTeamLeadOrAdminOrReadOnly]
+    queryset = TaskExpansion.objects.all()
+    lookup_field = "job_id"
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        data = response_data(200, "Task expansion", serializer.data)
+        return Response(data, status=status.HTTP_200_OK)
@@ -1,8 +1,10 @@
+from functools import partial
+
 import django_filters
-from typing import List
 from django.forms import ValidationError
 from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 from django_filters.utils import translate_validation
 from django.contrib.auth import get_user_model
 from rest_framework import status, generics
@@ -18,19 +20,26 @@ from core.utils.permissions import (
     has_access_to_user,
 )
 from core.utils import response_data
+from core.utils.change_versions import conditional_get
 from core.utils.process_levels import process_level_by_uuid
-from core.utils.process_report import (
-    get_initiatives,
-    process_tasks_for_report,
-)
+from core.utils.process_report import get_initiatives
+from core.utils.replicas import replica_reads
+from core.utils.report_pool import run_concurrently
+from emetric_calendar.filter import UserScheduledEventCalendarFilter
+from emetric_calendar.models import UserScheduledEventCalendar
+from emetric_calendar.serializers import DateRangeSerializer
+from emetric_calendar.views import CalendarDashboardMixins
 from strategy_deck.models import Initiative, Objective
 from strategy_deck.views.objective import ObjectiveFilter
 from tasks.models.detail import Task
 from tasks.serializers import (
-    TaskReportSerializer,
+    TaskReportEncoder,
     InitiativeReportSerializer,
     ObjectiveReportSerializer,
 )
+from tasks.serializers.report import (
+    get_cumulative_reports,
+)
 from tasks.filter import TaskFilter
 from core.utils.custom_pagination import CustomPagination
 
@@ -48,6 +57,16 @@ User = get_user_model()
         IsAuthenticated,
     ]
 )
+@conditional_get(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+)
+@replica_reads(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+)
 def user_task_report(request, user_id):
     # validates user id
     try:
@@ -73,18 +92,18 @@ def user_task_report(request, user_id):
     if not filterset.is_valid():
         raise translate_validation(filterset.errors)
 
-    # Loops through tasks for cumulative calculations
-    tasks = process_tasks_for_report(filterset.qs)
+    # report columns and cumulative points of every task
+    rows = TaskReportEncoder.get_rows(filterset.qs)
 
     # sends unpaginated response of the last element for dashboard purpose
     if dashboard_report == "True":
-        serializer = TaskReportSerializer(tasks, many=True)
-        data = response_data(200, "dashboard report", serializer.data[-1:])
+        data = response_data(
+            200, "dashboard report", TaskReportEncoder.encode(rows[-1:])
+        )
         return Response(data, status=status.HTTP_200_OK)
 
-    page = paginator.paginate_queryset(tasks, request)
-    serializer = TaskReportSerializer(page, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(TaskReportEncoder.encode(page))
 
 
 @api_view(
@@ -97,6 +116,18 @@ def user_task_report(request, user_id):
         IsAuthenticated,
     ]
 )
+@conditional_get(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+    "employee_queryset",
+)
+@replica_reads(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+    "employee_queryset",
+)
 def team_task_report(request, team_id):
     try:
         (
@@ -140,23 +171,54 @@ def team_task_report(request, team_id):
     if not filterset.is_valid():
         raise translate_validation(filterset.errors)
 
-    tasks: List[Task] = filterset.qs
-
-    # Loops through tasks for cumulative calculations
-    tasks = process_tasks_for_report(filterset.qs)
+    # report columns and cumulative points of every task
+    rows = TaskReportEncoder.get_rows(filterset.qs)
 
     # sends unpaginated response of the last element for dashboard purpose
     if dashboard_report == "True":
-        serializer = TaskReportSerializer(tasks, many=True)
-        data = response_data(200, "dashboard report", serializer.data[-1:])
+        data = response_data(
+            200, "dashboard report", TaskReportEncoder.encode(rows[-1:])
+        )
         return Response(data, status=status.HTTP_200_OK)
 
-    page = paginator.paginate_queryset(tasks, request)
-    serializer = TaskReportSerializer(page, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(TaskReportEncoder.encode(page))
 
 
-class TeamInitiativeReport(generics.ListAPIView):
+class CumulativeReportMixins:
+    """Mixins for the initiative and objective reports"""
+
+    def get_report_serializer(self, instances):
+        """
+        Serializes ``instances`` with their cumulative reports computed
+        together
+        """
+        context = self.get_serializer_context()
+        context["cumulative_reports"] = get_cumulative_reports(
+            self.request, instances
+        )
+        return self.get_serializer(instances, many=True, context=context)
+
+
+@method_decorator(
+    conditional_get(
+        "task_queryset",
+        "initiative_queryset",
+        "objective_queryset",
+        "employee_queryset",
+    ),
+    name="get",
+)
+@method_decorator(
+    replica_reads(
+        "task_queryset",
+        "initiative_queryset",
+        "objective_queryset",
+        "employee_queryset",
+    ),
+    name="get",
+)
+class TeamInitiativeReport(generics.ListAPIView, CumulativeReportMixins):
     serializer_class = InitiativeReportSerializer
     queryset = Initiative.objects.all()
     pagination_class = CustomPagination
@@ -191,7 +253,7 @@ class TeamInitiativeReport(generics.ListAPIView):
         if not current_level:
             raise Http404
 
-        if not has_access_to_team_report(current_level, self.request):
+        if not has_access_to_team(current_level, self.request):
             raise PermissionDenied(
                 {"team_id": "Permission denied to view team's report"}
             )
@@ -203,7 +265,7 @@ class TeamInitiativeReport(generics.ListAPIView):
             group=group_level_obj,
             department=department_level_obj,
             unit=unit_level_obj,
-        )
+        ).select_related("owner")
         return initiatives
 
     def list(self, request, *args, **kwargs):
@@ -211,10 +273,10 @@ class TeamInitiativeReport(generics.ListAPIView):
 
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = self.get_report_serializer(page)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_report_serializer(list(queryset))
         data = response_data(200, "initiative report list", serializer.data)
         return Response(data, status=status.HTTP_200_OK)
 
@@ -229,6 +291,16 @@ class TeamInitiativeReport(generics.ListAPIView):
         IsAuthenticated,
     ]
 )
+@conditional_get(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+)
+@replica_reads(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+)
 def initiative_task_report(request, initiative_id):
     try:
         initiative = get_object_or_404(Initiative, initiative_id=initiative_id)
@@ -253,20 +325,18 @@ def initiative_task_report(request, initiative_id):
     if not filterset.is_valid():
         raise translate_validation(filterset.errors)
 
-    tasks: List[Task] = filterset.qs
-
-    # Loops through tasks for cumulative calculations
-    tasks = process_tasks_for_report(filterset.qs)
+    # report columns and cumulative points of every task
+    rows = TaskReportEncoder.get_rows(filterset.qs)
 
     # sends unpaginated response of the last element for dashboard purpose
     if dashboard_report == "True":
-        serializer = TaskReportSerializer(tasks, many=True)
-        data = response_data(200, "dashboard report", serializer.data[-1:])
+        data = response_data(
+            200, "dashboard report", TaskReportEncoder.encode(rows[-1:])
+        )
         return Response(data, status=status.HTTP_200_OK)
 
-    page = paginator.paginate_queryset(tasks, request)
-    serializer = TaskReportSerializer(page, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(TaskReportEncoder.encode(page))
 
 
 @api_view(
@@ -279,6 +349,16 @@ def initiative_task_report(request, initiative_id):
         IsAuthenticated,
     ]
 )
+@conditional_get(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+)
+@replica_reads(
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+)
 def objective_task_report(request, objective_id):
     try:
         objective = get_object_or_404(Objective, objective_id=objective_id)
@@ -303,23 +383,33 @@ def objective_task_report(request, objective_id):
     if not filterset.is_valid():
         raise translate_validation(filterset.errors)
 
-    tasks: List[Task] = filterset.qs
-
-    # Loops through tasks for cumulative calculations
-    tasks = process_tasks_for_report(filterset.qs)
+    # report columns and cumulative points of every task
+    rows = TaskReportEncoder.get_rows(filterset.qs)
 
     # sends unpaginated response of the last element for dashboard purpose
     if dashboard_report == "True":
-        serializer = TaskReportSerializer(tasks, many=True)
-        data = response_data(200, "dashboard report", serializer.data[-1:])
+        data = response_data(
+            200, "dashboard report", TaskReportEncoder.encode(rows[-1:])
+        )
         return Response(data, status=status.HTTP_200_OK)
 
-    page = paginator.paginate_queryset(tasks, request)
-    serializer = TaskReportSerializer(page, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(TaskReportEncoder.encode(page))
 
 
-class ObjectiveReport(generics.ListAPIView):
+@method_decorator(
+    conditional_get(
+        "task_queryset", "initiative_queryset", "objective_queryset"
+    ),
+    name="get",
+)
+@method_decorator(
+    replica_reads(
+        "task_queryset", "initiative_queryset", "objective_queryset"
+    ),
+    name="get",
+)
+class ObjectiveReport(generics.ListAPIView, CumulativeReportMixins):
     """Returns a report based on objectives"""
 
     serializer_class = ObjectiveReportSerializer
@@ -346,9 +436,198 @@ class ObjectiveReport(generics.ListAPIView):
 
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = self.get_report_serializer(page)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_report_serializer(list(queryset))
         data = response_data(200, "Objective report list", serializer.data)
         return Response(data, status=status.HTTP_200_OK)
+
+
+# the querysets the tiles of a dashboard bundle are built from
+DASHBOARD_BUNDLE_QUERYSETS = (
+    "task_queryset",
+    "initiative_queryset",
+    "objective_queryset",
+    "employee_queryset",
+    "holiday_queryset",
+)
+
+
+def get_dashboard_report(request, queryset) -> list:
+    """The last report row of the tasks of ``queryset``"""
+    filterset = TaskFilter(request.GET, queryset=queryset)
+
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+
+    rows = TaskReportEncoder.get_rows(filterset.qs)
+    return TaskReportEncoder.encode(rows[-1:])
+
+
+def get_dashboard_bundle(request, tasks, events, initiatives) -> dict:
+    """
+    The tiles of a dashboard, the dashboard report of the closed ``tasks``,
+    the calendar dashboard of ``events`` over the requested dates and a page
+    of the initiative report of ``initiatives``. The tiles are computed
+    concurrently, the cumulative reports of the page together.
+    """
+    serialized_data = DateRangeSerializer(
+        data=dict(
+            date_after=request.query_params.get("date_after"),
+            date_before=request.query_params.get("date_before"),
+        )
+    )
+    serialized_data.is_valid(raise_exception=True)
+    date_after = serialized_data.validated_data.get("date_after")
+    date_before = serialized_data.validated_data.get("date_before")
+    filterset = UserScheduledEventCalendarFilter(request.GET, queryset=events)
+
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+
+    paginator = CustomPagination()
+    page = paginator.paginate_queryset(initiatives, request)
+
+    results = run_concurrently(
+        {
+            "task_report": partial(get_dashboard_report, request, tasks),
+            "calendar_dashboard": partial(
+                CalendarDashboardMixins.retrieve_calendar_dashboard,
+                filterset.qs,
+                date_after,
+                date_before,
+            ),
+            "cumulative_reports": partial(
+                get_cumulative_reports, request, page
+            ),
+        }
+    )
+
+    serializer = InitiativeReportSerializer(
+        page,
+        many=True,
+        context={
+            "request": request,
+            "cumulative_reports": results["cumulative_reports"],
+        },
+    )
+    return {
+        "task_report": results["task_report"],
+        "calendar_dashboard": results["calendar_dashboard"],
+        "initiative_report": paginator.get_paginated_response(
+            serializer.data
+        ).data,
+    }
+
+
+@api_view(
+    [
+        "GET",
+    ]
+)
+@permission_classes(
+    [
+        IsAuthenticated,
+    ]
+)
+@conditional_get(*DASHBOARD_BUNDLE_QUERYSETS)
+@replica_reads(*DASHBOARD_BUNDLE_QUERYSETS)
+def user_dashboard_bundle(request, user_id):
+    """
+    The task report, calendar dashboard and initiative report of a user in
+    one response
+    """
+    try:
+        user = get_object_or_404(User, user_id=user_id)
+    except ValidationError:
+        raise Http404
+
+    if not has_access_to_user(user, request):
+        raise PermissionDenied(
+            {"user_id": "Permission denied to view user's report"}
+        )
+
+    bundle = get_dashboard_bundle(
+        request,
+        Task.objects.filter(
+            task_status=Task.CLOSED, upline_initiative__owner=user
+        ),
+        UserScheduledEventCalendar.objects.filter(user=user, is_free=False),
+        Initiative.objects.filter(
+            initiative_status__in=[Initiative.CLOSED, Initiative.ACTIVE],
+            owner=user,
+        ).select_related("owner"),
+    )
+    data = response_data(200, "dashboard bundle", bundle)
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(
+    [
+        "GET",
+    ]
+)
+@permission_classes(
+    [
+        IsAuthenticated,
+    ]
+)
+@conditional_get(*DASHBOARD_BUNDLE_QUERYSETS)
+@replica_reads(*DASHBOARD_BUNDLE_QUERYSETS)
+def team_dashboard_bundle(request, team_id):
+    """
+    The task report, calendar dashboard and initiative report of a team in
+    one response
+    """
+    try:
+        (
+            corporate_level_obj,
+            division_level_obj,
+            group_level_obj,
+            department_level_obj,
+            unit_level_obj,
+        ) = process_level_by_uuid(team_id)
+    except ValidationError:
+        raise Http404
+
+    current_level = (
+        corporate_level_obj
+        or division_level_obj
+        or group_level_obj
+        or department_level_obj
+        or unit_level_obj
+    )
+
+    if not current_level:
+        raise Http404
+
+    if not has_access_to_team(current_level, request):
+        raise PermissionDenied(
+            {"team_id": "Permission denied to view team's report"}
+        )
+
+    team = dict(
+        corporate_level=corporate_level_obj,
+        division=division_level_obj,
+        group=group_level_obj,
+        department=department_level_obj,
+        unit=unit_level_obj,
+    )
+    bundle = get_dashboard_bundle(
+        request,
+        Task.objects.filter(
+            task_status=Task.CLOSED,
+            **{
+                f"upline_initiative__{field}": obj
+                for field, obj in team.items()
+            },
+        ),
+        UserScheduledEventCalendar.objects.filter(is_free=False, **team),
+        Initiative.objects.filter(
+            initiative_status__in=[Initiative.CLOSED, Initiative.ACTIVE],
+            **team,
+        ).select_related("owner"),
+    )
+    data = response_data(200, "dashboard bundle", bundle)
+    return Response(data, status=status.HTTP_200_OK)